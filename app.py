@@ -2,8 +2,8 @@ import streamlit as st
 import pandas as pd
 import time
 import datetime
-import plotly.express as px
-from src.backend import CrowdSystemBackend
+from src.sharding import ShardRouter, backend_settings
+from src.analytics import build_cube, rollup, scope_cube
 
 # --- CONFIG ---
 st.set_page_config(
@@ -163,10 +163,41 @@ st.markdown(f"""
 
 # --- BACKEND ---
 @st.cache_resource
-def get_backend():
-    return CrowdSystemBackend()
+def get_router():
+    return ShardRouter(**backend_settings())
 
-backend = get_backend()
+router = get_router()
+
+# Derived admin data is memoized on (region, data version), so reruns only
+# recompute when a booking or admin action has actually changed the store.
+# Every write bumps the version, so only the last few versions are kept, for
+# up to a handful of regions signed in at once.
+CACHED_VERSIONS = 4
+CACHED_REGIONS = 8
+
+@st.cache_data(show_spinner=False, max_entries=CACHED_VERSIONS * len(router.shards))
+def get_shard_cube(code, version):
+    return build_cube(router.shards[code].backend.dm.requests)
+
+@st.cache_data(show_spinner=False, max_entries=CACHED_VERSIONS)
+def get_cube(version):
+    # A write bumps one shard's version, so only that shard's cube is rebuilt
+    return pd.concat([get_shard_cube(shard.code, shard_version) for shard, shard_version in zip(router, version)],
+                     ignore_index=True)
+
+@st.cache_data(show_spinner=False, max_entries=CACHED_VERSIONS * CACHED_REGIONS)
+def get_scope_cube(region, version):
+    return scope_cube(get_cube(version), region)
+
+@st.cache_data(show_spinner=False, max_entries=CACHED_VERSIONS * CACHED_REGIONS)
+def get_scope_metrics(region, version):
+    scope_df = router.region_view(region)
+    return {
+        "total": len(scope_df),
+        "today": int((scope_df['assigned_date'] == str(datetime.date.today())).sum()),
+        "pending": int(scope_df['status'].str.contains("Confirmed", na=False).sum()),
+        "recent": scope_df.tail(10)[['request_id', 'name', 'phone', 'status']],
+    }
 
 # ================= AUTH STATE =================
 if 'admin_logged_in' not in st.session_state:
@@ -188,41 +219,55 @@ if st.session_state['admin_logged_in']:
             st.rerun()
 
     # DATA SCOPING
-    df = backend.dm.requests.copy().fillna('')
-    scope_df = df[df['input_city'].str.contains(region, case=False)]
+    data_version = router.version
 
     if nav == "Overview":
         st.markdown(f"## Regional Dashboard: {region}")
         st.markdown("Real-time metrics from the Aadhaar Seva Kendra network.")
         
+        metrics = get_scope_metrics(region, data_version)
         c1, c2, c3, c4 = st.columns(4)
-        c1.metric("Total Requests", len(scope_df))
-        c2.metric("Today's Slot", len(scope_df[scope_df['assigned_date'] == str(datetime.date.today())]))
-        c3.metric("Pending", len(scope_df[scope_df['status'].str.contains("Confirmed")]))
+        c1.metric("Total Requests", metrics["total"])
+        c2.metric("Today's Slot", metrics["today"])
+        c3.metric("Pending", metrics["pending"])
         c4.metric("Operations", "Normal", delta="Online", delta_color="normal")
         
         st.write("")
         st.write("### Recent Activity")
-        st.dataframe(scope_df.tail(10)[['request_id', 'name', 'phone', 'status']], use_container_width=True, hide_index=True)
+        st.dataframe(metrics["recent"], use_container_width=True, hide_index=True)
 
     elif nav == "Analytics":
+        import plotly.express as px # Heavy import, only needed on this tab
+        # Charts read the aggregate cube, so plotly only ever sees category counts
+        cube = get_scope_cube(region, data_version)
         st.subheader("Demographic Insights")
         c1, c2 = st.columns(2)
         with c1:
              st.markdown("<div class='gov-card'><h5>Age Breakdown</h5>", unsafe_allow_html=True)
-             if not scope_df.empty:
-                 fig = px.donut(scope_df, names='age_group', color_discrete_sequence=['#B72025', '#F3A12F', '#0B1E47'], hole=0.6)
+             if not cube.empty:
+                 age_counts = rollup(cube, ['age_group'])
+                 fig = px.pie(age_counts, names='age_group', values='count', color_discrete_sequence=['#B72025', '#F3A12F', '#0B1E47'], hole=0.6)
                  fig.update_layout(showlegend=True, margin=dict(t=0, b=0, l=0, r=0))
                  st.plotly_chart(fig, use_container_width=True)
              st.markdown("</div>", unsafe_allow_html=True)
         with c2:
              st.markdown("<div class='gov-card'><h5>Service Requests</h5>", unsafe_allow_html=True)
-             if not scope_df.empty:
-                fig2 = px.bar(scope_df, x='request_type', color='request_type', color_discrete_sequence=px.colors.qualitative.Prism)
+             if not cube.empty:
+                type_counts = rollup(cube, ['request_type'])
+                fig2 = px.bar(type_counts, x='request_type', y='count', color='request_type', color_discrete_sequence=px.colors.qualitative.Prism)
                 fig2.update_layout(showlegend=False, margin=dict(t=0, b=0, l=0, r=0))
                 st.plotly_chart(fig2, use_container_width=True)
              st.markdown("</div>", unsafe_allow_html=True)
 
+        st.markdown("<div class='gov-card'><h5>Demand Trend</h5>", unsafe_allow_html=True)
+        period = st.radio("Period", ["Daily", "Weekly", "Monthly"], horizontal=True, label_visibility="collapsed")
+        if not cube.empty:
+            trend = rollup(cube, ['request_type'], freq={"Daily": "D", "Weekly": "W", "Monthly": "MS"}[period])
+            fig3 = px.line(trend, x='date', y='count', color='request_type', markers=True, color_discrete_sequence=px.colors.qualitative.Prism)
+            fig3.update_layout(margin=dict(t=0, b=0, l=0, r=0), legend_title_text="")
+            st.plotly_chart(fig3, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
     elif nav == "Emergency":
         col_em, _ = st.columns([1,1])
         with col_em:
@@ -288,7 +333,7 @@ else:
                         age_g = "Child (0-18)" if age < 18 else "Adult (18-60)" if age < 60 else "Senior (60+)"
                         payload = {"name": name, "phone": phone, "age": str(age), "age_group": age_g, "request_type": req, "user_type": "Scheduled", "city": city, "pincode": pin}
                         
-                        res = backend.process_request(payload)
+                        res = router.process_request(payload)
                         if res['success']:
                             d = res['data']
                             st.balloons()
@@ -309,7 +354,9 @@ else:
         with st.expander("🔍 Retrieve Application Status"):
              sid = st.text_input("Enter Request ID (RID)")
              if st.button("Search"):
-                 m = backend.dm.requests[backend.dm.requests['request_id'] == sid]
+                 shard = router.for_request(sid)
+                 m = shard.backend.dm.requests if shard else pd.DataFrame(columns=['request_id'])
+                 m = m[m['request_id'] == sid]
                  if not m.empty:
                      r = m.iloc[0]
                      st.info(f"Status: {r['status']}")
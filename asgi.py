@@ -0,0 +1,208 @@
+"""
+Async serving mode for the same API as server.py.
+
+Run with:  uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Handlers are shared with the Flask app; only the blocking work moves off the event
+loop. Writes (booking, cancel, holds, redistribution) are routed to their shard
+first and run on that shard's single writer thread, so a surge in one state only
+queues behind that state's writes; cross-shard admin jobs (reset, reconcile) have
+a writer of their own. Reads (track, centers, admin data) run on a separate bounded
+pool, so they never queue behind a CSV rewrite.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+import server
+from src.serialization import compress
+from server import router
+
+STATIC_DIR = "static"
+READ_WORKERS = int(os.environ.get("READ_WORKERS", 8))
+
+shard_writers = {code: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"write-{code}") for code in router.shards}
+admin_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="write-admin")
+read_executor = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="read")
+
+class _JSONResponse(JSONResponse):
+    # Match Flask's jsonify: tolerate NaN and non-JSON scalars (dates, numpy ints)
+    def render(self, content):
+        return json.dumps(content, default=str).encode("utf-8")
+
+async def _run(executor, fn, *args):
+    body, status = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    return _JSONResponse(body, status_code=status)
+
+def _writer(shard):
+    # Requests that match no shard fail fast in their handler; run them on the admin writer
+    return admin_writer if shard is None else shard_writers[shard.code]
+
+def _booking_writer(data):
+    return _writer(router.route(data.get("city", ""), data.get("pincode", "")))
+
+async def _json(request):
+    # Bodies that are not a JSON object read as empty, so handlers answer 400, not 500
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+# Frontend
+async def home(request):
+    return FileResponse(os.path.join(STATIC_DIR, "index.html"))
+
+async def admin(request):
+    return FileResponse(os.path.join(STATIC_DIR, "admin.html"))
+
+# API Endpoints
+async def login(request):
+    body, status = server.handle_login(await _json(request))
+    return _JSONResponse(body, status_code=status)
+
+async def book_appointment(request):
+    data = await _json(request)
+    error = server.prepare_booking(data)
+    if error:
+        body, status = error
+        return _JSONResponse(body, status_code=status)
+    # Admit before queueing on the write executor, so a surge waits in the
+    # virtual waiting room rather than in the executor's backlog
+    admitted = server.admit_booking(data)
+    if not admitted.ok:
+        body = admitted.to_dict()
+        return _JSONResponse(body, status_code=429, headers={"Retry-After": str(body["retry_after"])})
+    return await _run(_booking_writer(data), server.handle_book_appointment, data,
+                      request.headers.get("idempotency-key"), admitted)
+
+async def hold_slot(request):
+    data = await _json(request)
+    error = server.prepare_booking(data)
+    if error:
+        body, status = error
+        return _JSONResponse(body, status_code=status)
+    admitted = server.admit_booking(data)
+    if not admitted.ok:
+        body = admitted.to_dict()
+        return _JSONResponse(body, status_code=429, headers={"Retry-After": str(body["retry_after"])})
+    return await _run(_booking_writer(data), server.handle_hold, data, request.headers.get("idempotency-key"), admitted)
+
+async def confirm_hold(request):
+    data = await _json(request)
+    return await _run(_writer(router.for_hold(data.get("hold_id"))), server.handle_hold_confirm, data,
+                      request.headers.get("idempotency-key"))
+
+async def release_hold(request):
+    data = await _json(request)
+    return await _run(_writer(router.for_hold(data.get("hold_id"))), server.handle_hold_release, data)
+
+async def track_request(request):
+    return await _run(read_executor, server.handle_track_request, request.query_params.get("request_id"))
+
+async def location_autocomplete(request):
+    # Trie lookup takes microseconds; answer on the loop
+    params = request.query_params
+    body, status = server.handle_location_autocomplete(params.get("q"), params.get("limit"))
+    return _JSONResponse(body, status_code=status)
+
+async def cancel_request(request):
+    data = await _json(request)
+    shard = router.for_request(data["request_id"]) if data.get("request_id") else None
+    return await _run(_writer(shard), server.handle_cancel, data)
+
+async def get_centers(request):
+    return await _run(read_executor, server.handle_centers)
+
+def _json_bytes(request, body, status=200):
+    # Pre-serialized JSON from a handler, compressed when the client accepts it
+    body, encoding = compress(body, request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, status_code=status, media_type="application/json", headers=headers)
+
+async def get_availability(request):
+    params = request.query_params
+    body, status = await asyncio.get_running_loop().run_in_executor(
+        read_executor, server.handle_availability, params.get("center_id"), params.get("city"))
+    if status != 200:
+        return _JSONResponse(body, status_code=status)
+    return _json_bytes(request, body)
+
+async def get_admin_data(request):
+    body, status = await asyncio.get_running_loop().run_in_executor(
+        read_executor, server.handle_admin_data, await _json(request))
+    return _json_bytes(request, body, status)
+
+async def admin_stream(request):
+    region = request.query_params.get("region", "All")
+    return StreamingResponse(router.events.astream(region), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+async def redistribute_load(request):
+    data = await _json(request)
+    return await _run(_writer(router.for_center(data.get("center_id"))), server.handle_redistribute, data)
+
+async def reconcile_slots(request):
+    return await _run(admin_writer, server.handle_reconcile, await _json(request))
+
+async def queue_walkin(request):
+    return await _run(read_executor, server.handle_queue_walkin, await _json(request))
+
+async def queue_check_in(request):
+    return await _run(read_executor, server.handle_queue_check_in, await _json(request))
+
+async def queue_no_show(request):
+    return await _run(read_executor, server.handle_queue_no_show, await _json(request))
+
+async def queue_serve_next(request):
+    return await _run(read_executor, server.handle_queue_serve_next, await _json(request))
+
+async def queue_board(request):
+    params = request.query_params
+    body, status = await asyncio.get_running_loop().run_in_executor(
+        read_executor, server.handle_queue_board, params.get("center_id"), params.get("limit"))
+    if status != 200:
+        return _JSONResponse(body, status_code=status)
+    etag = f'"{server.board_etag(body)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return _JSONResponse(body, headers={"ETag": etag})
+
+async def reset_system(request):
+    return await _run(admin_writer, server.handle_reset)
+
+app = Starlette(routes=[
+    Route("/", home),
+    Route("/admin", admin),
+    Route("/api/login", login, methods=["POST"]),
+    Route("/api/book_appointment", book_appointment, methods=["POST"]),
+    Route("/api/hold", hold_slot, methods=["POST"]),
+    Route("/api/hold/confirm", confirm_hold, methods=["POST"]),
+    Route("/api/hold/release", release_hold, methods=["POST"]),
+    Route("/api/track_request", track_request, methods=["GET"]),
+    Route("/api/cancel", cancel_request, methods=["POST"]),
+    Route("/api/centers", get_centers, methods=["GET"]),
+    Route("/api/locations/autocomplete", location_autocomplete, methods=["GET"]),
+    Route("/api/availability", get_availability, methods=["GET"]),
+    Route("/api/admin/data", get_admin_data, methods=["POST"]),
+    Route("/api/admin/stream", admin_stream, methods=["GET"]),
+    Route("/api/admin/redistribute", redistribute_load, methods=["POST"]),
+    Route("/api/admin/reconcile", reconcile_slots, methods=["POST"]),
+    Route("/api/queue/walkin", queue_walkin, methods=["POST"]),
+    Route("/api/queue/check_in", queue_check_in, methods=["POST"]),
+    Route("/api/queue/no_show", queue_no_show, methods=["POST"]),
+    Route("/api/queue/serve_next", queue_serve_next, methods=["POST"]),
+    Route("/api/queue/board", queue_board, methods=["GET"]),
+    Route("/api/reset", reset_system, methods=["POST"]),
+    Mount("/", StaticFiles(directory=STATIC_DIR)),
+])
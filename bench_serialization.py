@@ -0,0 +1,67 @@
+"""
+Benchmarks the admin data encoding paths on synthetic requests.
+
+Compares the old path (fillna copy, to_dict per row, stdlib json) with the
+column-wise path used by /api/admin/data, then the bytes on the wire for each
+content encoding the server negotiates:
+    python bench_serialization.py --rows 50 500 5000 --repeat 20
+"""
+import argparse
+import datetime
+import gzip
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_manager import DEFAULT_CENTERS
+from src.datagen import generate_chunk
+from src.serialization import brotli, compress, frame_to_json, orjson, with_fields
+
+def _frame(rows, seed):
+    centers = pd.DataFrame(DEFAULT_CENTERS)
+    today = datetime.date.today()
+    requests, _ = generate_chunk(centers, today, max(1, rows // 2000 + 1), today, seed, 0)
+    df = requests.head(rows).copy()
+    # Legacy rows often lack the personal columns
+    gaps = np.random.default_rng(seed).random(len(df)) < 0.1
+    df.loc[gaps, ["name", "phone", "age", "age_group"]] = np.nan
+    return df
+
+def _old_path(df):
+    logs = df.fillna('').to_dict(orient='records')
+    return json.dumps({'total_req': len(df), 'logs': logs}, default=str).encode()
+
+def _new_path(df):
+    return with_fields({'total_req': len(df)}, logs=frame_to_json(df))
+
+def _time(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, out
+
+def run(row_counts, repeat, seed):
+    print(f"orjson: {'yes' if orjson else 'no'} | brotli: {'yes' if brotli else 'no'} | best of {repeat}")
+    print(f"{'rows':>7}{'old ms':>10}{'new ms':>10}{'speedup':>9}{'raw KB':>10}{'gzip KB':>10}{'br KB':>10}{'gzip ms':>9}{'br ms':>9}")
+    for rows in row_counts:
+        df = _frame(rows, seed)
+        old_ms, _ = _time(_old_path, df, repeat)
+        new_ms, body = _time(_new_path, df, repeat)
+        gz = len(gzip.compress(body, compresslevel=5))
+        br = len(compress(body, "br")[0]) if brotli else float("nan")
+        gz_ms, _ = _time(lambda b: compress(b, "gzip"), body, repeat)
+        br_ms, _ = _time(lambda b: compress(b, "br"), body, repeat) if brotli else (float("nan"), None)
+        print(f"{rows:>7}{old_ms:>10.2f}{new_ms:>10.2f}{old_ms / new_ms:>8.1f}x{len(body) / 1024:>10.1f}"
+              f"{gz / 1024:>10.1f}{br / 1024:>10.1f}{gz_ms:>9.1f}{br_ms:>9.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500, 5000, 50000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.rows, args.repeat, args.seed)
@@ -0,0 +1,60 @@
+"""Shared pytest fixtures: a simulated clock, single-center backends, residents and the Flask app."""
+import datetime
+import importlib
+import os
+import shutil
+import sys
+
+import pytest
+
+from src.backend import CrowdSystemBackend
+from src.data_manager import DataManager
+from src.simulation import SimClock
+
+# Tracked unsharded sample: requests across every state
+LEGACY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+@pytest.fixture
+def clock():
+    """Monday 2026-01-05, an hour before the centers open; tests move clock.now forward."""
+    return SimClock(datetime.datetime(2026, 1, 5, 8, 0))
+
+@pytest.fixture
+def make_backend(tmp_path, clock):
+    """
+    Builds a backend over one New Delhi center ("C1"). capacity_per_hour=2
+    leaves one scheduled place per hourly slot once the walk-in buffer is held
+    back. Calls with the same data_dir model a restart.
+    """
+    def make(capacity=2, horizon_days=1, data_dir=None):
+        centers = [{"center_id": "C1", "name": "Test Center", "city": "New Delhi", "pincode": "110001",
+                    "capacity_per_hour": capacity}]
+        dm = DataManager(str(data_dir or tmp_path), centers=centers)
+        return CrowdSystemBackend(horizon_days=horizon_days, data_manager=dm, clock=clock)
+    return make
+
+@pytest.fixture
+def resident():
+    """Booking form for resident i at C1, with any field overridden."""
+    def make(i, **overrides):
+        details = {"request_type": "eKYC", "user_type": "Scheduled", "city": "New Delhi", "pincode": "110001",
+                   "name": f"Resident {i}", "phone": f"98{i:08d}", "age": 30, "age_group": "Adult (18-60)"}
+        details.update(overrides)
+        return details
+    return make
+
+@pytest.fixture
+def legacy_data(tmp_path):
+    """A copy of the tracked unsharded requests.csv / slots.csv pair."""
+    for name in ("requests.csv", "slots.csv"):
+        shutil.copy(os.path.join(LEGACY_DIR, name), tmp_path)
+    return str(tmp_path)
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """The Flask app module over data/ in tmp_path (empty unless a test fills it first)."""
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop("server", None)
+    module = importlib.import_module("server")
+    yield module
+    sys.modules.pop("server", None)
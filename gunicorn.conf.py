@@ -0,0 +1,27 @@
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+The app is imported once in the master (preload_app), which loads the CSVs and
+builds every shard's slot index before any worker exists. Workers are forked from that
+warm process and share its pages copy-on-write instead of each parsing and
+indexing the data again. gc.freeze() moves everything loaded so far out of
+the collector's reach, so collections in a worker don't write to (and thereby
+copy) the shared pages.
+
+Note that each worker still applies bookings to its own copy of the data, so
+run more than one worker only for read-heavy deployments.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 64))
+preload_app = os.environ.get("PRELOAD_APP", "1") != "0"
+
+def when_ready(server):
+    if preload_app:
+        import server as app_module
+        app_module.router.preload()
+        gc.freeze()
@@ -0,0 +1,133 @@
+"""
+Mixed read/write load test for the booking API.
+
+Compare the two serving modes against the same data:
+    gunicorn server:app -w 2 -b 127.0.0.1:5000          (sync workers)
+    uvicorn asgi:app --port 5000                         (async mode)
+    python load_test.py --url http://127.0.0.1:5000 --clients 32 --seconds 20
+
+Reports throughput and latency percentiles separately for bookings and for
+reads (track / centers / admin data), since the point of the async mode is that
+reads stop queueing behind booking writes.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+CITIES = {
+    "New Delhi": "110001",
+    "Mumbai": "400014",
+    "Bengaluru": "560038",
+    "Noida": "201301",
+    "Ghaziabad": "201002",
+    "Gurugram": "122002"
+}
+
+def _call(url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def run(base_url, clients, seconds, write_ratio):
+    api = base_url.rstrip("/") + "/api"
+    stats = {"book": [], "read": []}
+    errors = {"book": 0, "read": 0}
+    waiting_room = {"book": 0, "read": 0}  # 429s from admission control
+    known_ids = []
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        retry = None
+        while time.time() < deadline:
+            if retry:
+                kind, call = retry
+                retry = None
+            elif rng.random() < write_ratio:
+                kind = "book"
+                city = rng.choice(list(CITIES))
+                payload = {
+                    "name": f"Load Test {seed}",
+                    "phone": f"98{rng.randint(10000000, 99999999)}",
+                    "age": str(rng.randint(5, 80)),
+                    "request_type": "Biometric Update",
+                    "user_type": "Scheduled",
+                    "city": city,
+                    "pincode": CITIES[city]
+                }
+                call = (f"{api}/book_appointment", payload)
+            else:
+                kind = "read"
+                choice = rng.random()
+                if choice < 0.4 and known_ids:
+                    call = (f"{api}/track_request?request_id={rng.choice(known_ids)}", None)
+                elif choice < 0.7:
+                    call = (f"{api}/centers", None)
+                else:
+                    call = (f"{api}/admin/data", {"region": rng.choice(list(CITIES)), "status": "All", "age_group": "All"})
+
+            start = time.perf_counter()
+            status, body = _call(*call)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            pause = 0
+            with lock:
+                if status >= 500:
+                    errors[kind] += 1
+                    continue
+                if status == 429:
+                    # Waiting room: keep the ticket and retry after the server's hint
+                    waiting_room[kind] += 1
+                    result = json.loads(body)
+                    call[1]["waiting_room_ticket"] = result.get("ticket")
+                    retry = (kind, call)
+                    pause = result.get("retry_after", 1)
+                else:
+                    stats[kind].append(elapsed)
+                    if kind == "book":
+                        result = json.loads(body)
+                        if result.get("success"):
+                            known_ids.append(result["data"]["request_id"])
+            if pause:
+                time.sleep(min(pause, max(0, deadline - time.time())))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    started = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.time() - started
+
+    print(f"Target: {base_url} | clients={clients} | duration={wall:.1f}s | write_ratio={write_ratio}")
+    print(f"{'kind':<6}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'429s':>8}")
+    for kind in ("book", "read"):
+        lat = stats[kind]
+        print(f"{kind:<6}{len(lat):>8}{len(lat) / wall:>10.1f}{_percentile(lat, 50):>10.1f}"
+              f"{_percentile(lat, 95):>10.1f}{_percentile(lat, 99):>10.1f}{errors[kind]:>8}{waiting_room[kind]:>8}")
+    total = len(stats["book"]) + len(stats["read"])
+    print(f"total throughput: {total / wall:.1f} req/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=int, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+    run(args.url, args.clients, args.seconds, args.write_ratio)
@@ -0,0 +1,47 @@
+"""
+Rebuilds slot occupancy from requests and reports where slots.csv drifted.
+
+Checks every shard directory under data/ (and an unsharded requests.csv /
+slots.csv pair the server has not imported yet, e.g. bulk-seeded output):
+    python reconcile_slots.py
+    python reconcile_slots.py --data-dir /tmp/loadtest_data --apply --show 20
+
+While the server is running, use POST /api/admin/reconcile {"apply": true}
+instead, so the live process rebuilds under its shard locks rather than
+having its in-memory slots overwrite this script's output.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from src.data_manager import DATA_DIR, table_dirs
+from src.reconcile import reconcile
+
+def run(data_dir, apply, show):
+    for path in table_dirs(data_dir):
+        start = time.perf_counter()
+        requests = pd.read_csv(os.path.join(path, "requests.csv"), low_memory=False)
+        slots_file = os.path.join(path, "slots.csv")
+        slots = pd.read_csv(slots_file) if os.path.exists(slots_file) else pd.DataFrame()
+        loaded = time.perf_counter()
+        rebuilt, mismatches, summary = reconcile(requests, slots)
+        done = time.perf_counter()
+
+        print(f"{path}: read {loaded - start:.2f}s, reconciled {done - loaded:.2f}s")
+        for key, value in summary.items():
+            print(f"  {key:<22}{value:>12,}")
+        if show and not mismatches.empty:
+            print(mismatches.head(show).to_string(index=False))
+        if apply and (summary["mismatched_slots"] or summary["duplicate_rows"]):
+            rebuilt.to_csv(slots_file, index=False)
+            print(f"  rewrote {slots_file} ({len(rebuilt):,} slots)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--apply", action="store_true", help="Replace slots.csv with the rebuilt occupancy")
+    parser.add_argument("--show", type=int, default=10, help="Mismatched slots to print per directory")
+    args = parser.parse_args()
+    run(args.data_dir, args.apply, args.show)
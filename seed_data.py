@@ -1,80 +1,104 @@
-import random
+"""
+Seeds data/ with synthetic requests and slot occupancy.
+
+Bulk mode (default) generates both tables directly in the storage format, in
+vectorized day chunks, bypassing the per-booking path:
+    python seed_data.py --days 365 --past-days 30 --seed 7
+    python seed_data.py --days 1000 --load 0.9 --out /tmp/loadtest_data
+
+Bulk output is written unsharded; the server splits it into its per-state
+shard directories the next time it starts.
+
+Per-booking mode runs every record through the shard router, which is
+slow (each booking rewrites both CSVs) but exercises the real allocator:
+    python seed_data.py --via-backend 50
+"""
+import argparse
 import datetime
-from src.backend import CrowdSystemBackend
-from src.utils import generate_request_id, get_current_time
+import random
+import time
 
-# Setup
-backend = CrowdSystemBackend()
+from src.data_manager import DATA_DIR
+from src.datagen import NAMES, SURNAMES, generate_dataset
 
 CITIES = ["New Delhi", "Mumbai", "Bengaluru", "Noida", "Ghaziabad", "Gurugram"]
 PINCODES = {
     "New Delhi": "110001",
-    "Mumbai": "400014", 
+    "Mumbai": "400014",
     "Bengaluru": "560038",
     "Noida": "201301",
     "Ghaziabad": "201002",
     "Gurugram": "122002"
 }
 
-NAMES = ["Aarav", "Vihaan", "Aditya", "Sai", "Ishaan", "Diya", "Ananya", "Saanvi", "Aditi", "Priya", "Rahul", "Amit", "Sneha", "Kavita"]
-SURNAMES = ["Sharma", "Verma", "Gupta", "Singh", "Patel", "Kumar", "Reddy", "Nair", "Iyer"]
-
 SERVICES = ["New Enrollment", "Biometric Update", "Demographic Update", "eKYC"]
-STATUSES = ["Confirmed", "Pending", "Completed"]
 
 def seed_data(count=50):
+    """Per-booking seeding through the live allocator (small datasets only)."""
+    from src.sharding import ShardRouter, backend_settings
+    router = ShardRouter(**backend_settings())
     print(f"Seeding {count} records...")
-    
-    data_list = []
-    
+
     for _ in range(count):
         city = random.choice(CITIES)
         pincode = PINCODES[city]
-        
+
         # Random User Details
         name = f"{random.choice(NAMES)} {random.choice(SURNAMES)}"
         phone = f"98{random.randint(10000000, 99999999)}"
         age = random.randint(5, 80)
-        
+
         # Determine Age Group (Reuse logic or just string)
         if age < 18: age_group = "Child (0-18)"
         elif age < 60: age_group = "Adult (18-60)"
         else: age_group = "Senior (60+)"
-        
-        req_type = random.choice(SERVICES)
-        
-        # Create Request Object
-        # We manually inject because we want to fake "past" data too maybe? 
-        # Actually easier to just use the backend.process_request but that gives Future slots.
-        # Let's manually construct to have some variety in dates.
-        
-        assigned_date = datetime.date.today() + datetime.timedelta(days=random.randint(0, 5))
-        
+
         booking = {
             "name": name,
             "phone": phone,
             "age": str(age),
             "age_group": age_group,
-            "request_type": req_type,
+            "request_type": random.choice(SERVICES),
             "user_type": "Scheduled",
             "city": city,
             "pincode": pincode
         }
-        
+
         # Let backend handle slot finding to ensure consistency
-        res = backend.process_request(booking)
-        
+        res = router.process_request(booking)
+
         if res['success']:
             # Manually tweak status for demo variety
             if random.random() < 0.3:
-                # Hack: Update the last inserted row to be 'Completed'
-                idx = backend.dm.requests.index[-1]
-                backend.dm.requests.at[idx, 'status'] = 'Completed'
-                
+                dm = router.for_request(res['data']['request_id']).backend.dm
+                dm.requests.at[dm.requests.index[-1], 'status'] = 'Completed'
+
             print(f"Created: {name} in {city}")
 
-    backend.dm.save_requests()
+    for shard in router:
+        shard.backend.dm.save_requests()
     print("Seeding Complete!")
 
 if __name__ == "__main__":
-    seed_data()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--via-backend", type=int, metavar="COUNT", help="Seed COUNT bookings through process_request instead")
+    parser.add_argument("--out", default=DATA_DIR, help="Output directory (default: data)")
+    parser.add_argument("--days", type=int, default=30, help="Number of days to generate")
+    parser.add_argument("--past-days", type=int, default=0, help="How many of those days lie before today (marked Completed)")
+    parser.add_argument("--load", type=float, default=0.7, help="Demand relative to center capacity")
+    parser.add_argument("--walkin-share", type=float, default=0.25)
+    parser.add_argument("--slot-minutes", type=int, default=60)
+    parser.add_argument("--chunk-days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.via_backend:
+        seed_data(args.via_backend)
+    else:
+        today = datetime.date.today()
+        start = today - datetime.timedelta(days=args.past_days)
+        started = time.time()
+        n_requests, n_slots = generate_dataset(args.out, start, args.days, today=today, seed=args.seed,
+                                               chunk_days=args.chunk_days, load=args.load,
+                                               walkin_share=args.walkin_share, slot_minutes=args.slot_minutes)
+        print(f"Wrote {n_requests} requests and {n_slots} slot rows to {args.out}/ in {time.time() - started:.1f}s")
@@ -1,9 +1,15 @@
-from flask import Flask, jsonify, request, send_from_directory
-from src.backend import CrowdSystemBackend
+from flask import Flask, Response, jsonify, request, send_from_directory
+from src.sharding import ShardRouter, backend_settings
+from src.admission import AdmissionController
+from src.serialization import compress, frame_to_json, with_fields
+import datetime
 import os
+import pandas as pd
 
 app = Flask(__name__, static_folder='static')
-backend = CrowdSystemBackend()
+# One backend per state shard; each shard has its own data, indexes and write lock.
+# Horizon and slot length come from the environment (e.g. HORIZON_DAYS=60 SLOT_MINUTES=15)
+router = ShardRouter(**backend_settings())
 
 # Serve Frontend
 @app.route('/')
@@ -18,10 +24,28 @@ def admin():
 def serve_static(path):
     return send_from_directory(app.static_folder, path)
 
-# API Endpoints
-@app.route('/api/login', methods=['POST'])
-def login():
-    data = request.json
+# API Handlers
+# Plain functions returning (body, status) so the same logic backs both the
+# Flask routes below and the async serving mode in asgi.py.
+
+# Rate limits per city/pincode plus a bounded gate per shard in front of the
+# booking path, so one state's surge never sends another state to the waiting room
+admission = {code: AdmissionController() for code in router.shards}
+
+MAX_ADMIN_LOGS = 5000 # Cap on rows an admin data request may ask for
+# Each SSE client holds a gthread worker thread for its whole connection; keep most
+# threads for the API. The async server (asgi.py) streams without threads and has no cap.
+MAX_THREAD_STREAMS = int(os.environ.get("MAX_THREAD_STREAMS", max(1, int(os.environ.get("GUNICORN_THREADS", 64)) // 4)))
+
+def parse_limit(value, default, maximum, minimum=1):
+    """Clamps a client-supplied limit; missing or non-numeric values fall back to the default."""
+    try:
+        value = default if value in (None, '') else int(value)
+    except (TypeError, ValueError):
+        value = default
+    return max(minimum, min(value, maximum))
+
+def handle_login(data):
     username = data.get('username')
     password = data.get('password')
     
@@ -35,54 +59,121 @@ def login():
             
             # Region scope is primarily the city, but we pass pincode too if needed
             # For this demo, let's use City as the primary region filter label
-            return jsonify({
+            return {
                 'success': True, 
                 'token': f'token_{username}', 
                 'region': city,
                 'pincode_scope': pincode
-            })
+            }, 200
         else:
-            return jsonify({'success': False, 'message': 'Invalid Username Format. Use admin_<city>_<code (e.g. admin_delhi_110001)'}), 400
+            return {'success': False, 'message': 'Invalid Username Format. Use admin_<city>_<code (e.g. admin_delhi_110001)'}, 400
     else:
-        return jsonify({'success': False, 'message': 'Invalid Credentials'}), 401
+        return {'success': False, 'message': 'Invalid Credentials'}, 401
 
-@app.route('/api/book_appointment', methods=['POST'])
-def book_appointment():
+def handle_book_appointment(data, idempotency_key=None, admitted=None):
+    """
+    admitted: an Admission already granted by the caller (the async server
+    admits on the event loop before handing off to its write executor).
+    """
     try:
-        data = request.json
-        # Validate input
-        required_fields = ['request_type', 'user_type', 'city', 'pincode', 'name', 'phone', 'age']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'success': False, 'message': f'Missing field: {field}'}), 400
-
-        # Determine Age Group
-        try:
-            age = int(data['age'])
-            if age < 18: age_group = "Child (0-18)"
-            elif age < 60: age_group = "Adult (18-60)"
-            else: age_group = "Senior (60+)"
-        except:
-             age_group = "Unknown"
-        
-        data['age_group'] = age_group
+        error = prepare_booking(data)
+        if error:
+            return error
+
+        # Clients send one key per booking attempt so network retries replay the original
+        idempotency_key = idempotency_key or data.get('idempotency_key')
+
+        # Surges get a waiting-room ticket and a retry hint instead of piling onto the lock
+        if admitted is None:
+            admitted = admit_booking(data)
+            if not admitted.ok:
+                return admitted.to_dict(), 429
 
-        result = backend.process_request(data)
-        return jsonify(result)
+        result = router.process_request(data, idempotency_key=idempotency_key)
+        return result, 200
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
+        return {'success': False, 'message': str(e)}, 500
+    finally:
+        if admitted is not None:
+            admitted.release()
 
-@app.route('/api/track_request', methods=['GET'])
-def track_request():
-    req_id = request.args.get('request_id')
+def handle_hold(data, idempotency_key=None, admitted=None):
+    """First phase of a two-phase booking: reserves a slot for a few minutes. Admitted like a booking."""
+    try:
+        error = prepare_booking(data)
+        if error:
+            return error
+        if admitted is None:
+            admitted = admit_booking(data)
+            if not admitted.ok:
+                return admitted.to_dict(), 429
+        shard = router.route(data['city'], data['pincode'])
+        with shard.lock:
+            result = shard.backend.hold_slot(data, idempotency_key=idempotency_key or data.get('idempotency_key'))
+        # Lapsed holds are released off the request path, never by availability reads
+        router.ensure_hold_sweeper()
+        return result, 200
+    except Exception as e:
+        return {'success': False, 'message': str(e)}, 500
+    finally:
+        if admitted is not None:
+            admitted.release()
+
+def handle_hold_confirm(data, idempotency_key=None):
+    hold_id = data.get('hold_id')
+    shard = router.for_hold(hold_id) if hold_id else None
+    if shard is None:
+        return {'success': False, 'message': 'Hold not found or expired. Please book again.'}, 404
+    with shard.lock:
+        result = shard.backend.confirm_hold(hold_id, idempotency_key=idempotency_key or data.get('idempotency_key'))
+    return result, 200 if result['success'] else 410
+
+def handle_hold_release(data):
+    hold_id = data.get('hold_id')
+    shard = router.for_hold(hold_id) if hold_id else None
+    if shard is None:
+        return {'success': False, 'message': 'Hold not found or expired.'}, 404
+    with shard.lock:
+        result = shard.backend.release_hold(hold_id)
+    return result, 200 if result['success'] else 410
+
+def prepare_booking(data):
+    """Validates a booking form and derives its age group in place. Returns an error response or None."""
+    if not isinstance(data, dict):
+        return {'success': False, 'message': 'Request body must be a JSON object'}, 400
+    required_fields = ['request_type', 'user_type', 'city', 'pincode', 'name', 'phone', 'age']
+    for field in required_fields:
+        if field not in data:
+            return {'success': False, 'message': f'Missing field: {field}'}, 400
+
+    # Determine Age Group
+    try:
+        age = int(data['age'])
+        if age < 18: age_group = "Child (0-18)"
+        elif age < 60: age_group = "Adult (18-60)"
+        else: age_group = "Senior (60+)"
+    except:
+         age_group = "Unknown"
+
+    data['age_group'] = age_group
+    return None
+
+def admit_booking(data):
+    shard = router.route(data.get('city', ''), data.get('pincode', ''))
+    return admission[shard.code].admit(data.get('city', ''), data.get('pincode', ''), ticket=data.get('waiting_room_ticket'))
+
+def handle_track_request(req_id):
     if not req_id:
-        return jsonify({'success': False, 'message': 'Request ID Required'}), 400
+        return {'success': False, 'message': 'Request ID Required'}, 400
         
-    req_df = backend.dm.requests
+    shard = router.for_request(req_id)
+    if shard is None:
+         return {'success': False, 'message': 'Request ID not found.'}, 404
+    req_df = shard.backend.dm.requests
     match = req_df[req_df['request_id'] == req_id]
     
     if match.empty:
-         return jsonify({'success': False, 'message': 'Request ID not found.'}), 404
+         return {'success': False, 'message': 'Request ID not found.'}, 404
          
     # Return status details
     record = match.iloc[0].to_dict()
@@ -95,76 +186,308 @@ def track_request():
         'assigned_time_slot': record['assigned_time_slot'],
         'name': record['name'] # Verify identity
     }
-    return jsonify({'success': True, 'data': filtered_response})
+    return {'success': True, 'data': filtered_response}, 200
 
-@app.route('/api/centers', methods=['GET'])
-def get_centers():
-    centers_df = backend.get_all_centers()
-    centers_list = centers_df.to_dict(orient='records')
-    return jsonify(centers_list)
+def handle_cancel(data):
+    req_id = data.get('request_id')
+    if not req_id:
+        return {'success': False, 'message': 'Request ID Required'}, 400
+    shard = router.for_request(req_id)
+    if shard is None:
+        return {'success': False, 'message': 'Request ID not found.'}, 404
+    with shard.lock:
+        result = shard.backend.cancel_request(req_id, data.get('phone'))
+    return result, 200 if result['success'] else 409
 
-@app.route('/api/admin/data', methods=['POST'])
-def get_admin_data():
+def handle_centers():
+    centers_df = router.centers()
+    return centers_df.to_dict(orient='records'), 200
+
+def handle_location_autocomplete(query, limit=None):
+    if not query:
+        return {'success': True, 'suggestions': []}, 200
+    limit = parse_limit(limit, 8, 8)
+    return {'success': True, 'suggestions': router.locations.autocomplete(query, limit)}, 200
+
+def handle_availability(center_id=None, city=None):
+    """
+    Remaining capacity heatmaps. Returns pre-serialized JSON bytes on success,
+    so the route can send them without re-encoding.
     """
-    Returns data filtered by admin region and other filters.
+    centers = router.centers()
+    if center_id:
+        centers = centers[centers['center_id'] == center_id]
+    if city:
+        city = router.locations.resolve_city(city) or city
+        centers = centers[centers['city'].str.lower() == city.lower()]
+    if centers.empty:
+        return {'success': False, 'message': 'No matching center.'}, 404
+    parts = []
+    for shard in router:
+        ids = [cid for cid in centers['center_id'] if router.for_center(cid) is shard]
+        if ids:
+            parts.extend(shard.backend.get_availability(ids))
+    return b"[" + b",".join(parts) + b"]", 200
+
+def handle_admin_data(data):
+    """
+    Returns data filtered by admin region and other filters, as pre-serialized
+    JSON bytes. 'limit' sets how many of the latest logs to include.
     """
-    data = request.json
     region = data.get('region', 'All') # User's admin region
     filter_status = data.get('status', 'All')
     filter_age = data.get('age_group', 'All')
     
-    req_df = backend.dm.requests.fillna('') # Handle NaNs
-    
-    # 1. Region Filter (Search in City or Center Name)
-    if region != 'All':
-        # Simple match: if region string is in city name
-        req_df = req_df[req_df['input_city'].str.contains(region, case=False, na=False)]
-        
-    # 2. Status Filter
-    if filter_status == 'Pending':
-        req_df = req_df[req_df['status'] == 'Confirmed'] # Confirmed means booked but future (Pending work)
-    elif filter_status == 'Done':
-        # In this demo, nothing is marked 'Done' yet, but let's simulate
-        # Maybe "past dates" could be considered done? 
-        # For now, just string match if we had a status 'Completed'
-        req_df = req_df[req_df['status'] == 'Completed']
-        
-    # 3. Age Filter
-    if filter_age != 'All':
-        req_df = req_df[req_df['age_group'] == filter_age]
-        
-    # Stats Calculation on Filtered Data
-    total_req = len(req_df)
-    import datetime
+    limit = parse_limit(data.get('limit'), 50, MAX_ADMIN_LOGS)
     today_str = str(datetime.date.today())
-    today_req = len(req_df[req_df['assigned_date'] == today_str])
-    
-    overload_redirects = len(req_df[req_df['status'].str.contains("Rescheduled", na=False) | req_df['status'].str.contains("De-congested", na=False)])
+
+    # Each shard is filtered and counted on its own; only the top logs are merged
+    total_req = today_req = overload_redirects = 0
+    latest = []
+    for shard in router.for_region(region):
+        # 1. Region Filter (Search in City or Center Name)
+        req_df = shard.backend.dm.get_region_view(region)
+            
+        # 2. Status Filter
+        if filter_status == 'Pending':
+            req_df = req_df[req_df['status'] == 'Confirmed'] # Confirmed means booked but future (Pending work)
+        elif filter_status == 'Done':
+            # In this demo, nothing is marked 'Done' yet, but let's simulate
+            # Maybe "past dates" could be considered done? 
+            # For now, just string match if we had a status 'Completed'
+            req_df = req_df[req_df['status'] == 'Completed']
+            
+        # 3. Age Filter
+        if filter_age != 'All':
+            req_df = req_df[req_df['age_group'] == filter_age]
+            
+        # Stats Calculation on Filtered Data
+        total_req += len(req_df)
+        today_req += len(req_df[req_df['assigned_date'] == today_str])
+        overload_redirects += len(req_df[req_df['status'].str.contains("Rescheduled", na=False) | req_df['status'].str.contains("De-congested", na=False)])
+        latest.append(req_df.sort_values(by="timestamp", ascending=False).head(limit))
     
-    # Tables
-    logs = req_df.sort_values(by="timestamp", ascending=False).head(50).to_dict(orient='records')
+    # Tables, encoded column-wise straight to JSON (NaN -> null, no per-row dicts)
+    logs = pd.concat(latest, ignore_index=True) if len(latest) > 1 else latest[0]
+    logs = logs.sort_values(by="timestamp", ascending=False).head(limit)
     
-    return jsonify({
+    return with_fields({
         'total_req': total_req,
         'today_req': today_req,
-        'overload_redirects': overload_redirects,
-        'logs': logs
-    })
+        'overload_redirects': overload_redirects
+    }, logs=frame_to_json(logs)), 200
 
-@app.route('/api/admin/redistribute', methods=['POST'])
-def redistribute_load():
-    data = request.json
+def handle_redistribute(data):
     target_center_id = data.get('center_id')
     if not target_center_id:
-         return jsonify({'success': False, 'message': 'Missing center_id'}), 400
+         return {'success': False, 'message': 'Missing center_id'}, 400
+    shard = router.for_center(target_center_id)
+    if shard is None:
+        return {'success': False, 'message': 'Unknown center_id'}, 404
          
-    count = backend.process_admin_redistribution(target_center_id)
-    return jsonify({'success': True, 'count': count, 'message': f'{count} appointments shifted to tomorrow.'})
+    with shard.lock:
+        count = shard.backend.process_admin_redistribution(target_center_id)
+    return {'success': True, 'count': count, 'message': f'{count} appointments shifted to tomorrow.'}, 200
+
+def handle_reconcile(data):
+    """Rebuilds slot occupancy from requests per shard and reports the drift found."""
+    data = data or {}
+    limit = parse_limit(data.get('limit'), 50, MAX_ADMIN_LOGS, minimum=0)
+    shards = {}
+    for code, (mismatches, summary) in router.reconcile(apply=bool(data.get('apply'))).items():
+        shards[code] = {'summary': summary, 'mismatches': mismatches.head(limit).to_dict(orient='records')}
+    return {'success': True, 'shards': shards}, 200
+
+def handle_reset():
+    router.reset()
+    return {'success': True, 'message': 'System data reset successfully.'}, 200
+
+# Walk-in token queue (center display boards and counters)
+def handle_queue_walkin(data):
+    center_id = data.get('center_id')
+    if not center_id:
+        return {'success': False, 'message': 'Missing center_id'}, 400
+    shard = router.for_center(center_id)
+    if shard is None:
+        return {'success': False, 'message': 'Unknown center_id'}, 404
+    token = shard.backend.queues.issue_walkin(center_id, data.get('name', ''))
+    return {'success': True, 'token': token}, 200
+
+def handle_queue_check_in(data):
+    if not data.get('request_id'):
+        return {'success': False, 'message': 'Request ID Required'}, 400
+    shard = router.for_request(data['request_id'])
+    if shard is None:
+        return {'success': False, 'message': 'Request ID not found.'}, 404
+    result = shard.backend.check_in(data['request_id'])
+    return result, 200 if result['success'] else 404
+
+def handle_queue_no_show(data):
+    if not data.get('request_id'):
+        return {'success': False, 'message': 'Request ID Required'}, 400
+    shard = router.for_request(data['request_id'])
+    if shard is None:
+        return {'success': False, 'message': 'Request ID not found.'}, 404
+    return shard.backend.mark_no_show(data['request_id']), 200
+
+def handle_queue_serve_next(data):
+    center_id = data.get('center_id')
+    if not center_id:
+        return {'success': False, 'message': 'Missing center_id'}, 400
+    shard = router.for_center(center_id)
+    if shard is None:
+        return {'success': False, 'message': 'Unknown center_id'}, 404
+    served = shard.backend.queues.serve_next(center_id)
+    if served is None:
+        return {'success': False, 'message': 'Queue is empty.'}, 200
+    return {'success': True, 'served': served}, 200
+
+def handle_queue_board(center_id, limit):
+    if not center_id:
+        return {'success': False, 'message': 'Missing center_id'}, 400
+    shard = router.for_center(center_id)
+    if shard is None:
+        return {'success': False, 'message': 'Unknown center_id'}, 404
+    return shard.backend.queues.board(center_id, limit=parse_limit(limit, 10, 50)), 200
+
+def board_etag(board):
+    # ETAs drift with the clock, so the tag changes with the queue version and the minute
+    return f"{board['center_id']}-{board['date']}-{board['version']}-{datetime.datetime.now():%H%M}"
+
+# API Endpoints
+@app.route('/api/login', methods=['POST'])
+def login():
+    body, status = handle_login(request.json)
+    return jsonify(body), status
+
+@app.route('/api/book_appointment', methods=['POST'])
+def book_appointment():
+    body, status = handle_book_appointment(request.json, request.headers.get('Idempotency-Key'))
+    headers = {'Retry-After': str(body['retry_after'])} if status == 429 else {}
+    return jsonify(body), status, headers
+
+@app.route('/api/hold', methods=['POST'])
+def hold_slot():
+    body, status = handle_hold(request.json, request.headers.get('Idempotency-Key'))
+    headers = {'Retry-After': str(body['retry_after'])} if status == 429 else {}
+    return jsonify(body), status, headers
+
+@app.route('/api/hold/confirm', methods=['POST'])
+def confirm_hold():
+    body, status = handle_hold_confirm(request.json, request.headers.get('Idempotency-Key'))
+    return jsonify(body), status
+
+@app.route('/api/hold/release', methods=['POST'])
+def release_hold():
+    body, status = handle_hold_release(request.json)
+    return jsonify(body), status
+
+@app.route('/api/track_request', methods=['GET'])
+def track_request():
+    body, status = handle_track_request(request.args.get('request_id'))
+    return jsonify(body), status
+
+@app.route('/api/cancel', methods=['POST'])
+def cancel_request():
+    body, status = handle_cancel(request.json)
+    return jsonify(body), status
+
+@app.route('/api/centers', methods=['GET'])
+def get_centers():
+    body, status = handle_centers()
+    return jsonify(body), status
+
+@app.route('/api/locations/autocomplete', methods=['GET'])
+def location_autocomplete():
+    body, status = handle_location_autocomplete(request.args.get('q'), request.args.get('limit'))
+    return jsonify(body), status
+
+def json_bytes_response(body):
+    """Sends pre-serialized JSON, compressed when the client accepts it."""
+    body, encoding = compress(body, request.headers.get('Accept-Encoding'))
+    response = Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.route('/api/availability', methods=['GET'])
+def get_availability():
+    body, status = handle_availability(request.args.get('center_id'), request.args.get('city'))
+    if status != 200:
+        return jsonify(body), status
+    return json_bytes_response(body)
+
+@app.route('/api/admin/data', methods=['POST'])
+def get_admin_data():
+    body, status = handle_admin_data(request.json)
+    return json_bytes_response(body), status
+
+@app.route('/api/admin/stream', methods=['GET'])
+def admin_stream():
+    """
+    Server-sent events with live deltas for the admin dashboard:
+    'booking' (new request row), 'status' (an existing row changed, with its
+    'previous' fields), 'slot' (center/hour occupancy) and 'redistribution'.
+    """
+    region = request.args.get('region', 'All')
+    q = router.events.subscribe(region, limit=MAX_THREAD_STREAMS)
+    if q is None:
+        return jsonify({'success': False, 'message': 'Too many live dashboards open. Falling back to polling.'}), 503, \
+            {'Retry-After': '30'}
+    response = Response(router.events.stream(region, q=q), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Frees the reservation even if the client leaves before the stream starts
+    response.call_on_close(lambda: router.events.unsubscribe(q))
+    return response
+
+@app.route('/api/admin/redistribute', methods=['POST'])
+def redistribute_load():
+    body, status = handle_redistribute(request.json)
+    return jsonify(body), status
+
+@app.route('/api/admin/reconcile', methods=['POST'])
+def reconcile_slots():
+    body, status = handle_reconcile(request.json)
+    return jsonify(body), status
+
+@app.route('/api/queue/walkin', methods=['POST'])
+def queue_walkin():
+    body, status = handle_queue_walkin(request.json)
+    return jsonify(body), status
+
+@app.route('/api/queue/check_in', methods=['POST'])
+def queue_check_in():
+    body, status = handle_queue_check_in(request.json)
+    return jsonify(body), status
+
+@app.route('/api/queue/no_show', methods=['POST'])
+def queue_no_show():
+    body, status = handle_queue_no_show(request.json)
+    return jsonify(body), status
+
+@app.route('/api/queue/serve_next', methods=['POST'])
+def queue_serve_next():
+    body, status = handle_queue_serve_next(request.json)
+    return jsonify(body), status
+
+@app.route('/api/queue/board', methods=['GET'])
+def queue_board():
+    """Polling endpoint for display boards; answers 304 while nothing changed."""
+    body, status = handle_queue_board(request.args.get('center_id'), request.args.get('limit'))
+    response = jsonify(body)
+    response.status_code = status
+    if status == 200:
+        response.set_etag(board_etag(body))
+        response = response.make_conditional(request)
+    return response
 
 @app.route('/api/reset', methods=['POST'])
 def reset_system():
-    backend.dm.reset_daily_data()
-    return jsonify({'success': True, 'message': 'System data reset successfully.'})
+    body, status = handle_reset()
+    return jsonify(body), status
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
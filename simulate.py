@@ -0,0 +1,81 @@
+"""
+Capacity-planning simulator for the slot allocator.
+
+Examples:
+    python simulate.py --days 30 --load-factor 1.1
+    python simulate.py --days 30 --sweep-buffer 0.1,0.2,0.3 --sweep-capacity 0.9,1.0,1.2
+    python simulate.py --replay data/requests.csv
+"""
+import argparse
+import datetime
+import itertools
+import time
+
+import pandas as pd
+
+from src.backend import CrowdSystemBackend
+from src.simulation import InMemoryDataManager, arrivals_from_requests, run_scenario, simulate, sweep
+
+def _floats(text):
+    return [float(x) for x in text.split(",")] if text else None
+
+def _print_report(label, report):
+    wait = "n/a" if report["mean_wait_min"] is None else f"{report['mean_wait_min']:.0f} / {report['p90_wait_min']:.0f}"
+    print(f"{label:<36} arrivals={report['arrivals']:>8} served={report['served']:>8} rejected={report['rejected']:>7} "
+          f"util={report['utilization']:.1%} deferred={report['deferral_rate']:.1%} wait mean/p90 min={wait}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--start", type=datetime.date.fromisoformat, default=datetime.date.today())
+    parser.add_argument("--load-factor", type=float, default=1.0, help="Offered load relative to capacity")
+    parser.add_argument("--walkin-share", type=float, default=0.25)
+    parser.add_argument("--walkin-buffer", type=float, default=0.20)
+    parser.add_argument("--capacity-factor", type=float, default=1.0)
+    parser.add_argument("--horizon-days", type=int, default=3)
+    parser.add_argument("--slot-minutes", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sweep-buffer", help="Comma-separated WALKIN_BUFFER_PERCENT values")
+    parser.add_argument("--sweep-capacity", help="Comma-separated capacity multipliers")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--replay", help="requests.csv to replay instead of synthetic arrivals")
+    parser.add_argument("--details", action="store_true", help="Print per-center and per-request-type tables")
+    args = parser.parse_args()
+
+    base = {
+        "start_date": args.start,
+        "days": args.days,
+        "load_factor": args.load_factor,
+        "walkin_share": args.walkin_share,
+        "seed": args.seed,
+        "capacity_factor": args.capacity_factor,
+        "walkin_buffer": args.walkin_buffer,
+        "horizon_days": args.horizon_days,
+        "slot_minutes": args.slot_minutes
+    }
+
+    started = time.time()
+    if args.replay:
+        lookup = CrowdSystemBackend(data_manager=InMemoryDataManager())
+        arrivals, start_date = arrivals_from_requests(pd.read_csv(args.replay), lookup)
+        days = max(1, int(arrivals["minute"].max() // 1440) + 1)
+        reports = [("replay", simulate(arrivals, start_date, days, capacity_factor=args.capacity_factor,
+                                       walkin_buffer=args.walkin_buffer, horizon_days=args.horizon_days,
+                                       slot_minutes=args.slot_minutes))]
+    elif args.sweep_buffer or args.sweep_capacity:
+        buffers = _floats(args.sweep_buffer) or [args.walkin_buffer]
+        capacities = _floats(args.sweep_capacity) or [args.capacity_factor]
+        scenarios = [dict(base, walkin_buffer=b, capacity_factor=c) for b, c in itertools.product(buffers, capacities)]
+        results = sweep(scenarios, processes=args.processes)
+        reports = [(f"buffer={s['walkin_buffer']:.2f} capacity={s['capacity_factor']:.2f}", r)
+                   for s, r in zip(scenarios, results)]
+    else:
+        reports = [("baseline", run_scenario(base))]
+
+    for label, report in reports:
+        _print_report(label, report)
+        if args.details:
+            print(report["by_center"].to_string(index=False))
+            print(report["by_request_type"].to_string(index=False))
+            print()
+    print(f"Simulated in {time.time() - started:.1f}s")
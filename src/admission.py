@@ -0,0 +1,158 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+class TokenBucket:
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+class Admission:
+    def __init__(self, controller, ok, ticket=None, position=0, retry_after=0, message=""):
+        self._controller = controller
+        self.ok = ok
+        self.ticket = ticket
+        self.position = position
+        self.retry_after = retry_after
+        self.message = message
+        self._started = controller.clock()
+
+    def release(self):
+        if self.ok:
+            self._controller._release(self._controller.clock() - self._started)
+            self.ok = False
+
+    def to_dict(self):
+        return {
+            "success": False,
+            "queued": self.ticket is not None,
+            "ticket": self.ticket,
+            "position": self.position,
+            "retry_after": self.retry_after,
+            "message": self.message
+        }
+
+class AdmissionController:
+    """
+    Admission control in front of the booking path.
+
+    A request must pass a token bucket for its city and one for its pincode, then
+    take a seat in a bounded concurrency gate. A request over a rate limit is only
+    told when to retry, so one busy area never queues anyone else. A request that
+    finds the gate full receives a single-use waiting-room ticket. Tickets are
+    admitted strictly in order, and fresh arrivals cannot take the seats they
+    are waiting for, so accepted bookings keep a stable latency instead of every
+    request slowing down together.
+    """
+    def __init__(self, max_concurrent=8, city_rate=20.0, city_burst=40, pincode_rate=5.0, pincode_burst=10,
+                 max_waiting=10000, ticket_grace=5, max_buckets=50000, clock=time.monotonic):
+        self.max_concurrent = max_concurrent
+        self.city_rate, self.city_burst = city_rate, city_burst
+        self.pincode_rate, self.pincode_burst = pincode_rate, pincode_burst
+        self.max_waiting = max_waiting
+        self.ticket_grace = ticket_grace  # seconds a ticket holder has to come back
+        self.max_buckets = max_buckets  # city/pincode keys are client-supplied, so keep only the most recent
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> TokenBucket, least recently used first
+        self._in_flight = 0
+        self._next_ticket = 1
+        self._now_serving = 0       # waiting tickets <= this may enter
+        self._issued = OrderedDict()  # outstanding ticket -> expiry, ascending
+        self._avg_service = 0.2     # seconds, EWMA of time spent inside the gate
+
+    def admit(self, city, pincode, ticket=None):
+        now = self.clock()
+        with self._lock:
+            self._advance(now)
+            has_turn = ticket in self._issued and ticket <= self._now_serving
+            if not has_turn and self._in_flight + len(self._issued) >= self.max_concurrent:
+                # The free seats are spoken for by waiting tickets: join the back of the line
+                return self._queue(now, ticket, "Booking demand is high. You are in the virtual waiting room.")
+
+            buckets = (self._bucket(f"city:{str(city).lower()}", self.city_rate, self.city_burst),
+                       self._bucket(f"pin:{pincode}", self.pincode_rate, self.pincode_burst))
+            wait = max(bucket.wait_time(now) for bucket in buckets)
+            if wait:
+                return self._throttle(now, ticket, wait)
+
+            if self._in_flight >= self.max_concurrent:
+                return self._queue(now, ticket, "All booking counters are busy. You are in the virtual waiting room.")
+
+            for bucket in buckets:
+                bucket.take()
+            if has_turn:
+                del self._issued[ticket]
+            self._in_flight += 1
+            return Admission(self, True)
+
+    def _queue(self, now, ticket, message):
+        if ticket not in self._issued:
+            if len(self._issued) >= self.max_waiting:
+                return Admission(self, False, retry_after=1,
+                                 message="Waiting room is full. Please try again shortly.")
+            ticket = self._next_ticket
+            self._next_ticket += 1
+        # Approximate: tickets already admitted or expired still count as ahead
+        position = ticket - next(iter(self._issued), ticket) + 1
+        drain = position * self._avg_service / self.max_concurrent
+        retry_after = max(1, math.ceil(drain))
+        self._issued[ticket] = now + retry_after + self.ticket_grace
+        return Admission(self, False, ticket=ticket, position=position, retry_after=retry_after, message=message)
+
+    def _throttle(self, now, ticket, wait):
+        # No new ticket: a rate-limited area must not hold seats others could use.
+        # A ticket already earned keeps its place until the bucket has refilled.
+        retry_after = max(1, math.ceil(wait))
+        if ticket in self._issued:
+            self._issued[ticket] = max(self._issued[ticket], now + retry_after + self.ticket_grace)
+        else:
+            ticket = None
+        return Admission(self, False, ticket=ticket, retry_after=retry_after,
+                         message="Too many bookings from your area right now. Please retry shortly.")
+
+    def _advance(self, now):
+        # Drop tickets whose holders did not come back in time, then call the
+        # first waiting tickets forward, one per free seat in the gate.
+        while self._issued:
+            oldest, expires_at = next(iter(self._issued.items()))
+            if expires_at > now:
+                break
+            del self._issued[oldest]
+        called = list(islice(self._issued, max(0, self.max_concurrent - self._in_flight)))
+        self._now_serving = called[-1] if called else 0
+
+    def _release(self, service_time):
+        with self._lock:
+            self._in_flight -= 1
+            self._avg_service = 0.9 * self._avg_service + 0.1 * service_time
+
+    def _bucket(self, key, rate, burst):
+        # Evicting the least recently used bucket is safe in practice: an idle
+        # bucket has refilled to its burst, the same as a fresh one
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = TokenBucket(rate, burst, self.clock())
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": self._in_flight, "waiting": len(self._issued), "now_serving": self._now_serving}
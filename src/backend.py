@@ -1,12 +1,55 @@
 import pandas as pd
 import datetime
+import json
+import secrets
+import threading
+from collections import deque
 from src.data_manager import DataManager
+from src.events import EventBroadcaster
+from src.slot_index import SlotIndex
+from src.token_queue import QueueManager, slot_minute
+from src.idempotency import TTLCache
+from src.locations import default_directory
+from src.waitlist import Waitlist
+from src.holds import TimerWheel
+from src.reconcile import reconcile
 from src.utils import generate_request_id, simulate_sms_content, get_current_time
 
+# Statuses that hold a slot, and those that still hold a slot or a waitlist place
+BOOKED_STATUSES = ("Confirmed", "De-congested (Next Day)", "Deferred Walk-in", "Rescheduled (Admin)")
+CANCELLABLE_STATUSES = BOOKED_STATUSES + ("Waitlisted",)
+# Fields a status event carries from before the change
+STATUS_FIELDS = ("status", "assigned_date", "assigned_time_slot")
+
 class CrowdSystemBackend:
-    def __init__(self):
-        self.dm = DataManager()
+    def __init__(self, horizon_days=3, slot_minutes=60, data_manager=None, clock=None, events=None, request_prefix="REQ",
+                 locations=None):
+        self.dm = data_manager if data_manager is not None else DataManager()
+        self.clock = clock or get_current_time # Injectable for simulation
         self.WALKIN_BUFFER_PERCENT = 0.20 # 20% reserved for walkins
+        self.SEARCH_HORIZON_DAYS = horizon_days # e.g. 30-90 for long-range booking
+        self.SLOT_MINUTES = slot_minutes # 60 (hourly) or 15/30 for finer slots
+        self.OPEN_HOUR = 9 # 9 AM
+        self.CLOSE_HOUR = 17 # 5 PM
+        self._slot_index = None
+        self._slot_index_key = None
+        self._index_lock = threading.RLock() # Availability reads may run beside the writer
+        self.events = events or EventBroadcaster() # Live deltas for admin dashboards (shared across shards)
+        self.REQUEST_PREFIX = request_prefix # Shards encode themselves in their request IDs
+        self.locations = locations or default_directory() # City aliases, typo tolerance, pincode directory
+        self.queues = QueueManager(self.dm, self.clock) # Live walk-in token queues
+        self.recent_bookings = TTLCache() # Idempotency key -> original booking
+        self._recent_bookings_day = None
+        self._waitlist = None # Built from stored 'Waitlisted' rows on first use
+        self.notifications = deque(maxlen=100_000) # Outbox of SMS for an external sender to drain
+        self._availability = {} # center_id -> (started_slots, serialized heatmap)
+        self._availability_index = None
+        self.HOLD_SECONDS = 300 # How long a reserved slot waits for OTP/documents before it is released
+        self.HOLD_PREFIX = "HLD" + request_prefix[3:] # Hold IDs route to the shard like request IDs
+        self._holds = {} # hold_id -> (user_details, center_id, date, hour, minute, is_walkin, is_deferred, expires_at)
+        self._hold_timers = None # TimerWheel over hold deadlines, created on first hold
+        self._hold_keys = {} # idempotency / derived key -> live hold_id, so retries get the same hold
+        self._keys_of_hold = {} # hold_id -> its keys, dropped with the hold
 
     def get_all_centers(self):
         return self.dm.get_centers()
@@ -15,7 +58,7 @@ class CrowdSystemBackend:
         """
         Locates the best center. Priority:
         1. Exact Pincode Match
-        2. Exact City Match
+        2. City Match, after resolving aliases, typos and the pincode's directory city
         3. Default to a major hub if not found (Demo logic)
         """
         centers = self.dm.get_centers()
@@ -26,6 +69,7 @@ class CrowdSystemBackend:
             return match.iloc[0]
             
         # 2. City Match
+        city = self.locations.resolve_city(city, pincode) or city
         match = centers[centers['city'].str.lower() == city.lower()]
         if not match.empty:
              # Load balancing: Pick one with random/round-robin in real life. Here, pick first.
@@ -34,48 +78,121 @@ class CrowdSystemBackend:
         # 3. Fallback
         return centers.iloc[0]
 
+    def _get_slot_index(self):
+        """
+        Returns the free-capacity index for the current horizon, rebuilding it when
+        the day rolls over, the slot config changes, or slots were edited outside
+        of this backend (detected through the DataManager's slots_version).
+        """
+        key = (self.clock().date(), self.SEARCH_HORIZON_DAYS, self.OPEN_HOUR, self.CLOSE_HOUR,
+               self.SLOT_MINUTES, self.WALKIN_BUFFER_PERCENT, self.dm.slots_version)
+        with self._index_lock:
+            if self._slot_index is None or self._slot_index_key != key:
+                self._slot_index = SlotIndex(key[0], self.SEARCH_HORIZON_DAYS, self.OPEN_HOUR, self.CLOSE_HOUR,
+                                             self.SLOT_MINUTES).build(self.dm.get_centers(), self.dm.slots,
+                                                                      self.WALKIN_BUFFER_PERCENT)
+                # Outstanding holds live only in the index; carry them into the new one
+                for _, center_id, date, hour, minute, is_walkin, _, _ in self._holds.values():
+                    self._slot_index.record(center_id, date, hour, minute, is_walkin=is_walkin)
+                self._slot_index_key = key
+            return self._slot_index
+
+    def _book_slot(self, center_id, date, hour, minute, is_walkin, delta=1, held=False):
+        """
+        Persists a slot's occupancy change. A held slot is already counted in the index.
+        The store write and the index update happen under one _index_lock section:
+        an availability read in between would rebuild the index from slots that
+        already hold the change, and the change would then be counted twice.
+        """
+        with self._index_lock:
+            self.dm.update_slot_load(center_id, date, hour, is_walkin=is_walkin, minute=minute, delta=delta)
+            if self._slot_index is not None:
+                if not held:
+                    self._slot_index.record(center_id, date, hour, minute, is_walkin=is_walkin, delta=delta)
+                # Our own write is already reflected; don't treat it as an external edit
+                self._slot_index_key = self._slot_index_key[:-1] + (self.dm.slots_version,)
+            self._availability.pop(center_id, None)
+
+    def get_availability(self, center_ids):
+        """
+        Remaining scheduled and walk-in capacity per slot over the search horizon,
+        as one pre-serialized JSON heatmap (bytes) per center. Read straight
+        from the slot index, never from the requests table. Each center's bytes are
+        cached until one of its slots changes or another of today's slots starts.
+        """
+        now = self.clock()
+        with self._index_lock:
+            index = self._get_slot_index()
+            if index is not self._availability_index:
+                # Rebuilt index (new day, config change, external edit): start over
+                self._availability = {}
+                self._availability_index = index
+
+            started = index.started_slots(now.hour * 60 + now.minute)
+            parts = []
+            for center_id in center_ids:
+                cached = self._availability.get(center_id)
+                if cached is None or cached[0] != started:
+                    cached = (started, self._render_availability(index, center_id, started))
+                    self._availability[center_id] = cached
+                parts.append(cached[1])
+        return parts
+
+    def _render_availability(self, index, center_id, started):
+        scheduled, walkin = index.remaining(center_id)
+        per_day = index.slots_per_day
+        # Today's slots that already started can no longer be booked ahead
+        scheduled = [0] * started + scheduled[started:]
+        return json.dumps({
+            "center_id": center_id,
+            "slot_minutes": index.slot_minutes,
+            "dates": [str(index.start_date + datetime.timedelta(days=d)) for d in range(index.horizon_days)],
+            "times": [f"{h:02d}:{m:02d}" for _, h, m, _ in map(index.slot_at, range(per_day))],
+            "scheduled": [scheduled[d:d + per_day] for d in range(0, index.n, per_day)],
+            "walkin": [walkin[d:d + per_day] for d in range(0, index.n, per_day)]
+        }, separators=(",", ":")).encode()
+
     def allocate_slot_automatically(self, center_id, is_walkin=False):
         """
-        Finds the first available slot starting today -> tomorrow -> day after.
-        Returns: (date, hour, is_deferred)
+        Finds the first available slot in the search horizon, starting today.
+        Uses the per-center free-capacity index, so the lookup is O(log n) in the
+        number of slots rather than a scan over every day and hour.
+        Returns: (date, hour, minute, is_deferred)
         """
-        center = self.dm.get_center_by_id(center_id)
-        capacity = center['capacity_per_hour']
-        max_bookable = int(capacity * (1 - self.WALKIN_BUFFER_PERCENT)) if not is_walkin else capacity
-        
-        start_date = get_current_time().date()
-        hours = range(9, 17) # 9 AM to 5 PM
-        
-        # Search Horizon: 3 Days
-        for day_offset in range(3):
-            check_date = start_date + datetime.timedelta(days=day_offset)
-            
-            for hour in hours:
-                # If today, skip past hours
-                # In demo, we might want to allow booking for 'now' if it's past? No, strict logic.
-                current_time = get_current_time()
-                if day_offset == 0 and hour <= current_time.hour and not is_walkin:
-                   continue 
-
-                booked, walkin, total = self.dm.get_slot_load(center_id, check_date, hour)
-                
-                limit = max_bookable
-                current_load = booked if not is_walkin else total # Walkins compete with everyone
-                
-                if current_load < limit:
-                    # Found a slot!
-                    is_deferred = (day_offset > 0)
-                    return check_date, hour, is_deferred
+        index = self._get_slot_index()
+
+        # If today, skip slots that already started (walk-ins are served in any open slot)
+        current_time = self.clock()
+        after_minute = None if is_walkin else current_time.hour * 60 + current_time.minute
+
+        found = index.first_free(center_id, is_walkin=is_walkin, after_minute=after_minute)
+        if found:
+            check_date, hour, minute, day_offset = found
+            is_deferred = (day_offset > 0)
+            return check_date, hour, minute, is_deferred
         
-        return None, None, True # Totally full
+        return None, None, None, True # Totally full
 
-    def process_request(self, user_details):
+    def process_request(self, user_details, idempotency_key=None):
         """
         Main entry point for Citizen.
         Automatic assignment of Center -> Date -> Time.
+        Retries carrying the same idempotency key (or, without one, the same
+        phone + request type on the same day) get the original booking back
+        and never reach slot allocation.
         """
-        city = user_details['city']
+        derived_key = self._derive_booking_key(user_details)
+        keys = [k for k in (idempotency_key, derived_key) if k]
+        # A client key names one attempt, so the derived key only stands in without
+        # one: two residents sharing a phone can each book with their own key
+        dedupe_key = idempotency_key or derived_key
+        replay = self._replay_booking(dedupe_key) if dedupe_key else None
+        if replay:
+            return replay
+
         pincode = user_details['pincode']
+        # Log the canonical name ("Bangalore" -> "Bengaluru") so admin region filters see it
+        city = self.locations.resolve_city(user_details['city'], pincode) or user_details['city']
         user_type = user_details['user_type'] # 'Scheduled' or 'Walk-in'
         
         # 1. Find Center
@@ -84,62 +201,460 @@ class CrowdSystemBackend:
         center_name = assigned_center['name']
         
         # 2. Allocate Slot
-        today = get_current_time().date()
         is_walkin_flow = (user_type == "Walk-in")
+        self.expire_holds() # Lapsed holds give their slots back first
         
-        assigned_date, assigned_hour, is_deferred = self.allocate_slot_automatically(center_id, is_walkin=is_walkin_flow)
+        assigned_date, assigned_hour, assigned_minute, is_deferred = self.allocate_slot_automatically(center_id, is_walkin=is_walkin_flow)
         
         if assigned_date:
             # Book it
-            self.dm.update_slot_load(center_id, assigned_date, assigned_hour, is_walkin=is_walkin_flow)
-            
-            req_id = generate_request_id("REQ")
-            status = "Confirmed"
-            
-            if is_deferred and not is_walkin_flow:
-                 status = "De-congested (Next Day)"
-            if is_walkin_flow and assigned_date > today:
-                 status = "Deferred Walk-in"
-
-            # Log
+            self._book_slot(center_id, assigned_date, assigned_hour, assigned_minute, is_walkin_flow)
+            return self._record_booking(user_details, city, assigned_center, assigned_date, assigned_hour,
+                                        assigned_minute, is_walkin_flow, is_deferred, keys)
+        elif not is_walkin_flow:
+            # Full: join the center's waitlist and get promoted when a slot is released
             req_data = {
-                "request_id": req_id,
+                "request_id": generate_request_id(self.REQUEST_PREFIX),
                 "user_type": user_type,
                 "input_city": city,
                 "input_pincode": pincode,
                 "request_type": user_details['request_type'],
-                "status": status,
+                "status": "Waitlisted",
                 "assigned_center_id": center_id,
-                "assigned_date": str(assigned_date),
-                "assigned_time_slot": f"{assigned_hour:02d}:00",
-                "timestamp": str(get_current_time()),
+                "assigned_date": str(user_details.get("preferred_date") or ""),
+                "assigned_time_slot": "",
+                "timestamp": str(self.clock()),
                 "name": user_details.get("name", ""),
                 "phone": user_details.get("phone", ""),
                 "age": user_details.get("age", ""),
                 "age_group": user_details.get("age_group", "")
             }
             self.dm.add_request(req_data)
-            
-            sms = simulate_sms_content(req_id, center_name, str(assigned_date), f"{assigned_hour:02d}:00")
-            
-            return {
-                "success": True,
+            self._get_waitlist().add(center_id, req_data["assigned_date"], req_data["request_id"], req_data["age_group"])
+            self.events.publish("booking", req_data, city=city)
+            result = {
+                "success": False,
+                "waitlisted": True,
                 "data": req_data,
                 "center_name": center_name,
-                "message": sms
+                "message": f"All slots at {center_name} are full for the next {self.SEARCH_HORIZON_DAYS} days. "
+                           f"You are on the waitlist (Request ID: {req_data['request_id']}) and will get an SMS if a slot opens up."
             }
+            for key in keys:
+                self.recent_bookings.put(key, result)
+            return result
         else:
             return {
                 "success": False,
-                "message": "System Overload. All nearby centers are full for the next 3 days. Please try again later."
+                "message": f"System Overload. All nearby centers are full for the next {self.SEARCH_HORIZON_DAYS} days. Please try again later."
             }
 
+    def _record_booking(self, user_details, city, assigned_center, assigned_date, assigned_hour, assigned_minute,
+                        is_walkin_flow, is_deferred, keys):
+        """Stores the request for a slot whose occupancy is already taken, and announces it."""
+        center_id = assigned_center['center_id']
+        center_name = assigned_center['name']
+        pincode = user_details['pincode']
+        user_type = user_details['user_type']
+        today = self.clock().date()
+        time_slot = f"{assigned_hour:02d}:{assigned_minute:02d}"
+
+        req_id = generate_request_id(self.REQUEST_PREFIX)
+        status = "Confirmed"
+
+        if is_deferred and not is_walkin_flow:
+             status = "De-congested (Next Day)"
+        if is_walkin_flow and assigned_date > today:
+             status = "Deferred Walk-in"
+
+        # Log
+        req_data = {
+            "request_id": req_id,
+            "user_type": user_type,
+            "input_city": city,
+            "input_pincode": pincode,
+            "request_type": user_details['request_type'],
+            "status": status,
+            "assigned_center_id": center_id,
+            "assigned_date": str(assigned_date),
+            "assigned_time_slot": time_slot,
+            "timestamp": str(self.clock()),
+            "name": user_details.get("name", ""),
+            "phone": user_details.get("phone", ""),
+            "age": user_details.get("age", ""),
+            "age_group": user_details.get("age_group", "")
+        }
+        self.dm.add_request(req_data)
+        self._publish_slot_load(center_id, assigned_center['city'], assigned_date, assigned_hour, assigned_minute)
+        self.events.publish("booking", req_data, city=city)
+
+        sms = simulate_sms_content(req_id, center_name, str(assigned_date), time_slot)
+
+        result = {
+            "success": True,
+            "data": req_data,
+            "center_name": center_name,
+            "message": sms
+        }
+        if assigned_date == today:
+            if is_walkin_flow:
+                # Walk-ins are physically at the center: hand out a live token
+                result["token"] = self.queues.issue_walkin(center_id, req_data["name"])
+            else:
+                self.queues.expect(center_id, req_id, time_slot)
+        for key in keys:
+            self.recent_bookings.put(key, result)
+        return result
+
+    def hold_slot(self, user_details, idempotency_key=None):
+        """
+        First phase of a two-phase booking: reserves the slot process_request
+        would assign for HOLD_SECONDS while the resident completes OTP and
+        document checks. The hold counts against capacity in the slot index only;
+        nothing is written until confirm_hold. Lapsed holds are released by the
+        timer wheel on the next write or sweep, with no scan over outstanding
+        holds. A retry (same idempotency key, or without one, phone + request
+        type on the same day) gets the live hold back instead of reserving
+        another slot.
+        """
+        derived_key = self._derive_booking_key(user_details)
+        keys = [k for k in (idempotency_key, derived_key) if k]
+        dedupe_key = idempotency_key or derived_key  # as in process_request
+        replay = self._replay_booking(dedupe_key) if dedupe_key else None
+        if replay:
+            return replay
+        self.expire_holds()
+        with self._index_lock:
+            if dedupe_key and self._hold_keys.get(dedupe_key) in self._holds:
+                return dict(self._hold_response(self._hold_keys[dedupe_key]), duplicate=True)
+
+        pincode = user_details['pincode']
+        city = self.locations.resolve_city(user_details['city'], pincode) or user_details['city']
+        center = self.find_best_center(city, pincode)
+        is_walkin = user_details['user_type'] == "Walk-in"
+
+        date, hour, minute, is_deferred = self.allocate_slot_automatically(center['center_id'], is_walkin=is_walkin)
+        if not date:
+            return {
+                "success": False,
+                "message": f"All slots at {center['name']} are full for the next {self.SEARCH_HORIZON_DAYS} days. Please try again later."
+            }
+
+        now = self.clock()
+        hold_id = f"{self.HOLD_PREFIX}{secrets.token_hex(6)}"
+        expires_at = now + datetime.timedelta(seconds=self.HOLD_SECONDS)
+        details = dict(user_details, city=city)
+        with self._index_lock:
+            if self._hold_timers is None:
+                self._hold_timers = TimerWheel(now.timestamp())
+            self._get_slot_index().record(center['center_id'], date, hour, minute, is_walkin=is_walkin)
+            self._holds[hold_id] = (details, center['center_id'], date, hour, minute, is_walkin, is_deferred, expires_at)
+            self._hold_timers.schedule(hold_id, expires_at.timestamp())
+            self._availability.pop(center['center_id'], None)
+            self._keys_of_hold[hold_id] = keys
+            for key in keys:
+                self._hold_keys[key] = hold_id
+            return self._hold_response(hold_id)
+
+    def _hold_response(self, hold_id):
+        _, center_id, date, hour, minute, _, _, expires_at = self._holds[hold_id]
+        return {
+            "success": True,
+            "hold_id": hold_id,
+            "center_id": center_id,
+            "center_name": self.dm.get_center_by_id(center_id)['name'],
+            "date": str(date),
+            "time_slot": f"{hour:02d}:{minute:02d}",
+            "expires_at": str(expires_at),
+            "message": f"Slot reserved until {expires_at:%H:%M:%S}. Confirm to complete the booking."
+        }
+
+    def _drop_hold(self, hold_id):
+        for key in self._keys_of_hold.pop(hold_id, ()):
+            if self._hold_keys.get(key) == hold_id:
+                del self._hold_keys[key]
+        return self._holds.pop(hold_id)
+
+    def confirm_hold(self, hold_id, idempotency_key=None):
+        """Second phase: turns a live hold into a stored booking. Retries get the same booking back."""
+        replay = self._replay_booking(f"hold|{hold_id}")
+        if replay:
+            return replay
+        self.expire_holds()
+        with self._index_lock:
+            hold = self._drop_hold(hold_id) if hold_id in self._holds else None
+            if hold is None:
+                return {"success": False, "message": "Hold not found or expired. Please book again."}
+            self._hold_timers.cancel(hold_id)
+            details, center_id, date, hour, minute, is_walkin, is_deferred, _ = hold
+            # Still under the lock: a rebuild between dropping the hold and storing
+            # the booking would count neither
+            self._book_slot(center_id, date, hour, minute, is_walkin, held=True)
+        keys = [k for k in (f"hold|{hold_id}", idempotency_key, self._derive_booking_key(details)) if k]
+        return self._record_booking(details, details['city'], self.dm.get_center_by_id(center_id), date, hour,
+                                    minute, is_walkin, is_deferred, keys)
+
+    def release_hold(self, hold_id):
+        """Gives a held slot back before its deadline (resident abandoned the flow)."""
+        self.expire_holds()
+        with self._index_lock:
+            if hold_id not in self._holds:
+                return {"success": False, "message": "Hold not found or expired."}
+            self._hold_timers.cancel(hold_id)
+            self._release_held_slot(hold_id)
+        return {"success": True, "message": "Hold released."}
+
+    def expire_holds(self):
+        """Releases every hold whose deadline passed. Touches only the wheel buckets that elapsed."""
+        with self._index_lock:
+            if self._hold_timers is None:
+                return 0
+            expired = self._hold_timers.advance(self.clock().timestamp())
+            for hold_id in expired:
+                self._release_held_slot(hold_id)
+        return len(expired)
+
+    def _release_held_slot(self, hold_id):
+        # Resolve the index first: a rebuild re-applies every hold still in the table
+        index = self._get_slot_index()
+        _, center_id, date, hour, minute, is_walkin, _, _ = self._drop_hold(hold_id)
+        index.record(center_id, date, hour, minute, is_walkin=is_walkin, delta=-1)
+        self._availability.pop(center_id, None)
+        if not is_walkin:
+            self._promote_waitlisted(self.dm.get_center_by_id(center_id), date, hour, minute)
+
+    @property
+    def held_count(self):
+        return len(self._holds)
+
+    def _get_waitlist(self):
+        if self._waitlist is None:
+            self._waitlist = Waitlist()
+            req = self.dm.requests
+            if not req.empty:
+                waiting = req[req["status"] == "Waitlisted"].sort_values("timestamp")
+                age_groups = waiting["age_group"] if "age_group" in waiting else [""] * len(waiting)
+                for rid, cid, date, age_group in zip(waiting["request_id"], waiting["assigned_center_id"],
+                                                     waiting["assigned_date"].fillna(""), age_groups):
+                    self._waitlist.add(cid, date, rid, age_group)
+        return self._waitlist
+
+    def cancel_request(self, request_id, phone=None):
+        """
+        Cancels a booking or waitlist entry. A booked slot is released (occupancy
+        decremented in the store and the index) and offered to the best waiting
+        resident for that center and date.
+        """
+        req = self.dm.requests
+        match = req[req["request_id"] == request_id] if not req.empty else req
+        if match.empty:
+            return {"success": False, "message": "Request ID not found."}
+        idx = match.index[0]
+        record = match.iloc[0]
+        stored_phone = str(record.get("phone", "")).removesuffix(".0")
+        if stored_phone not in ("", "nan") and str(phone or "").strip() != stored_phone:
+            return {"success": False, "message": "Phone number does not match this request."}
+        if record["status"] not in CANCELLABLE_STATUSES:
+            return {"success": False, "message": f"Request is already {record['status']}."}
+
+        waitlisted = record["status"] == "Waitlisted"
+        if not waitlisted:
+            date = datetime.date.fromisoformat(str(record["assigned_date"]))
+            if date < self.clock().date():
+                return {"success": False, "message": "Past appointments cannot be cancelled."}
+
+        # Let the resident book again today instead of replaying the cancelled request
+        booked_on = str(record["timestamp"])[:10]
+        self.recent_bookings.pop(self._derive_booking_key(
+            {"phone": stored_phone, "request_type": record["request_type"]}, day=booked_on))
+
+        previous = self._status_fields(record)
+        if waitlisted:
+            self._get_waitlist().remove(request_id)
+            self._set_status(idx, "Cancelled")
+            self._publish_status(idx, previous)
+            return {"success": True, "message": "Removed from the waitlist."}
+
+        center_id = record["assigned_center_id"]
+        is_walkin = record["user_type"] == "Walk-in"
+        hour, minute = divmod(slot_minute(record["assigned_time_slot"]), 60)
+        self._book_slot(center_id, date, hour, minute, is_walkin, delta=-1)
+        self._set_status(idx, "Cancelled")
+        if date == self.clock().date():
+            self.queues.leave(center_id, request_id)
+        center = self.dm.get_center_by_id(center_id)
+        self._publish_slot_load(center_id, center['city'], date, hour, minute)
+        self._publish_status(idx, previous)
+        promoted = None if is_walkin else self._promote_waitlisted(center, date, hour, minute)
+        return {"success": True, "message": "Appointment cancelled.", "promoted": promoted}
+
+    def _promote_waitlisted(self, center, date, hour, minute):
+        """Books a freed slot for the best waiting resident and queues their SMS. Returns their request_id."""
+        center_id = center["center_id"]
+        now = self.clock()
+        if date == now.date() and hour * 60 + minute <= now.hour * 60 + now.minute:
+            return None  # Slot already started
+        if self._get_slot_index().scheduled_room(center_id, date, hour, minute) <= 0:
+            return None
+        request_id = self._get_waitlist().pop_best(center_id, date)
+        if request_id is None:
+            return None
+
+        self._book_slot(center_id, date, hour, minute, False)
+        time_slot = f"{hour:02d}:{minute:02d}"
+        req = self.dm.requests
+        idx = req.index[req["request_id"] == request_id][0]
+        previous = self._status_fields(req.loc[idx])
+        req.loc[idx, ["assigned_date", "assigned_time_slot"]] = [str(date), time_slot]
+        self._set_status(idx, "Confirmed")
+        if date == now.date():
+            self.queues.expect(center_id, request_id, time_slot)
+
+        record = req.loc[idx]
+        # Retries of the original booking now replay the confirmed slot, not the waitlist entry
+        phone = str(record.get("phone", "")).removesuffix(".0")
+        key = self._derive_booking_key({"phone": phone, "request_type": record["request_type"]},
+                                       day=str(record["timestamp"])[:10])
+        if key:
+            self.recent_bookings.put(key, request_id)
+        self.notifications.append({
+            "request_id": request_id,
+            "phone": phone,
+            "message": simulate_sms_content(request_id, center["name"], str(date), time_slot),
+            "queued_at": str(now)
+        })
+        self._publish_slot_load(center_id, center['city'], date, hour, minute)
+        self._publish_status(idx, previous)
+        return request_id
+
+    def _set_status(self, idx, status):
+        self.dm.requests.at[idx, "status"] = status
+        self.dm.save_requests()
+
+    def _status_fields(self, record):
+        return {k: ("" if pd.isna(record[k]) else record[k]) for k in STATUS_FIELDS}
+
+    def _publish_status(self, idx, previous):
+        """
+        Tells dashboards that an already-published request changed (cancelled,
+        promoted off the waitlist). Carries the row as it is now plus the fields
+        it had before, so totals are adjusted rather than counted again.
+        """
+        record = self.dm.requests.loc[idx]
+        data = {k: ("" if pd.isna(v) else v) for k, v in record.items()}
+        data["previous"] = previous
+        self.events.publish("status", data, city=record["input_city"])
+
+    def _derive_booking_key(self, user_details, day=None):
+        phone = str(user_details.get("phone", "")).strip()
+        if not phone:
+            return None
+        return f"{phone}|{user_details.get('request_type', '')}|{day or self.clock().date()}"
+
+    def _warm_recent_bookings(self, today):
+        """Seeds the dedupe cache with today's stored bookings (e.g. after a restart)."""
+        df = self.dm.requests
+        if not df.empty and "phone" in df.columns:
+            # Cancelled requests must not be replayed: the resident may book again
+            todays = df[df["timestamp"].astype(str).str.startswith(str(today)) & df["status"].isin(CANCELLABLE_STATUSES)]
+            phones = todays["phone"].astype(str).str.replace(r"\.0$", "", regex=True)
+            for phone, request_type, request_id in zip(phones, todays["request_type"], todays["request_id"]):
+                key = self._derive_booking_key({"phone": phone, "request_type": request_type}, day=today)
+                if key:
+                    self.recent_bookings.put(key, request_id)
+        self._recent_bookings_day = today
+
+    def _replay_booking(self, key):
+        today = self.clock().date()
+        if self._recent_bookings_day != today:
+            self._warm_recent_bookings(today)
+        cached = self.recent_bookings.get(key)
+        if cached is None:
+            return None
+        if isinstance(cached, str):
+            # Warmed from the store: rebuild the response from the stored row
+            match = self.dm.requests[self.dm.requests["request_id"] == cached]
+            if match.empty or match.iloc[0]["status"] not in CANCELLABLE_STATUSES:
+                return None
+            req_data = match.iloc[0].fillna("").to_dict()
+            center_name = self.dm.get_center_by_id(req_data["assigned_center_id"])["name"]
+            if req_data["status"] == "Waitlisted":
+                cached = {
+                    "success": False,
+                    "waitlisted": True,
+                    "data": req_data,
+                    "center_name": center_name,
+                    "message": f"You are on the waitlist at {center_name} (Request ID: {req_data['request_id']})."
+                }
+            else:
+                cached = {
+                    "success": True,
+                    "data": req_data,
+                    "center_name": center_name,
+                    "message": simulate_sms_content(req_data["request_id"], center_name,
+                                                    str(req_data["assigned_date"]), req_data["assigned_time_slot"])
+                }
+            self.recent_bookings.put(key, cached)
+        return dict(cached, duplicate=True)
+
+    def preload(self):
+        """
+        Builds the lazily derived state up front. Called in the gunicorn master
+        before forking, so workers start warm and share these pages copy-on-write.
+        """
+        today = self.clock().date()
+        self._get_slot_index()
+        self._warm_recent_bookings(today)
+        self.dm.get_region_view('All')
+
+    def reset_system(self):
+        """Wipes requests and slots along with everything derived from them."""
+        self.dm.reset_daily_data()
+        self._waitlist = None
+        with self._index_lock:
+            self._holds.clear()
+            self._hold_keys.clear()
+            self._keys_of_hold.clear()
+            self._hold_timers = None
+        self.notifications.clear()
+        self.recent_bookings.clear()
+        self._recent_bookings_day = None
+
+    def _todays_request(self, request_id):
+        req = self.dm.requests
+        match = req[req["request_id"] == request_id]
+        if match.empty:
+            return None, "Request ID not found."
+        record = match.iloc[0]
+        if record["assigned_date"] != str(self.clock().date()):
+            return None, f"Appointment is for {record['assigned_date']}, not today."
+        return record, None
+
+    def check_in(self, request_id):
+        """Scheduled resident arrived at the center; joins the live queue at their slot time."""
+        record, error = self._todays_request(request_id)
+        if error:
+            return {"success": False, "message": error}
+        if record["status"] not in BOOKED_STATUSES:
+            return {"success": False, "message": f"Request is {record['status']}; it cannot check in."}
+        name = record["name"] if isinstance(record["name"], str) else ""
+        token = self.queues.check_in(record["assigned_center_id"], request_id, record["assigned_time_slot"], name)
+        return {"success": True, "token": token}
+
+    def mark_no_show(self, request_id):
+        """Drops an expected appointment from the queue so walk-in ETAs move up."""
+        record, error = self._todays_request(request_id)
+        if error:
+            return {"success": False, "message": error}
+        removed = self.queues.no_show(record["assigned_center_id"], request_id)
+        return {"success": removed, "message": "Marked as no-show." if removed else "Resident already checked in or not expected."}
+
     def process_admin_redistribution(self, from_center_id):
         """
         Admin Tool: Shift excess load from one center to others or future dates.
         Simplification: Just finds 'Scheduled' people for Today and moves them to Tomorrow.
         """
-        today = str(get_current_time().date())
+        today = str(self.clock().date())
         # Find victims
         mask = (self.dm.requests["assigned_center_id"] == from_center_id) & \
                (self.dm.requests["assigned_date"] == today) & \
@@ -148,7 +663,7 @@ class CrowdSystemBackend:
         affected_indices = self.dm.requests[mask].index
         count = 0
         
-        tomorrow = str(get_current_time().date() + datetime.timedelta(days=1))
+        tomorrow = str(self.clock().date() + datetime.timedelta(days=1))
         
         for idx in affected_indices:
             # Move to tomorrow same time (naive)
@@ -157,4 +672,56 @@ class CrowdSystemBackend:
             count += 1
             
         self.dm.save_requests()
+
+        # Slot load moves with the requests, one update per (time slot, kind)
+        moved = self.dm.requests.loc[affected_indices]
+        today_date = self.clock().date()
+        tomorrow_date = today_date + datetime.timedelta(days=1)
+        groups = moved.groupby([moved["assigned_time_slot"], moved["user_type"] == "Walk-in"]).size()
+        for (time_slot, is_walkin), n in groups.items():
+            hour, minute = divmod(slot_minute(time_slot), 60)
+            self._book_slot(from_center_id, today_date, hour, minute, is_walkin, delta=-int(n))
+            self._book_slot(from_center_id, tomorrow_date, hour, minute, is_walkin, delta=int(n))
+        for request_id in moved["request_id"]:
+            self.queues.no_show(from_center_id, request_id)
+        if count:
+            center = self.dm.get_center_by_id(from_center_id)
+            self.events.publish("redistribution", {
+                "center_id": from_center_id,
+                "from_date": today,
+                "to_date": tomorrow,
+                "count": count
+            }, city=center['city'])
         return count
+
+    def reconcile_slots(self, apply=False):
+        """
+        Recomputes slot occupancy from the requests table and reports where the
+        stored slots drifted (crash between the two CSV writes, edits by hand).
+        With apply, the stored slots are replaced by the recomputed ones; the
+        slot index then rebuilds and re-applies outstanding holds.
+        Returns (mismatches, summary).
+        """
+        rebuilt, mismatches, summary = reconcile(self.dm.requests, self.dm.slots)
+        summary["applied"] = False
+        if apply and (summary["mismatched_slots"] or summary["duplicate_rows"]):
+            self.dm.slots = rebuilt
+            self.dm.save_slots()
+            with self._index_lock:
+                self._availability = {}
+            summary["applied"] = True
+        return mismatches, summary
+
+    def _publish_slot_load(self, center_id, center_city, date, hour, minute=0):
+        booked, walkin, total = self.dm.get_slot_load(center_id, date, hour, minute)
+        capacity = self.dm.get_center_by_id(center_id)['capacity_per_hour']
+        self.events.publish("slot", {
+            "center_id": center_id,
+            "date": str(date),
+            "hour": int(hour),
+            "minute": int(minute),
+            "booked_count": int(booked),
+            "walkin_count": int(walkin),
+            "capacity_per_hour": int(capacity),
+            "slot_capacity": max(1, round(int(capacity) * self.SLOT_MINUTES / 60))
+        }, city=center_city)
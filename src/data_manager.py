@@ -1,61 +1,143 @@
 import pandas as pd
+import hashlib
 import os
 import datetime
 from src.utils import get_current_time
 
 DATA_DIR = "data"
-CENTERS_FILE = os.path.join(DATA_DIR, "centers.csv")
-REQUESTS_FILE = os.path.join(DATA_DIR, "requests.csv")
-SLOTS_FILE = os.path.join(DATA_DIR, "slots.csv")
+
+REQUEST_COLUMNS = ["request_id", "user_type", "input_city", "input_pincode", "request_type", "status", "assigned_center_id", "assigned_date", "assigned_time_slot", "timestamp", "name", "phone", "age", "age_group"]
+SLOT_COLUMNS = ["center_id", "date", "hour", "minute", "booked_count", "walkin_count"]
+
+DEFAULT_CENTERS = [
+    {"center_id": "ASK001", "name": "ASK Delhi - Connaught Place", "city": "New Delhi", "pincode": "110001", "capacity_per_hour": 50},
+    {"center_id": "ASK002", "name": "ASK Delhi - Laxmi Nagar", "city": "New Delhi", "pincode": "110092", "capacity_per_hour": 40},
+    {"center_id": "ASK003", "name": "ASK Noida - Sector 18", "city": "Noida", "pincode": "201301", "capacity_per_hour": 30},
+    {"center_id": "ASK004", "name": "ASK Ghaziabad - Raj Nagar", "city": "Ghaziabad", "pincode": "201002", "capacity_per_hour": 25},
+    {"center_id": "ASK005", "name": "ASK Gurugram - Cyber Hub", "city": "Gurugram", "pincode": "122002", "capacity_per_hour": 60},
+    {"center_id": "ASK006", "name": "ASK Mumbai - Dadar", "city": "Mumbai", "pincode": "400014", "capacity_per_hour": 80},
+    {"center_id": "ASK007", "name": "ASK Mumbai - Andheri", "city": "Mumbai", "pincode": "400053", "capacity_per_hour": 70},
+    {"center_id": "ASK008", "name": "ASK Bengaluru - Indiranagar", "city": "Bengaluru", "pincode": "560038", "capacity_per_hour": 45},
+]
+
+# Content hash of the last unsharded requests.csv split into the shard directories
+IMPORT_MARKER = ".shard_import"
+
+def requests_digest(data_dir):
+    """sha1 of data_dir/requests.csv, or None when there is none."""
+    path = os.path.join(data_dir, "requests.csv")
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def imported_digest(data_dir):
+    """Digest recorded by the last shard import of data_dir/requests.csv, or None."""
+    marker = os.path.join(data_dir, IMPORT_MARKER)
+    if not os.path.exists(marker):
+        return None
+    with open(marker) as f:
+        return f.read().strip()
+
+def table_dirs(data_dir=DATA_DIR):
+    """
+    data_dir and its shard subdirectories that hold a requests.csv, unsharded
+    first. The unsharded table is left out once the router has imported it as
+    it is now, since its rows then live in the shards.
+    """
+    dirs = [os.path.join(data_dir, d) for d in sorted(os.listdir(data_dir))]
+    marker = imported_digest(data_dir)
+    if marker is None or marker != requests_digest(data_dir):
+        dirs.insert(0, data_dir)
+    return [d for d in dirs if os.path.isfile(os.path.join(d, "requests.csv"))]
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, data_dir=DATA_DIR, centers=None):
+        """
+        data_dir: where this manager's CSVs live (one directory per shard).
+        centers: the centers it owns (defaults to every center).
+        """
+        self.data_dir = data_dir
+        self.centers_file = os.path.join(data_dir, "centers.csv")
+        self.requests_file = os.path.join(data_dir, "requests.csv")
+        self.slots_file = os.path.join(data_dir, "slots.csv")
         self._ensure_data_dir()
-        self.centers = self._load_or_create_centers()
+        self.centers = self._load_or_create_centers(DEFAULT_CENTERS if centers is None else centers)
         self.requests = self._load_or_create_requests()
         self.slots = self._load_or_create_slots()
+        # Bumped on every persisted mutation so readers can cache derived views
+        self.version = 0
+        self.slots_version = 0
+        self._region_views = {}
 
     def _ensure_data_dir(self):
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
-
-    def _load_or_create_centers(self):
-        # Always recreate metadata for this refactor to ensure new columns exist
-        data = [
-            {"center_id": "ASK001", "name": "ASK Delhi - Connaught Place", "city": "New Delhi", "pincode": "110001", "capacity_per_hour": 50},
-            {"center_id": "ASK002", "name": "ASK Delhi - Laxmi Nagar", "city": "New Delhi", "pincode": "110092", "capacity_per_hour": 40},
-            {"center_id": "ASK003", "name": "ASK Noida - Sector 18", "city": "Noida", "pincode": "201301", "capacity_per_hour": 30},
-            {"center_id": "ASK004", "name": "ASK Ghaziabad - Raj Nagar", "city": "Ghaziabad", "pincode": "201002", "capacity_per_hour": 25},
-            {"center_id": "ASK005", "name": "ASK Gurugram - Cyber Hub", "city": "Gurugram", "pincode": "122002", "capacity_per_hour": 60},
-            {"center_id": "ASK006", "name": "ASK Mumbai - Dadar", "city": "Mumbai", "pincode": "400014", "capacity_per_hour": 80},
-            {"center_id": "ASK007", "name": "ASK Mumbai - Andheri", "city": "Mumbai", "pincode": "400053", "capacity_per_hour": 70},
-            {"center_id": "ASK008", "name": "ASK Bengaluru - Indiranagar", "city": "Bengaluru", "pincode": "560038", "capacity_per_hour": 45},
-        ]
-        df = pd.DataFrame(data)
-        df.to_csv(CENTERS_FILE, index=False)
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+
+    def _load_or_create_centers(self, centers):
+        # Center metadata comes from code; the file is only rewritten when it
+        # is missing or stale, so starting a worker doesn't touch the disk
+        df = pd.DataFrame(centers)
+        content = df.to_csv(index=False)
+        if os.path.exists(self.centers_file):
+            with open(self.centers_file) as f:
+                if f.read() == content:
+                    return df
+        with open(self.centers_file, "w") as f:
+            f.write(content)
         return df
 
     def _load_or_create_requests(self):
-        if os.path.exists(REQUESTS_FILE):
-            return pd.read_csv(REQUESTS_FILE)
-        columns = ["request_id", "user_type", "input_city", "input_pincode", "request_type", "status", "assigned_center_id", "assigned_date", "assigned_time_slot", "timestamp", "name", "phone", "age", "age_group"]
-        df = pd.DataFrame(columns=columns)
-        df.to_csv(REQUESTS_FILE, index=False)
+        if os.path.exists(self.requests_file):
+            return pd.read_csv(self.requests_file)
+        df = pd.DataFrame(columns=REQUEST_COLUMNS)
+        df.to_csv(self.requests_file, index=False)
         return df
 
     def _load_or_create_slots(self):
-        if os.path.exists(SLOTS_FILE):
-            return pd.read_csv(SLOTS_FILE)
-        columns = ["center_id", "date", "hour", "booked_count", "walkin_count"]
-        df = pd.DataFrame(columns=columns)
-        df.to_csv(SLOTS_FILE, index=False)
+        if os.path.exists(self.slots_file):
+            df = pd.read_csv(self.slots_file)
+            if "minute" not in df.columns:
+                # Hourly-only files predate sub-hour slots
+                df.insert(3, "minute", 0)
+            return df
+        df = pd.DataFrame(columns=SLOT_COLUMNS)
+        df.to_csv(self.slots_file, index=False)
         return df
 
     def save_requests(self):
-        self.requests.to_csv(REQUESTS_FILE, index=False)
+        self.requests.to_csv(self.requests_file, index=False)
+        self._bump_version()
 
     def save_slots(self):
-        self.slots.to_csv(SLOTS_FILE, index=False)
+        self.slots.to_csv(self.slots_file, index=False)
+        self.slots_version += 1
+        self._bump_version()
+
+    def _bump_version(self):
+        self.version += 1
+        self._region_views = {}
+
+    def get_region_view(self, region):
+        """
+        Returns the requests scoped to a region (city substring match). Missing
+        values stay NaN; serializers emit them as null, so no full-table fillna
+        copy is made. Views are built once per data version and shared, so
+        callers must treat them as read-only.
+        """
+        # Capture the cache before reading requests: if a write bumps the version
+        # meanwhile, the view lands in the discarded dict instead of the fresh one
+        cache = self._region_views
+        view = cache.get(region)
+        if view is None:
+            view = self.requests
+            if region != 'All':
+                view = view[view['input_city'].str.contains(region, case=False, na=False)]
+            cache[region] = view
+        return view
 
     def get_centers(self):
         return self.centers
@@ -68,10 +150,11 @@ class DataManager:
         self.requests = pd.concat([self.requests, new_row], ignore_index=True)
         self.save_requests()
 
-    def get_slot_load(self, center_id, date, hour):
+    def get_slot_load(self, center_id, date, hour, minute=0):
         mask = (self.slots["center_id"] == center_id) & \
                (self.slots["date"] == str(date)) & \
-               (self.slots["hour"] == int(hour))
+               (self.slots["hour"] == int(hour)) & \
+               (self.slots["minute"] == int(minute))
         rows = self.slots[mask]
         if rows.empty:
             return 0, 0, 0
@@ -79,33 +162,37 @@ class DataManager:
         walkin = rows.iloc[0]["walkin_count"]
         return booked, walkin, booked + walkin
 
-    def update_slot_load(self, center_id, date, hour, is_walkin=False):
+    def update_slot_load(self, center_id, date, hour, is_walkin=False, minute=0, delta=1):
+        """Adds delta (negative to release) to a slot's booked or walk-in count, never below zero."""
         date_str = str(date)
         hour = int(hour)
+        minute = int(minute)
         mask = (self.slots["center_id"] == center_id) & \
                (self.slots["date"] == date_str) & \
-               (self.slots["hour"] == hour)
+               (self.slots["hour"] == hour) & \
+               (self.slots["minute"] == minute)
         
         if self.slots[mask].empty:
+            if delta < 0:
+                return
             new_row = {
                 "center_id": center_id,
                 "date": date_str,
                 "hour": hour,
-                "booked_count": 0 if is_walkin else 1,
-                "walkin_count": 1 if is_walkin else 0
+                "minute": minute,
+                "booked_count": 0 if is_walkin else delta,
+                "walkin_count": delta if is_walkin else 0
             }
             self.slots = pd.concat([self.slots, pd.DataFrame([new_row])], ignore_index=True)
         else:
             idx = self.slots[mask].index[0]
-            if is_walkin:
-                self.slots.at[idx, "walkin_count"] += 1
-            else:
-                self.slots.at[idx, "booked_count"] += 1
+            column = "walkin_count" if is_walkin else "booked_count"
+            self.slots.at[idx, column] = max(0, self.slots.at[idx, column] + delta)
         
         self.save_slots()
 
     def reset_daily_data(self):
-        self.slots = pd.DataFrame(columns=["center_id", "date", "hour", "booked_count", "walkin_count"])
+        self.slots = pd.DataFrame(columns=SLOT_COLUMNS)
         self.save_slots()
-        self.requests = pd.DataFrame(columns=["request_id", "user_type", "input_city", "input_pincode", "request_type", "status", "assigned_center_id", "assigned_date", "assigned_time_slot", "timestamp"])
+        self.requests = pd.DataFrame(columns=REQUEST_COLUMNS)
         self.save_requests()
@@ -0,0 +1,144 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_manager import DEFAULT_CENTERS, REQUEST_COLUMNS, SLOT_COLUMNS
+from src.simulation import HOURLY_DEMAND, REQUEST_TYPES, REQUEST_TYPE_SHARE, WEEKDAY_DEMAND
+
+# Relative demand by city (metro hubs run hotter than satellite towns)
+CITY_DEMAND = {
+    "New Delhi": 1.15,
+    "Mumbai": 1.2,
+    "Bengaluru": 1.1,
+    "Noida": 0.9,
+    "Ghaziabad": 0.85,
+    "Gurugram": 1.0
+}
+
+NAMES = np.array(["Aarav", "Vihaan", "Aditya", "Sai", "Ishaan", "Diya", "Ananya", "Saanvi", "Aditi", "Priya", "Rahul", "Amit", "Sneha", "Kavita"])
+SURNAMES = np.array(["Sharma", "Verma", "Gupta", "Singh", "Patel", "Kumar", "Reddy", "Nair", "Iyer"])
+
+def _hourly_curve(open_hour, close_hour, slot_minutes):
+    """HOURLY_DEMAND expanded to one weight per slot start."""
+    curve = np.asarray(HOURLY_DEMAND) / np.mean(HOURLY_DEMAND)
+    starts = open_hour * 60 + np.arange((close_hour - open_hour) * 60 // slot_minutes) * slot_minutes
+    hours = np.clip(starts // 60 - open_hour, 0, len(curve) - 1)
+    return starts, curve[hours]
+
+def generate_chunk(centers, first_day, days, today, seed, seq_start, load=0.7, walkin_share=0.25,
+                   slot_minutes=60, open_hour=9, close_hour=17, walkin_buffer=0.20):
+    """
+    Builds consistent slot and request rows for [first_day, first_day + days).
+
+    Occupancy is drawn per (day, center, slot) cell first, capped at the same
+    scheduled / walk-in limits the allocator enforces, and requests are then
+    expanded from those counts, so both tables agree exactly. Output is fully
+    determined by the seed and the chunk boundaries.
+    Returns (requests_df, slots_df).
+    """
+    center_ids = np.asarray(centers["center_id"])
+    cities = np.asarray(centers["city"])
+    pincodes = np.asarray(centers["pincode"]).astype(str)
+    capacity = np.maximum(1, np.round(np.asarray(centers["capacity_per_hour"], dtype=float) * slot_minutes / 60)).astype(int)
+    scheduled_limit = (capacity * (1 - walkin_buffer)).astype(int)
+    city_weight = np.asarray([CITY_DEMAND.get(c, 1.0) for c in cities])
+    starts, slot_weight = _hourly_curve(open_hour, close_hour, slot_minutes)
+
+    booked_days, walkin_days = [], []
+    for d in range(days):
+        day = first_day + datetime.timedelta(days=d)
+        rng = np.random.default_rng([seed, day.toordinal()])
+        lam = load * WEEKDAY_DEMAND[day.weekday()] * city_weight[:, None] * capacity[:, None] * slot_weight[None, :]
+        booked = np.minimum(rng.poisson(lam * (1 - walkin_share)), scheduled_limit[:, None])
+        walkin = np.minimum(rng.poisson(lam * walkin_share), capacity[:, None] - booked)
+        booked_days.append(booked)
+        walkin_days.append(walkin)
+
+    booked = np.stack(booked_days)  # (day, center, slot)
+    walkin = np.stack(walkin_days)
+    day_idx, center_idx, slot_idx = np.indices(booked.shape).reshape(3, -1)
+    booked_flat, walkin_flat = booked.ravel(), walkin.ravel()
+    dates = np.asarray([str(first_day + datetime.timedelta(days=d)) for d in range(days)])
+
+    occupied = (booked_flat + walkin_flat) > 0
+    slots = pd.DataFrame({
+        "center_id": center_ids[center_idx[occupied]],
+        "date": dates[day_idx[occupied]],
+        "hour": starts[slot_idx[occupied]] // 60,
+        "minute": starts[slot_idx[occupied]] % 60,
+        "booked_count": booked_flat[occupied],
+        "walkin_count": walkin_flat[occupied]
+    }, columns=SLOT_COLUMNS)
+
+    # One request row per booked / walk-in unit, scheduled first within each cell
+    cell = np.concatenate([np.repeat(np.arange(booked_flat.size), booked_flat),
+                           np.repeat(np.arange(walkin_flat.size), walkin_flat)])
+    is_walkin = np.concatenate([np.zeros(booked_flat.sum(), dtype=bool), np.ones(walkin_flat.sum(), dtype=bool)])
+    order = np.argsort(cell, kind="stable")
+    cell, is_walkin = cell[order], is_walkin[order]
+    n = cell.size
+
+    rng = np.random.default_rng([seed, first_day.toordinal(), days])
+    r_day, r_center, r_slot = day_idx[cell], center_idx[cell], slot_idx[cell]
+
+    slot_start = (np.datetime64(first_day, "m") + r_day.astype("timedelta64[D]")
+                  + starts[r_slot].astype("timedelta64[m]"))
+    # Scheduled residents book 1h - 3 days ahead; walk-ins arrive within the slot's lead-up
+    lead = np.where(is_walkin, rng.integers(0, slot_minutes, n),
+                    np.minimum(60 + rng.exponential(900, n), 3 * 1440).astype(int))
+    booked_at = slot_start - lead.astype("timedelta64[m]") + rng.integers(0, 60, n).astype("timedelta64[s]")
+    same_day = booked_at.astype("datetime64[D]") == slot_start.astype("datetime64[D]")
+
+    past = np.datetime64(today, "D") > slot_start.astype("datetime64[D]")
+    status = np.where(past, "Completed",
+             np.where(same_day, "Confirmed",
+             np.where(is_walkin, "Deferred Walk-in", "De-congested (Next Day)")))
+
+    age = rng.integers(5, 81, n)
+    age_group = np.where(age < 18, "Child (0-18)", np.where(age < 60, "Adult (18-60)", "Senior (60+)"))
+    slot_labels = np.asarray([f"{m // 60:02d}:{m % 60:02d}" for m in starts])
+
+    requests = pd.DataFrame({
+        "request_id": "REQ" + pd.Series(np.arange(seq_start, seq_start + n)).astype(str).str.zfill(9),
+        "user_type": np.where(is_walkin, "Walk-in", "Scheduled"),
+        "input_city": cities[r_center],
+        "input_pincode": pincodes[r_center],
+        "request_type": np.asarray(REQUEST_TYPES)[rng.choice(len(REQUEST_TYPES), size=n, p=REQUEST_TYPE_SHARE)],
+        "status": status,
+        "assigned_center_id": center_ids[r_center],
+        "assigned_date": dates[r_day],
+        "assigned_time_slot": slot_labels[r_slot],
+        "timestamp": pd.Series(booked_at).astype(str).to_numpy(),
+        "name": (pd.Series(NAMES[rng.integers(0, NAMES.size, n)]) + " " +
+                 pd.Series(SURNAMES[rng.integers(0, SURNAMES.size, n)])).to_numpy(),
+        "phone": "98" + pd.Series(rng.integers(10_000_000, 100_000_000, n)).astype(str),
+        "age": age,
+        "age_group": age_group
+    }, columns=REQUEST_COLUMNS)
+    return requests, slots
+
+def generate_dataset(out_dir, start_date, days, today=None, seed=0, chunk_days=7, centers=None, **params):
+    """
+    Streams a dataset into out_dir/requests.csv and out_dir/slots.csv in
+    chunk_days chunks, so memory stays flat however many rows are produced.
+    Returns (request_rows, slot_rows).
+    """
+    centers = pd.DataFrame(centers or DEFAULT_CENTERS)
+    today = today or datetime.date.today()
+    os.makedirs(out_dir, exist_ok=True)
+    requests_path = os.path.join(out_dir, "requests.csv")
+    slots_path = os.path.join(out_dir, "slots.csv")
+
+    total_requests = total_slots = 0
+    for offset in range(0, days, chunk_days):
+        first_day = start_date + datetime.timedelta(days=offset)
+        requests, slots = generate_chunk(centers, first_day, min(chunk_days, days - offset), today, seed,
+                                         seq_start=total_requests, **params)
+        first = offset == 0
+        requests.to_csv(requests_path, mode="w" if first else "a", header=first, index=False)
+        slots.to_csv(slots_path, mode="w" if first else "a", header=first, index=False)
+        total_requests += len(requests)
+        total_slots += len(slots)
+    return total_requests, total_slots
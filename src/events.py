@@ -0,0 +1,133 @@
+import asyncio
+import json
+import queue
+import threading
+
+class _LoopQueue:
+    """
+    Subscriber queue consumed by a coroutine on an asyncio loop. Publishers run in
+    worker threads, so frames are handed over with call_soon_threadsafe.
+    """
+    def __init__(self, loop, maxsize):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self.maxsize = maxsize
+
+    def put_nowait(self, frame):
+        if self._queue.qsize() >= self.maxsize:
+            raise queue.Full
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, frame)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+class EventBroadcaster:
+    """
+    In-process fan-out of small admin deltas (bookings, status changes, slot
+    occupancy, redistributions). Each event is serialized once into an SSE frame
+    and the same bytes are handed to every matching subscriber, so publishing
+    stays cheap with hundreds of dashboards open.
+    """
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._subscribers = {}  # queue -> region
+        self._thread_subscribers = 0  # those consumed by a blocked worker thread (stream())
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def subscribe(self, region="All", q=None, limit=None):
+        """
+        Registers a subscriber queue. Without q, a thread-consumed queue is made;
+        limit caps how many of those may be open at once (None when full).
+        """
+        with self._lock:
+            if q is None:
+                if limit is not None and self._thread_subscribers >= limit:
+                    return None
+                q = queue.Queue(maxsize=self.max_queue)
+                self._thread_subscribers += 1
+            self._subscribers[q] = region
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            if self._subscribers.pop(q, None) is not None and isinstance(q, queue.Queue):
+                self._thread_subscribers -= 1
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event_type, data, city=None):
+        """
+        Pushes an event to every subscriber whose region matches the city
+        (same case-insensitive substring rule as the admin region filter).
+        Slow consumers that fall a full queue behind are dropped; their
+        dashboard reconnects and reloads a fresh snapshot.
+        """
+        with self._lock:
+            self._next_id += 1
+            frame = f"id: {self._next_id}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+            targets = list(self._subscribers.items())
+
+        city_key = (city or "").lower()
+        for q, region in targets:
+            if region != "All" and city is not None and region.lower() not in city_key:
+                continue
+            try:
+                q.put_nowait(frame)
+            except queue.Full:
+                self.unsubscribe(q)
+                self._close(q)
+
+    def _close(self, q):
+        # Wake the consumer so it can close the connection
+        if isinstance(q, _LoopQueue):
+            q.close()
+            return
+        try:
+            q.get_nowait()
+            q.put_nowait(None)
+        except (queue.Empty, queue.Full):
+            pass
+
+    def stream(self, region="All", heartbeat=15, q=None):
+        """
+        Generator yielding SSE frames for one subscriber until it is dropped.
+        Holds the calling thread for the whole connection; pass a q reserved
+        with subscribe(limit=...) to bound how many threads that can take.
+        """
+        q = q or self.subscribe(region)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    frame = q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(q)
+
+    async def astream(self, region="All", heartbeat=15):
+        """Async variant of stream() for the ASGI server; holds no thread per subscriber."""
+        q = _LoopQueue(asyncio.get_running_loop(), self.max_queue)
+        self.subscribe(region, q)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(q.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(q)
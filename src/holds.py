@@ -0,0 +1,56 @@
+import math
+
+class TimerWheel:
+    """
+    Hashed timer wheel for hold expiry. A deadline goes into bucket
+    (tick % size) where tick = ceil(deadline / resolution), so scheduling and
+    cancelling are O(1) dict operations. Advancing visits only the buckets for
+    ticks that elapsed (at most one revolution) and fires the entries that are
+    due; entries from a later revolution stay in their bucket. Nothing is ever
+    scanned by age, so idle outstanding timers cost no work.
+    """
+    def __init__(self, start, resolution=1.0, size=512):
+        self.resolution = resolution
+        self.size = size
+        self._buckets = [{} for _ in range(size)]  # key -> tick
+        self._ticks = {}  # key -> tick, for O(1) cancel
+        self._now_tick = math.floor(start / resolution)
+
+    def schedule(self, key, deadline):
+        self.cancel(key)
+        # A deadline already passed fires on the next advance, not a revolution later
+        tick = max(math.ceil(deadline / self.resolution), self._now_tick + 1)
+        self._buckets[tick % self.size][key] = tick
+        self._ticks[key] = tick
+
+    def cancel(self, key):
+        tick = self._ticks.pop(key, None)
+        if tick is None:
+            return False
+        del self._buckets[tick % self.size][key]
+        return True
+
+    def advance(self, now):
+        """Moves the wheel to `now` and returns the keys that fell due, earliest first."""
+        target = math.floor(now / self.resolution)
+        elapsed = target - self._now_tick
+        if elapsed <= 0:
+            return []
+        due = []
+        for tick in range(self._now_tick + 1, self._now_tick + 1 + min(elapsed, self.size)):
+            bucket = self._buckets[tick % self.size]
+            if bucket:
+                fired = [(t, key) for key, t in bucket.items() if t <= target]
+                for _, key in fired:
+                    del bucket[key]
+                    del self._ticks[key]
+                due.extend(fired)
+        self._now_tick = target
+        due.sort(key=lambda item: item[0])
+        return [key for _, key in due]
+
+    def __contains__(self, key):
+        return key in self._ticks
+
+    def __len__(self):
+        return len(self._ticks)
@@ -0,0 +1,178 @@
+import csv
+import os
+import re
+from functools import lru_cache
+
+from src.data_manager import DATA_DIR, DEFAULT_CENTERS
+
+# Optional nationwide directory (India Post style): pincode,locality,city,state
+PINCODE_FILE = os.path.join(DATA_DIR, "pincodes.csv")
+
+# Common alternate and historical names -> the city name centers use
+CITY_ALIASES = {
+    "delhi": "New Delhi",
+    "new delhi": "New Delhi",
+    "ndls": "New Delhi",
+    "bangalore": "Bengaluru",
+    "bengalooru": "Bengaluru",
+    "blr": "Bengaluru",
+    "bombay": "Mumbai",
+    "gurgaon": "Gurugram",
+    "ggn": "Gurugram",
+    "gautam buddh nagar": "Noida",
+    "greater noida": "Noida",
+    "gzb": "Ghaziabad"
+}
+
+# Typo tolerance: one edit, and only for keys at least this long
+FUZZY_MIN_LENGTH = 4
+FUZZY_CACHE_SIZE = 4096
+
+def normalize(text):
+    """Lowercase, drop punctuation, collapse whitespace."""
+    return " ".join(re.sub(r"[^0-9a-z ]+", " ", str(text).lower()).split())
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent swaps, so
+    'gurgoan' is one edit from 'gurgaon'). Returns limit + 1 once it is exceeded.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+class PrefixTrie:
+    """
+    Character trie whose every node keeps its first `top_k` entries, so an
+    autocomplete is a walk down len(prefix) nodes plus a list copy, however
+    many keys share the prefix. Entries are ranked by insertion order.
+    """
+    def __init__(self, top_k=8):
+        self.top_k = top_k
+        self.root = ({}, [])  # (children, top entries)
+
+    def insert(self, key, entry):
+        node = self.root
+        self._offer(node, entry)
+        for ch in key:
+            children = node[0]
+            child = children.get(ch)
+            if child is None:
+                child = children[ch] = ({}, [])
+            node = child
+            self._offer(node, entry)
+
+    def _offer(self, node, entry):
+        top = node[1]
+        if len(top) < self.top_k and entry not in top:
+            top.append(entry)
+
+    def complete(self, prefix, limit=None):
+        node = self.root
+        for ch in prefix:
+            node = node[0].get(ch)
+            if node is None:
+                return []
+        return node[1][:limit or self.top_k]
+
+class LocationDirectory:
+    """
+    Resolves what residents type into the city names centers use: exact name,
+    alias, the pincode's city in the directory, then a small-edit fuzzy match.
+    Also serves autocomplete for the city and pincode fields from two tries.
+    """
+    def __init__(self, centers=None, rows=()):
+        centers = DEFAULT_CENTERS if centers is None else centers
+        self.cities = {}          # normalized name or alias -> canonical city
+        self.pincodes = {}        # pincode -> (locality, canonical or raw city, state)
+        self.city_trie = PrefixTrie()
+        self.pincode_trie = PrefixTrie()
+
+        for center in centers:
+            self.cities[normalize(center["city"])] = center["city"]
+        for alias, city in CITY_ALIASES.items():
+            self.cities[normalize(alias)] = city
+        self._known = sorted(self.cities)
+        self._fuzzy_cache = {}    # typed key -> fuzzy result (None included), bounded below
+
+        # Center pincodes first, so they rank ahead of the rest of the directory
+        for center in centers:
+            self._add_pincode(str(center["pincode"]), center["name"], center["city"], "")
+        for pincode, locality, city, state in rows:
+            self._add_pincode(str(pincode).strip(), locality, city, state)
+
+        for name in sorted(self.cities, key=lambda n: (n != normalize(self.cities[n]), n)):
+            self.city_trie.insert(name, self.cities[name])
+        for pincode, (locality, city, state) in self.pincodes.items():
+            self.pincode_trie.insert(pincode, (pincode, locality, city))
+
+    def _add_pincode(self, pincode, locality, city, state):
+        if pincode and pincode not in self.pincodes:
+            self.pincodes[pincode] = (locality, self.cities.get(normalize(city), city), state)
+
+    @classmethod
+    def load(cls, path=PINCODE_FILE, centers=None):
+        """Builds the directory from centers plus the pincode file, if present."""
+        rows = []
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = [(r["pincode"], r.get("locality", ""), r.get("city", ""), r.get("state", ""))
+                        for r in csv.DictReader(f)]
+        return cls(centers, rows)
+
+    def resolve_city(self, city, pincode=None):
+        """Canonical city for what was typed, or None when nothing is close enough."""
+        key = normalize(city)
+        if key in self.cities:
+            return self.cities[key]
+        entry = self.pincodes.get(str(pincode).strip()) if pincode else None
+        if entry:
+            listed = normalize(entry[1])
+            resolved = self.cities.get(listed) or self._fuzzy(listed)
+            if resolved:
+                return resolved
+        return self._fuzzy(key) if key else None
+
+    def _fuzzy(self, key):
+        """
+        The one city within a single edit of what was typed, sharing its first
+        letter. Different cities often differ by one or two letters
+        ('mangaluru' / 'bengaluru'), so short keys, other first letters and
+        ties between cities resolve to None rather than to a guess.
+        """
+        if key in self._fuzzy_cache:
+            return self._fuzzy_cache[key]
+        found = set()
+        if len(key) >= FUZZY_MIN_LENGTH:
+            for name in self._known:
+                if name[0] == key[0] and edit_distance(key, name, 1) <= 1:
+                    found.add(self.cities[name])
+        result = found.pop() if len(found) == 1 else None
+        if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[key] = result
+        return result
+
+    def autocomplete(self, query, limit=8):
+        """Pincode suggestions for digits, city suggestions otherwise."""
+        query = str(query).strip()
+        if query.isdigit():
+            return [{"pincode": p, "locality": loc, "city": city}
+                    for p, loc, city in self.pincode_trie.complete(query, limit)]
+        return [{"city": city} for city in self.city_trie.complete(normalize(query), limit)]
+
+@lru_cache(maxsize=1)
+def default_directory():
+    """Process-wide directory, loaded on first use (in the master when preloaded)."""
+    return LocationDirectory.load()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from src.data_manager import SLOT_COLUMNS
+
+SLOT_KEYS = ["center_id", "date", "hour", "minute"]
+LOAD_COLUMNS = ["booked_count", "walkin_count"]
+# Requests in these states hold no slot; every other state counts (including Completed)
+RELEASED_STATUSES = ("Cancelled", "Waitlisted")
+
+def expected_slot_loads(requests):
+    """
+    Slot occupancy implied by the requests table, in one categorical groupby:
+    scheduled residents count towards booked_count, walk-ins towards
+    walkin_count. Returns (slots in SLOT_COLUMNS layout, number of live
+    requests whose date or time slot could not be parsed).
+    """
+    empty = pd.DataFrame(columns=SLOT_COLUMNS).astype({"hour": int, "minute": int, "booked_count": int, "walkin_count": int})
+    if requests.empty:
+        return empty, 0
+    live = requests[~requests["status"].isin(RELEASED_STATUSES)]
+
+    # Parse "HH:MM" (or legacy "HH:MM - HH:MM") once per distinct label, not per row
+    slot = live["assigned_time_slot"].astype("category")
+    labels = slot.cat.categories.astype(str)
+    hours = np.append(pd.to_numeric(labels.str[:2], errors="coerce").to_numpy(dtype=float), np.nan)
+    minutes = np.append(pd.to_numeric(labels.str[3:5], errors="coerce").to_numpy(dtype=float), np.nan)
+    codes = slot.cat.codes.to_numpy()
+    hour, minute = hours[codes], minutes[codes]
+
+    date = live["assigned_date"].astype("category")
+    dates = date.cat.categories.astype(str)
+    date_ok = np.append(pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce").notna(), False)[date.cat.codes.to_numpy()]
+    valid = date_ok & ~np.isnan(hour) & ~np.isnan(minute) & live["assigned_center_id"].notna().to_numpy()
+
+    is_walkin = (live["user_type"] == "Walk-in").to_numpy()
+    # Grouping on category codes is much faster than hashing strings row by row
+    keys = pd.DataFrame({
+        "center_id": live["assigned_center_id"].astype("category").iloc[valid].reset_index(drop=True),
+        "date": date.iloc[valid].reset_index(drop=True),
+        "hour": hour[valid].astype(int),
+        "minute": minute[valid].astype(int),
+        "booked_count": (~is_walkin[valid]).astype(int),
+        "walkin_count": is_walkin[valid].astype(int)
+    })
+    if keys.empty:
+        return empty, int((~valid).sum())
+    loads = keys.groupby(SLOT_KEYS, observed=True)[LOAD_COLUMNS].sum().reset_index()
+    for col in ("center_id", "date"):
+        loads[col] = loads[col].astype(str)  # Clean-up runs on the aggregate rows only
+    return loads[SLOT_COLUMNS], int((~valid).sum())
+
+def reconcile(requests, slots):
+    """
+    Compares stored slot occupancy with what the requests imply.
+    Returns (rebuilt slots, mismatches, summary). rebuilt is the slots table
+    recomputed from requests; mismatches has one row per slot whose stored and
+    expected counts differ (stored_* / expected_* columns), largest drift first.
+    """
+    expected, unparseable = expected_slot_loads(requests)
+
+    # Hourly-only files predate sub-hour slots; their missing minute reads as 0
+    stored = slots.reindex(columns=SLOT_COLUMNS) if not slots.empty else pd.DataFrame(columns=SLOT_COLUMNS)
+    stored["center_id"] = stored["center_id"].astype(str)
+    stored["date"] = stored["date"].astype(str)
+    stored[["hour", "minute"]] = stored[["hour", "minute"]].fillna(0).astype(int)
+    stored[LOAD_COLUMNS] = stored[LOAD_COLUMNS].fillna(0).astype(int)
+    duplicate_rows = int(stored.duplicated(SLOT_KEYS).sum())
+    stored = stored.groupby(SLOT_KEYS)[LOAD_COLUMNS].sum()
+
+    merged = stored.join(expected.set_index(SLOT_KEYS), how="outer", lsuffix="_stored", rsuffix="_expected")
+    merged = merged.fillna(0).astype(int)
+    merged.columns = ["stored_booked", "stored_walkin", "expected_booked", "expected_walkin"]
+    booked_drift = merged["stored_booked"] - merged["expected_booked"]
+    walkin_drift = merged["stored_walkin"] - merged["expected_walkin"]
+    drift = booked_drift.abs() + walkin_drift.abs()
+    mismatches = merged[drift > 0].assign(drift=drift[drift > 0])
+    mismatches = mismatches.sort_values("drift", ascending=False, kind="stable").reset_index()
+
+    summary = {
+        "requests": int(len(requests)),
+        "slots_stored": int(len(slots)),
+        "slots_expected": int(len(expected)),
+        "mismatched_slots": int(len(mismatches)),
+        "over_counted_slots": int(((booked_drift > 0) | (walkin_drift > 0)).sum()),
+        "booked_drift": int(booked_drift.sum()),
+        "walkin_drift": int(walkin_drift.sum()),
+        "duplicate_rows": duplicate_rows,
+        "unparseable_requests": unparseable
+    }
+    return expected, mismatches, summary
@@ -0,0 +1,99 @@
+import datetime
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+import pandas as pd
+
+from src.data_manager import DATA_DIR, DEFAULT_CENTERS, table_dirs
+from src.reconcile import RELEASED_STATUSES
+
+ROSTER_COLUMNS = ["request_id", "user_type", "request_type", "status", "assigned_center_id",
+                  "assigned_date", "assigned_time_slot", "name", "phone", "age_group"]
+
+def load_bookings(date, data_dir=DATA_DIR, chunksize=500_000):
+    """
+    Live bookings for one date across every shard, read in chunks so memory
+    follows the day's bookings rather than the size of requests.csv. A booking
+    found in more than one table keeps its shard copy (read last).
+    """
+    date = str(date)
+    parts = []
+    for path in table_dirs(data_dir):
+        with pd.read_csv(os.path.join(path, "requests.csv"), dtype=str, chunksize=chunksize,
+                         usecols=lambda col: col in ROSTER_COLUMNS) as reader:
+            for chunk in reader:
+                parts.append(chunk[(chunk["assigned_date"] == date) & ~chunk["status"].isin(RELEASED_STATUSES)])
+    bookings = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=ROSTER_COLUMNS)
+    bookings = bookings.drop_duplicates("request_id", keep="last")
+    return bookings.reindex(columns=ROSTER_COLUMNS).fillna("")
+
+def mask_phone(phone):
+    phone = str(phone).removesuffix(".0")
+    return phone[:2] + "*" * (len(phone) - 4) + phone[-2:] if len(phone) > 4 else phone
+
+def render_center(task):
+    """
+    Writes one center's roster (appointments grouped by hour) and its receipts
+    (one JSON line per booking). Runs in a worker process; files are written
+    line by line to a temporary name and renamed when complete.
+    """
+    center, date, bookings, out_dir, issued_at = task
+    bookings = bookings.sort_values(["assigned_time_slot", "user_type", "request_id"], kind="stable")
+    roster_path = os.path.join(out_dir, f"{center['center_id']}_roster.txt")
+    receipts_path = os.path.join(out_dir, f"{center['center_id']}_receipts.jsonl")
+
+    walkins = int((bookings["user_type"] == "Walk-in").sum())
+    rows = list(bookings.itertuples(index=False))
+    with open(roster_path + ".tmp", "w", encoding="utf-8") as roster:
+        roster.write(f"{center['name']} ({center['center_id']}), {center['city']} {center['pincode']}\n")
+        roster.write(f"Roster for {date}: {len(rows)} appointments "
+                     f"({len(rows) - walkins} scheduled, {walkins} walk-in)\n")
+        if not rows:
+            roster.write("\nNo appointments.\n")
+        for hour, hour_rows in groupby(rows, key=lambda r: str(r.assigned_time_slot)[:2]):
+            hour_rows = list(hour_rows)
+            roster.write(f"\n{hour}:00  ({len(hour_rows)})\n")
+            for r in hour_rows:
+                roster.write(f"  {r.assigned_time_slot:<6} {r.request_id:<14} {r.user_type:<10} "
+                             f"{r.request_type:<20} {r.name:<24} {r.age_group}\n")
+
+    with open(receipts_path + ".tmp", "w", encoding="utf-8") as receipts:
+        for r in rows:
+            receipts.write(json.dumps({
+                "request_id": r.request_id,
+                "name": r.name,
+                "phone": mask_phone(r.phone),
+                "request_type": r.request_type,
+                "status": r.status,
+                "center_id": center["center_id"],
+                "center_name": center["name"],
+                "date": str(date),
+                "time_slot": r.assigned_time_slot,
+                "issued_at": issued_at,
+                "text": f"Appointment receipt {r.request_id}: {r.request_type} at {center['name']} on {date} "
+                        f"at {r.assigned_time_slot}. Please carry your documents. - UIDAI"
+            }) + "\n")
+
+    os.replace(roster_path + ".tmp", roster_path)
+    os.replace(receipts_path + ".tmp", receipts_path)
+    return {"center_id": center["center_id"], "appointments": len(rows), "walkins": walkins}
+
+def generate_rosters(date, out_dir, data_dir=DATA_DIR, centers=None, processes=None):
+    """
+    Rosters and receipts for every center on `date` under out_dir/<date>/.
+    Bookings are read and grouped by center once; each center is rendered in
+    its own pool task, receiving only its own rows. Returns a per-center
+    summary in center order.
+    """
+    centers = DEFAULT_CENTERS if centers is None else centers
+    out_dir = os.path.join(out_dir, str(date))
+    os.makedirs(out_dir, exist_ok=True)
+    bookings = load_bookings(date, data_dir)
+    by_center = dict(iter(bookings.groupby("assigned_center_id", sort=False)))
+    issued_at = str(datetime.datetime.now().replace(microsecond=0))
+    tasks = [(center, date, by_center.get(center["center_id"], bookings.iloc[:0]), out_dir, issued_at)
+             for center in centers]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(render_center, tasks))
@@ -0,0 +1,64 @@
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError: # Optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError: # Optional: gzip only
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024 # Below this the headers outweigh the savings
+
+def dumps(obj):
+    """Encodes obj to JSON bytes, using orjson when it is installed. Tables go through frame_to_json."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=str).encode()
+
+def frame_to_json(df):
+    """
+    Encodes a DataFrame as a JSON array of records straight from its columns,
+    without building a dict per row. Missing values become null.
+    """
+    return df.to_json(orient="records", date_format="iso", force_ascii=False).encode()
+
+def with_fields(obj, **raw_fields):
+    """Splices already-encoded JSON values into the encoding of a dict."""
+    body = dumps(obj)
+    extra = b",".join(dumps(key) + b":" + value for key, value in raw_fields.items())
+    if not extra:
+        return body
+    return body[:-1] + (b"," if obj else b"") + extra + b"}"
+
+def negotiate_encoding(accept_encoding):
+    """Picks br or gzip from an Accept-Encoding header, honouring q=0."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def compress(body, accept_encoding):
+    """Returns (body, content_encoding or None) for a response body."""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding == "br":
+        return brotli.compress(body, quality=4), encoding
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=5), encoding
+    return body, None
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+from src.backend import CrowdSystemBackend
+from src.data_manager import (DATA_DIR, DEFAULT_CENTERS, IMPORT_MARKER, REQUEST_COLUMNS, DataManager, imported_digest,
+                               requests_digest)
+from src.events import EventBroadcaster
+from src.locations import default_directory
+from src.reconcile import expected_slot_loads
+
+# Shards follow state lines: a surge in one state never contends with another
+SHARD_BY_CITY = {
+    "New Delhi": "DL",
+    "Noida": "UP",
+    "Ghaziabad": "UP",
+    "Gurugram": "HR",
+    "Mumbai": "MH",
+    "Bengaluru": "KA"
+}
+
+def shard_code(city):
+    return SHARD_BY_CITY.get(city) or str(city)[:2].upper()
+
+def backend_settings(environ=os.environ):
+    """
+    Per-deployment booking horizon and slot length, read from HORIZON_DAYS
+    (default 3) and SLOT_MINUTES (default 60, or 15/30 for finer slots).
+    """
+    return {
+        "horizon_days": int(environ.get("HORIZON_DAYS", 3)),
+        "slot_minutes": int(environ.get("SLOT_MINUTES", 60))
+    }
+
+class Shard:
+    """One region's backend (own CSVs, slot index, queues, dedupe cache) and its write lock."""
+    def __init__(self, code, backend):
+        self.code = code
+        self.backend = backend
+        self.lock = threading.Lock()
+
+class ShardRouter:
+    """
+    Partitions centers into per-state shards, each with its own DataManager under
+    data/<code>/, and routes work to them: bookings by pincode then city (the
+    same precedence as find_best_center), tracking by the shard code embedded in
+    the request ID (REQ<code><digits>), and admin queries by region. Shards share
+    only the admin event stream.
+    """
+    def __init__(self, data_dir=DATA_DIR, centers=None, **backend_kwargs):
+        centers = pd.DataFrame(DEFAULT_CENTERS if centers is None else centers)
+        codes = centers["city"].map(shard_code)
+        self.events = EventBroadcaster()
+        self.locations = default_directory()
+        self._by_center = dict(zip(centers["center_id"], codes))
+        self._by_pincode = dict(zip(centers["pincode"].astype(str), codes))
+        self._by_city = dict(zip(centers["city"].str.lower(), codes))
+        self.default_code = codes.iloc[0] # Unknown locations fall back to the first center, as before
+
+        self._sweeper_pid = None
+        self._sweeper_lock = threading.Lock()
+        self._import_unsharded(data_dir)
+        self.shards = {}
+        for code, group in centers.groupby(codes, sort=False):
+            dm = DataManager(os.path.join(data_dir, code), centers=group.to_dict(orient="records"))
+            backend = CrowdSystemBackend(data_manager=dm, events=self.events, request_prefix=f"REQ{code}",
+                                         locations=self.locations, **backend_kwargs)
+            self.shards[code] = Shard(code, backend)
+
+    def __iter__(self):
+        return iter(self.shards.values())
+
+    @property
+    def version(self):
+        """Changes whenever any shard persists a mutation."""
+        return tuple(shard.backend.dm.version for shard in self)
+
+    def route(self, city, pincode):
+        city = self.locations.resolve_city(city, pincode) or city
+        code = self._by_pincode.get(str(pincode)) or self._by_city.get(str(city).lower()) or self.default_code
+        return self.shards[code]
+
+    def for_center(self, center_id):
+        code = self._by_center.get(center_id)
+        return self.shards[code] if code else None
+
+    def for_request(self, request_id):
+        """Shard holding a request, or None. IDs from before sharding are looked up in every shard."""
+        request_id = str(request_id)
+        shard = self.shards.get(request_id[3:5]) if request_id.startswith("REQ") else None
+        if shard is not None:
+            return shard
+        for shard in self:
+            req = shard.backend.dm.requests
+            if not req.empty and (req["request_id"] == request_id).any():
+                return shard
+        return None
+
+    def for_hold(self, hold_id):
+        """Shard holding a slot hold (HLD<code><token>), or None."""
+        return self.shards.get(str(hold_id)[3:5]) if str(hold_id).startswith("HLD") else None
+
+    def for_region(self, region):
+        """Shards an admin region can see; region is matched against city names like get_region_view."""
+        if region == 'All':
+            return list(self)
+        region = str(region).lower()
+        codes = {code for city, code in self._by_city.items() if region in city}
+        # A region naming no known city may still match free-text input_city values anywhere
+        return [shard for shard in self if shard.code in codes] or list(self)
+
+    def centers(self):
+        return pd.concat([shard.backend.get_all_centers() for shard in self], ignore_index=True)
+
+    def region_view(self, region):
+        """Requests for a region across its shards (read-only, like get_region_view)."""
+        views = [shard.backend.dm.get_region_view(region) for shard in self.for_region(region)]
+        return views[0] if len(views) == 1 else pd.concat(views, ignore_index=True)
+
+    def process_request(self, user_details, idempotency_key=None):
+        shard = self.route(user_details.get("city", ""), user_details.get("pincode", ""))
+        with shard.lock:
+            return shard.backend.process_request(user_details, idempotency_key=idempotency_key)
+
+    def expire_holds(self):
+        """Sweeps lapsed holds in shards that have any, each under its write lock."""
+        for shard in self:
+            if shard.backend.held_count:
+                with shard.lock:
+                    shard.backend.expire_holds()
+
+    def ensure_hold_sweeper(self, interval=1.0):
+        """
+        Starts, once per process (workers fork after preload), a daemon thread
+        that expires lapsed holds every interval seconds, so their slots come
+        back on quiet shards without readers doing any writes.
+        """
+        if self._sweeper_pid == os.getpid():
+            return
+        with self._sweeper_lock:
+            if self._sweeper_pid != os.getpid():
+                self._sweeper_pid = os.getpid()
+                threading.Thread(target=self._sweep_holds, args=(interval,), name="hold-sweeper", daemon=True).start()
+
+    def _sweep_holds(self, interval):
+        while True:
+            time.sleep(interval)
+            self.expire_holds()
+
+    def reconcile(self, apply=False):
+        """Per-shard reconcile_slots results, each shard checked under its own lock."""
+        results = {}
+        for shard in self:
+            with shard.lock:
+                results[shard.code] = shard.backend.reconcile_slots(apply)
+        return results
+
+    def preload(self):
+        for shard in self:
+            shard.backend.preload()
+
+    def reset(self):
+        for shard in self:
+            with shard.lock:
+                shard.backend.reset_system()
+
+    def _import_unsharded(self, data_dir):
+        """
+        Splits an unsharded data/requests.csv (older installs, bulk seeding) into
+        the shard directories. The source files are only read, never moved, and
+        the hash of requests.csv is recorded so an unchanged source is not
+        imported twice. On import, each shard keeps the rows it created itself
+        (REQ<code> IDs) and takes the source's rows in place of anything imported
+        before, so re-seeding replaces rather than appends. Shard slots are then
+        rebuilt from the merged requests, so drift in the source slots.csv is not
+        carried over. slots.csv is not hashed at all: rewriting it
+        (reconcile_slots.py --apply) must not trigger a re-import that would
+        revert cancellations or redistributions of imported bookings.
+        """
+        digest = requests_digest(data_dir)
+        if digest is None or digest == imported_digest(data_dir):
+            return
+
+        source = pd.read_csv(os.path.join(data_dir, "requests.csv")).reindex(columns=REQUEST_COLUMNS)
+        codes = source["assigned_center_id"].map(self._by_center).fillna(self.default_code)
+        for code in set(codes) | set(self._by_center.values()):
+            shard_dir = os.path.join(data_dir, code)
+            target = os.path.join(shard_dir, "requests.csv")
+            if not os.path.exists(target) and not (codes == code).any():
+                continue
+            os.makedirs(shard_dir, exist_ok=True)
+            part = source[codes == code]
+            if os.path.exists(target):
+                existing = pd.read_csv(target)
+                native = existing[existing["request_id"].astype(str).str.startswith(f"REQ{code}")]
+                part = pd.concat([native, part[~part["request_id"].isin(native["request_id"])]], ignore_index=True)
+            part.to_csv(target, index=False)
+            slots, _ = expected_slot_loads(part)
+            slots.to_csv(os.path.join(shard_dir, "slots.csv"), index=False)
+
+        with open(os.path.join(data_dir, IMPORT_MARKER), "w") as f:
+            f.write(digest)
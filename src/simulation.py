@@ -0,0 +1,198 @@
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.backend import CrowdSystemBackend
+from src.data_manager import DataManager, DEFAULT_CENTERS
+
+REQUEST_TYPES = ["New Enrollment", "Biometric Update", "Demographic Update", "eKYC"]
+REQUEST_TYPE_SHARE = [0.20, 0.35, 0.30, 0.15]
+
+# Relative demand per opening hour (9 AM .. 4 PM slot starts), morning-heavy
+HOURLY_DEMAND = [0.9, 1.3, 1.4, 1.2, 0.8, 1.0, 0.9, 0.5]
+# Mon .. Sun
+WEEKDAY_DEMAND = [1.25, 1.1, 1.0, 1.0, 1.05, 0.9, 0.7]
+
+class SimClock:
+    """Stand-in for get_current_time(); the simulator moves it forward per event."""
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+class InMemoryDataManager(DataManager):
+    """
+    DataManager with the same slot/request API but no CSV I/O, so the real
+    allocation path can run for millions of events. Slot loads live in a dict;
+    the slots DataFrame is only materialized when the slot index rebuilds
+    (once per simulated day).
+    """
+    def __init__(self, centers=None):
+        self.centers = pd.DataFrame(centers or DEFAULT_CENTERS)
+        self.requests = pd.DataFrame()
+        self.version = 0
+        self.slots_version = 0
+        self._region_views = {}
+        self._loads = {}  # (center_id, date_str, hour, minute) -> [booked, walkin]
+        self.log = []
+
+    @property
+    def slots(self):
+        rows = [(cid, d, h, m, b, w) for (cid, d, h, m), (b, w) in self._loads.items()]
+        return pd.DataFrame(rows, columns=["center_id", "date", "hour", "minute", "booked_count", "walkin_count"])
+
+    def save_requests(self):
+        pass
+
+    def save_slots(self):
+        pass
+
+    def add_request(self, request_data):
+        self.log.append(request_data)
+
+    def get_slot_load(self, center_id, date, hour, minute=0):
+        booked, walkin = self._loads.get((center_id, str(date), int(hour), int(minute)), (0, 0))
+        return booked, walkin, booked + walkin
+
+    def update_slot_load(self, center_id, date, hour, is_walkin=False, minute=0, delta=1):
+        load = self._loads.setdefault((center_id, str(date), int(hour), int(minute)), [0, 0])
+        load[1 if is_walkin else 0] = max(0, load[1 if is_walkin else 0] + delta)
+
+def generate_arrivals(centers, start_date, days, load_factor=1.0, walkin_share=0.25, seed=0):
+    """
+    Synthetic arrivals, vectorized per (day, center, hour) cell. The expected count
+    is load_factor x capacity_per_hour shaped by HOURLY_DEMAND and WEEKDAY_DEMAND,
+    drawn as Poisson, then spread uniformly within the hour.
+    Returns a DataFrame sorted by arrival time: minute (since start_date 00:00),
+    center_id, is_walkin, request_type.
+    """
+    rng = np.random.default_rng(seed)
+    center_ids = np.asarray(centers['center_id'])
+    capacity = np.asarray(centers['capacity_per_hour'], dtype=float)
+    hourly = np.asarray(HOURLY_DEMAND) / np.mean(HOURLY_DEMAND)
+    weekday = np.asarray([WEEKDAY_DEMAND[(start_date + datetime.timedelta(days=d)).weekday()] for d in range(days)])
+
+    # (day, center, hour) expected arrivals
+    lam = load_factor * weekday[:, None, None] * capacity[None, :, None] * hourly[None, None, :]
+    counts = rng.poisson(lam).ravel()
+    total = int(counts.sum())
+
+    day_idx, center_idx, hour_idx = np.unravel_index(np.repeat(np.arange(counts.size), counts), lam.shape)
+    minute = day_idx * 1440 + (9 + hour_idx) * 60 + rng.random(total) * 60
+    order = np.argsort(minute, kind="stable")
+
+    return pd.DataFrame({
+        "minute": minute[order],
+        "center_id": center_ids[center_idx[order]],
+        "is_walkin": rng.random(total)[order] < walkin_share,
+        "request_type": np.asarray(REQUEST_TYPES)[rng.choice(len(REQUEST_TYPES), size=total, p=REQUEST_TYPE_SHARE)][order]
+    })
+
+def arrivals_from_requests(requests_df, backend, start_date=None):
+    """
+    Replays logged requests (requests.csv layout) as arrivals. Centers are
+    resolved once per distinct (city, pincode) through find_best_center.
+    """
+    df = requests_df.dropna(subset=["timestamp"])
+    ts = pd.to_datetime(df["timestamp"])
+    if start_date is None:
+        start_date = ts.min().date()
+    minute = (ts - pd.Timestamp(start_date)).dt.total_seconds().to_numpy() / 60
+
+    pairs = df[["input_city", "input_pincode"]].astype(str).drop_duplicates()
+    lookup = {(c, p): backend.find_best_center(c, p)['center_id'] for c, p in pairs.itertuples(index=False)}
+    center_id = [lookup[(c, p)] for c, p in zip(df["input_city"].astype(str), df["input_pincode"].astype(str))]
+
+    out = pd.DataFrame({
+        "minute": minute,
+        "center_id": center_id,
+        "is_walkin": (df["user_type"] == "Walk-in").to_numpy(),
+        "request_type": df["request_type"].to_numpy()
+    })
+    return out.sort_values("minute", kind="stable").reset_index(drop=True), start_date
+
+def simulate(arrivals, start_date, days, centers=None, capacity_factor=1.0, walkin_buffer=0.20,
+             horizon_days=3, slot_minutes=60):
+    """
+    Runs arrivals through CrowdSystemBackend.allocate_slot_automatically with an
+    injected clock and reports utilization, deferrals, rejections and waits.
+    """
+    centers = pd.DataFrame(centers or DEFAULT_CENTERS)
+    centers["capacity_per_hour"] = (centers["capacity_per_hour"] * capacity_factor).round().astype(int)
+
+    start = datetime.datetime.combine(start_date, datetime.time())
+    clock = SimClock(start)
+    backend = CrowdSystemBackend(horizon_days=horizon_days, slot_minutes=slot_minutes,
+                                 data_manager=InMemoryDataManager(centers.to_dict("records")), clock=clock)
+    backend.WALKIN_BUFFER_PERCENT = walkin_buffer
+
+    n = len(arrivals)
+    wait = np.full(n, np.nan)
+    deferred = np.zeros(n, dtype=bool)
+    served_in_period = np.zeros(n, dtype=bool)
+    end_date = start_date + datetime.timedelta(days=days)
+
+    minutes = arrivals["minute"].to_numpy()
+    for i, (m, cid, is_walkin) in enumerate(zip(minutes.tolist(), arrivals["center_id"].tolist(),
+                                               arrivals["is_walkin"].tolist())):
+        clock.now = start + datetime.timedelta(minutes=m)
+        date, hour, minute, is_deferred = backend.allocate_slot_automatically(cid, is_walkin=is_walkin)
+        if date is None:
+            continue
+        backend._book_slot(cid, date, hour, minute, is_walkin)
+        slot_start = datetime.datetime.combine(date, datetime.time(hour, minute))
+        wait[i] = max(0.0, (slot_start - clock.now).total_seconds() / 60)
+        deferred[i] = is_deferred
+        served_in_period[i] = date < end_date
+
+    result = arrivals.assign(wait_min=wait, deferred=deferred, served=~np.isnan(wait))
+
+    slots_per_day = (backend.CLOSE_HOUR - backend.OPEN_HOUR) * 60 // slot_minutes
+    slot_capacity = np.maximum(1, np.round(centers["capacity_per_hour"] * slot_minutes / 60))
+    capacity_total = float(slot_capacity.sum()) * slots_per_day * days
+    return {
+        "arrivals": n,
+        "served": int(result["served"].sum()),
+        "rejected": int((~result["served"]).sum()),
+        "utilization": float(served_in_period.sum()) / capacity_total if capacity_total else 0.0,
+        "deferral_rate": float(deferred.mean()) if n else 0.0,
+        "mean_wait_min": float(np.nanmean(wait)) if result["served"].any() else None,
+        "p90_wait_min": float(np.nanpercentile(wait, 90)) if result["served"].any() else None,
+        "by_center": _summarize(result, "center_id"),
+        "by_request_type": _summarize(result, ["request_type", "is_walkin"])
+    }
+
+def _summarize(result, keys):
+    grouped = result.groupby(keys)
+    summary = pd.DataFrame({
+        "arrivals": grouped.size(),
+        "served": grouped["served"].sum(),
+        "deferral_rate": grouped["deferred"].mean(),
+        "mean_wait_min": grouped["wait_min"].mean(),
+        "p90_wait_min": grouped["wait_min"].quantile(0.9)
+    })
+    return summary.reset_index()
+
+def run_scenario(scenario):
+    """
+    One sweep point. Arrivals are generated inside the worker from the seed,
+    so only the small scenario dict crosses the process boundary.
+    """
+    scenario = dict(scenario)
+    start_date = scenario.pop("start_date", datetime.date.today())
+    days = scenario.pop("days", 30)
+    centers = pd.DataFrame(scenario.pop("centers", None) or DEFAULT_CENTERS)
+    arrivals = generate_arrivals(centers, start_date, days,
+                                 load_factor=scenario.pop("load_factor", 1.0),
+                                 walkin_share=scenario.pop("walkin_share", 0.25),
+                                 seed=scenario.pop("seed", 0))
+    report = simulate(arrivals, start_date, days, centers=centers.to_dict("records"), **scenario)
+    return report
+
+def sweep(scenarios, processes=None):
+    """Runs scenarios in parallel across cores; results keep the input order."""
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(run_scenario, scenarios))
@@ -0,0 +1,149 @@
+import datetime
+
+class FreeCapacityTree:
+    """
+    Max segment tree over a center's slots in the search horizon. Each leaf holds
+    the remaining capacity of one slot, so the first slot with room at or after a
+    position is found by a single root-to-leaf descent instead of a scan.
+    """
+    def __init__(self, values):
+        self.n = len(values)
+        self.size = 1
+        while self.size < max(1, self.n):
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+        self.tree[self.size:self.size + self.n] = values
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def update(self, pos, value):
+        node = pos + self.size
+        self.tree[node] = value
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def first_free(self, start=0):
+        """Leftmost position >= start with remaining capacity, or -1."""
+        if start >= self.n:
+            return -1
+        return self._descend(1, 0, self.size - 1, start)
+
+    def _descend(self, node, lo, hi, start):
+        if hi < start or self.tree[node] <= 0:
+            return -1
+        if lo == hi:
+            return lo
+        mid = (lo + hi) // 2
+        found = self._descend(2 * node, lo, mid, start)
+        if found != -1:
+            return found
+        return self._descend(2 * node + 1, mid + 1, hi, start)
+
+class SlotIndex:
+    """
+    Free-capacity index for every center over [start_date, start_date + horizon_days).
+    Keeps two trees per center: one against the scheduled limit (booked count vs the
+    walk-in-buffered capacity) and one against full capacity (booked + walk-ins).
+    """
+    def __init__(self, start_date, horizon_days, open_hour, close_hour, slot_minutes):
+        self.start_date = start_date
+        self.horizon_days = horizon_days
+        self.open_minute = open_hour * 60
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = (close_hour - open_hour) * 60 // slot_minutes
+        self.n = horizon_days * self.slots_per_day
+        self._centers = {}  # center_id -> dict(booked, walkin, limits, trees)
+
+    def build(self, centers_df, slots_df, walkin_buffer):
+        """Bulk-loads occupancy from the slots table in one pass."""
+        loads = {cid: ([0] * self.n, [0] * self.n) for cid in centers_df['center_id']}
+
+        if not slots_df.empty:
+            dates = {str(self.start_date + datetime.timedelta(days=d)): d for d in range(self.horizon_days)}
+            df = slots_df[slots_df['date'].astype(str).isin(dates)]
+            if not df.empty:
+                minutes = df['hour'].astype(int) * 60 + df['minute'].fillna(0).astype(int) - self.open_minute
+                slot = minutes // self.slot_minutes
+                aligned = (minutes % self.slot_minutes == 0) & (slot >= 0) & (slot < self.slots_per_day)
+                df = df[aligned]
+                pos = df['date'].astype(str).map(dates) * self.slots_per_day + slot[aligned]
+                for cid, p, b, w in zip(df['center_id'], pos, df['booked_count'], df['walkin_count']):
+                    if cid in loads:
+                        loads[cid][0][p] += int(b)
+                        loads[cid][1][p] += int(w)
+
+        for cid, cap in zip(centers_df['center_id'], centers_df['capacity_per_hour']):
+            slot_capacity = max(1, round(int(cap) * self.slot_minutes / 60))
+            scheduled_limit = int(slot_capacity * (1 - walkin_buffer))
+            booked, walkin = loads[cid]
+            self._centers[cid] = {
+                "booked": booked,
+                "walkin": walkin,
+                "limits": (scheduled_limit, slot_capacity),
+                "scheduled": FreeCapacityTree([scheduled_limit - b for b in booked]),
+                "walkin_tree": FreeCapacityTree([slot_capacity - b - w for b, w in zip(booked, walkin)])
+            }
+        return self
+
+    def position(self, date, hour, minute=0):
+        offset = (date - self.start_date).days
+        return offset * self.slots_per_day + (hour * 60 + minute - self.open_minute) // self.slot_minutes
+
+    def slot_at(self, pos):
+        """Returns (date, hour, minute, day_offset) for a position."""
+        day_offset, slot = divmod(pos, self.slots_per_day)
+        start = self.open_minute + slot * self.slot_minutes
+        return self.start_date + datetime.timedelta(days=day_offset), start // 60, start % 60, day_offset
+
+    def first_free(self, center_id, is_walkin=False, after_minute=None):
+        """
+        First free slot for a center. For today, slots starting at or before
+        after_minute (minutes since midnight) are skipped.
+        """
+        entry = self._centers[center_id]
+        start = 0 if after_minute is None else self.started_slots(after_minute)
+        tree = entry["walkin_tree"] if is_walkin else entry["scheduled"]
+        pos = tree.first_free(start)
+        if pos == -1:
+            return None
+        return self.slot_at(pos)
+
+    def started_slots(self, after_minute):
+        """Number of today's slots that start at or before after_minute."""
+        passed = after_minute - self.open_minute
+        if passed < 0:
+            return 0
+        return min(self.slots_per_day, passed // self.slot_minutes + 1)
+
+    def remaining(self, center_id):
+        """Per-slot (scheduled, walk-in) capacity left across the horizon."""
+        entry = self._centers[center_id]
+        scheduled_limit, slot_capacity = entry["limits"]
+        scheduled = [max(0, scheduled_limit - b) for b in entry["booked"]]
+        walkin = [max(0, slot_capacity - b - w) for b, w in zip(entry["booked"], entry["walkin"])]
+        return scheduled, walkin
+
+    def scheduled_room(self, center_id, date, hour, minute=0):
+        """Scheduled capacity left in one slot (0 outside the horizon)."""
+        pos = self.position(date, hour, minute)
+        if not 0 <= pos < self.n or center_id not in self._centers:
+            return 0
+        entry = self._centers[center_id]
+        return entry["limits"][0] - entry["booked"][pos]
+
+    def record(self, center_id, date, hour, minute=0, is_walkin=False, delta=1):
+        """Point update after a slot's occupancy changed."""
+        pos = self.position(date, hour, minute)
+        if not 0 <= pos < self.n or center_id not in self._centers:
+            return
+        entry = self._centers[center_id]
+        if is_walkin:
+            entry["walkin"][pos] += delta
+        else:
+            entry["booked"][pos] += delta
+        scheduled_limit, slot_capacity = entry["limits"]
+        booked, walkin = entry["booked"][pos], entry["walkin"][pos]
+        entry["scheduled"].update(pos, scheduled_limit - booked)
+        entry["walkin_tree"].update(pos, slot_capacity - booked - walkin)
@@ -0,0 +1,295 @@
+import bisect
+import threading
+
+MINUTES_PER_DAY = 1440
+
+class Fenwick:
+    """Binary indexed tree of counts over minute-of-day keys."""
+    def __init__(self, size=MINUTES_PER_DAY):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, key, delta):
+        i = key + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, key):
+        """Count of entries with key <= key."""
+        if key < 0:
+            return 0
+        i = min(key, self.size - 1) + 1
+        total = 0
+        while i:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def range(self, lo, hi):
+        return self.prefix(hi) - self.prefix(lo - 1)
+
+    def find_kth(self, k):
+        """Smallest key whose prefix count reaches k (1-based), or -1."""
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos if pos < self.size else -1
+
+class CenterQueue:
+    """
+    Live token queue for one center and day.
+
+    Residents who are physically present wait in priority order: walk-ins by
+    arrival minute, checked-in scheduled residents by their slot minute (so an
+    appointment keeps its place). Scheduled residents who have not arrived yet
+    are only counted, by slot minute, so they push walk-in ETAs back until they
+    check in; once their slot is older than the grace period they stop counting,
+    which is how no-shows fall out without any sweep.
+    """
+    def __init__(self, center_id, date, service_minutes, no_show_grace=30):
+        self.center_id = center_id
+        self.date = date
+        self.service_minutes = service_minutes
+        self.no_show_grace = no_show_grace
+        self.version = 0
+        self.now_serving = None
+
+        self._present = Fenwick()
+        self._buckets = {}      # minute -> sorted seqs of present entries
+        self._by_seq = {}       # seq -> entry
+        self._by_request = {}   # request_id -> seq of its present entry
+        self._served = {}       # request_id -> entry already called, so re-check-ins keep it
+        self._expected = Fenwick()
+        self._expected_minute = {}  # request_id -> slot minute
+        self._next_token = 1
+        self._next_seq = 0
+
+    # --- Mutations ---
+    def issue_walkin(self, now_minute, name=""):
+        entry = self._enqueue(now_minute, "Walk-in", name=name)
+        return entry
+
+    def expect(self, request_id, slot_minute):
+        if request_id in self._expected_minute:
+            return
+        self._expected_minute[request_id] = slot_minute
+        self._expected.add(slot_minute, 1)
+        self.version += 1
+
+    def check_in(self, request_id, slot_minute, name=""):
+        seq = self._by_request.get(request_id)
+        if seq is not None:
+            return self._by_seq[seq]  # Already in the queue: keep the original token
+        if request_id in self._served:
+            return self._served[request_id]  # Already called: no second token
+        minute = self._expected_minute.pop(request_id, None)
+        if minute is not None:
+            self._expected.add(minute, -1)
+        return self._enqueue(slot_minute if minute is None else minute, "Scheduled",
+                             name=name, request_id=request_id)
+
+    def no_show(self, request_id):
+        minute = self._expected_minute.pop(request_id, None)
+        if minute is None:
+            return False
+        self._expected.add(minute, -1)
+        self.version += 1
+        return True
+
+    def leave(self, request_id):
+        """Drops a request whether it is still expected or already waiting (cancelled appointment)."""
+        if self.no_show(request_id):
+            return True
+        seq = self._by_request.pop(request_id, None)
+        if seq is None:
+            return False
+        entry = self._by_seq.pop(seq)
+        bucket = self._buckets[entry["minute"]]
+        bucket.remove(seq)
+        if not bucket:
+            del self._buckets[entry["minute"]]
+        self._present.add(entry["minute"], -1)
+        self.version += 1
+        return True
+
+    def serve_next(self):
+        minute = self._present.find_kth(1)
+        if minute == -1:
+            return None
+        bucket = self._buckets[minute]
+        seq = bucket.pop(0)
+        if not bucket:
+            del self._buckets[minute]
+        self._present.add(minute, -1)
+        entry = self._by_seq.pop(seq)
+        if entry["request_id"] is not None:
+            del self._by_request[entry["request_id"]]
+            self._served[entry["request_id"]] = entry
+        if self.now_serving is not None:
+            self.now_serving["status"] = "Served"
+        entry["status"] = "Serving"
+        self.now_serving = entry
+        self.version += 1
+        return entry
+
+    def _enqueue(self, minute, kind, name="", request_id=None):
+        seq = self._next_seq
+        self._next_seq += 1
+        entry = {
+            "token": self._next_token,
+            "kind": kind,
+            "name": name,
+            "request_id": request_id,
+            "minute": minute,
+            "seq": seq,
+            "status": "Waiting"
+        }
+        self._next_token += 1
+        bisect.insort(self._buckets.setdefault(minute, []), seq)
+        self._present.add(minute, 1)
+        self._by_seq[seq] = entry
+        if request_id is not None:
+            self._by_request[request_id] = seq
+        self.version += 1
+        return entry
+
+    # --- Queries ---
+    def waiting_count(self):
+        return len(self._by_seq)
+
+    def expected_count(self, now_minute):
+        return self._expected.range(max(0, now_minute - self.no_show_grace), MINUTES_PER_DAY - 1)
+
+    def eta_minute(self, entry, now_minute):
+        """
+        Estimated minute of day at which the entry is called. People ahead are
+        present entries that sort earlier plus expected appointments due before
+        the estimate (one refinement pass, both O(log n) Fenwick queries).
+        Entries already called are due now with nobody ahead.
+        """
+        if entry["status"] != "Waiting":
+            return now_minute, 0
+        minute, seq = entry["minute"], entry["seq"]
+        ahead = self._present.prefix(minute - 1) + bisect.bisect_left(self._buckets.get(minute, ()), seq)
+        window_start = max(0, now_minute - self.no_show_grace)
+        estimate = now_minute + ahead * self.service_minutes
+        expected = self._expected.range(window_start, int(estimate))
+        estimate = now_minute + (ahead + expected) * self.service_minutes
+        if entry["kind"] == "Scheduled":
+            estimate = max(estimate, minute)
+        return estimate, ahead + expected
+
+    def board(self, now_minute, limit=10):
+        """Snapshot for center display boards: now serving plus the next tokens with ETAs."""
+        upcoming = []
+        for k in range(1, min(limit, self.waiting_count()) + 1):
+            minute = self._present.find_kth(k)
+            offset = k - 1 - self._present.prefix(minute - 1)
+            entry = self._by_seq[self._buckets[minute][offset]]
+            eta, _ = self.eta_minute(entry, now_minute)
+            upcoming.append({"token": entry["token"], "kind": entry["kind"], "eta": _format_minute(eta)})
+        return {
+            "center_id": self.center_id,
+            "date": str(self.date),
+            "now_serving": self.now_serving["token"] if self.now_serving else None,
+            "waiting": self.waiting_count(),
+            "expected_appointments": self.expected_count(now_minute),
+            "upcoming": upcoming,
+            "version": self.version
+        }
+
+def _format_minute(minute):
+    minute = min(int(round(minute)), MINUTES_PER_DAY - 1)
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+def minute_of_day(dt):
+    return dt.hour * 60 + dt.minute
+
+def slot_minute(time_slot):
+    """'HH:MM' -> minutes since midnight."""
+    hour, minute = str(time_slot).split(":")[:2]
+    return int(hour) * 60 + int(minute)
+
+class QueueManager:
+    """
+    Per-center live queues for the current day. Each center has its own lock,
+    so queue traffic at one center never waits on another.
+    """
+    def __init__(self, dm, clock):
+        self.dm = dm
+        self.clock = clock
+        self._queues = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    def _lock_for(self, center_id):
+        lock = self._locks.get(center_id)
+        if lock is None:
+            with self._registry_lock:
+                lock = self._locks.setdefault(center_id, threading.Lock())
+        return lock
+
+    def _queue(self, center_id, today):
+        """Returns today's queue, seeding it with today's confirmed appointments on first use."""
+        queue = self._queues.get(center_id)
+        if queue is None or queue.date != today:
+            capacity = int(self.dm.get_center_by_id(center_id)["capacity_per_hour"])
+            queue = CenterQueue(center_id, today, service_minutes=60 / max(1, capacity))
+            req = self.dm.requests
+            if not req.empty:
+                todays = req[(req["assigned_center_id"] == center_id) & (req["assigned_date"] == str(today)) &
+                             (req["user_type"] == "Scheduled") & (req["status"].astype(str).str.contains("Confirmed|De-congested|Rescheduled"))]
+                for rid, ts in zip(todays["request_id"], todays["assigned_time_slot"]):
+                    queue.expect(rid, slot_minute(ts))
+            self._queues[center_id] = queue
+        return queue
+
+    def _with_queue(self, center_id, fn):
+        now = self.clock()
+        with self._lock_for(center_id):
+            queue = self._queue(center_id, now.date())
+            return fn(queue, minute_of_day(now))
+
+    def _token_view(self, queue, entry, now_minute):
+        eta, ahead = queue.eta_minute(entry, now_minute)
+        return {
+            "center_id": queue.center_id,
+            "date": str(queue.date),
+            "token": entry["token"],
+            "kind": entry["kind"],
+            "status": entry["status"],
+            "position": ahead + 1,
+            "eta": _format_minute(eta)
+        }
+
+    def issue_walkin(self, center_id, name=""):
+        return self._with_queue(center_id, lambda q, now: self._token_view(q, q.issue_walkin(now, name), now))
+
+    def expect(self, center_id, request_id, time_slot):
+        self._with_queue(center_id, lambda q, now: q.expect(request_id, slot_minute(time_slot)))
+
+    def check_in(self, center_id, request_id, time_slot, name=""):
+        return self._with_queue(center_id, lambda q, now: self._token_view(
+            q, q.check_in(request_id, slot_minute(time_slot), name), now))
+
+    def no_show(self, center_id, request_id):
+        return self._with_queue(center_id, lambda q, now: q.no_show(request_id))
+
+    def leave(self, center_id, request_id):
+        return self._with_queue(center_id, lambda q, now: q.leave(request_id))
+
+    def serve_next(self, center_id):
+        def serve(q, now):
+            entry = q.serve_next()
+            return None if entry is None else {"token": entry["token"], "kind": entry["kind"],
+                                               "request_id": entry["request_id"], "name": entry["name"]}
+        return self._with_queue(center_id, serve)
+
+    def board(self, center_id, limit=10):
+        return self._with_queue(center_id, lambda q, now: q.board(now, limit))
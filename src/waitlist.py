@@ -0,0 +1,53 @@
+import heapq
+import itertools
+
+# Lower ranks are promoted first; everyone else keeps arrival order
+AGE_PRIORITY = {"Senior (60+)": 0}
+DEFAULT_PRIORITY = 1
+ANY_DATE = ""
+
+class Waitlist:
+    """
+    Priority waitlists per (center, date), where date "" means any date in the
+    horizon. Each list is a binary heap ordered by (age priority, arrival), so
+    joining and promoting are O(log n). Leaving is lazy: the entry is forgotten
+    here and skipped when it reaches the top of its heap.
+    """
+    def __init__(self):
+        self._heaps = {}   # (center_id, date) -> [(priority, seq, request_id)]
+        self._active = {}  # request_id -> (center_id, date)
+        self._seq = itertools.count()
+
+    def add(self, center_id, date, request_id, age_group):
+        key = (center_id, str(date or ANY_DATE))
+        entry = (AGE_PRIORITY.get(age_group, DEFAULT_PRIORITY), next(self._seq), request_id)
+        heapq.heappush(self._heaps.setdefault(key, []), entry)
+        self._active[request_id] = key
+
+    def remove(self, request_id):
+        return self._active.pop(request_id, None) is not None
+
+    def pop_best(self, center_id, date):
+        """
+        Removes and returns the highest-priority request_id that accepts a slot
+        at center_id on date (date-specific or any-date lists), or None.
+        """
+        candidates = []
+        for key in ((center_id, str(date)), (center_id, ANY_DATE)):
+            heap = self._heaps.get(key)
+            while heap and self._active.get(heap[0][2]) != key:
+                heapq.heappop(heap)  # left the list, or re-added elsewhere
+            if heap:
+                candidates.append((heap[0], key))
+        if not candidates:
+            return None
+        (_, _, request_id), key = min(candidates)
+        heapq.heappop(self._heaps[key])
+        del self._active[request_id]
+        return request_id
+
+    def __contains__(self, request_id):
+        return request_id in self._active
+
+    def __len__(self):
+        return len(self._active)
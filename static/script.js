@@ -12,6 +12,7 @@ function checkAuth() {
         document.getElementById('adminDashboard').style.display = 'block';
         document.getElementById('regionBadge').innerText = `Region: ${region}`;
         loadAdminData(); // Initial Load
+        startLiveStream();
     }
 }
 
@@ -40,13 +41,21 @@ async function adminLogin(e) {
 }
 
 function logout() {
+    if (liveStream) liveStream.close();
     localStorage.removeItem('admin_token');
     location.reload();
 }
 
 // --- CITIZEN: BOOKING ---
+// One key per booking attempt: resubmits after a timeout replay the original booking
+let bookingKey = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : `${Date.now()}-${Math.random()}`;
+
+// Virtual waiting room ticket, kept across automatic retries while demand is high
+let waitingTicket = null;
+
 async function bookAppointment(event) {
-    event.preventDefault();
+    if (event) event.preventDefault();
+    let waiting = false;
 
     // UI Loading State
     const submitBtn = document.getElementById('submitBtn');
@@ -61,17 +70,28 @@ async function bookAppointment(event) {
         request_type: document.getElementById('request_type').value,
         user_type: "Scheduled", // Default as per new requirement
         city: document.getElementById('city').value,
-        pincode: document.getElementById('pincode').value
+        pincode: document.getElementById('pincode').value,
+        waiting_room_ticket: waitingTicket
     };
 
     try {
         const res = await fetch(`${API_BASE}/book_appointment`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'Idempotency-Key': bookingKey },
             body: JSON.stringify(payload)
         });
         const result = await res.json();
 
+        if (res.status === 429) {
+            // Hold our place in line and retry when the server suggests
+            waiting = true;
+            waitingTicket = result.ticket;
+            submitBtn.innerText = result.position ? `Waiting room: #${result.position} (retry in ${result.retry_after}s)` : result.message;
+            setTimeout(() => bookAppointment(), result.retry_after * 1000);
+            return;
+        }
+        waitingTicket = null;
+
         if (result.success) {
             const d = result.data;
             // Store for receipt
@@ -86,14 +106,17 @@ async function bookAppointment(event) {
             document.getElementById('successView').style.display = 'block';
 
             showToast(`SMS Sent to ${payload.phone}`);
+            loadAvailability();
         } else {
             alert(result.message);
         }
 
     } catch (err) { alert("Error: " + err.message); }
     finally {
-        submitBtn.innerText = "Find & Book Slot";
-        submitBtn.disabled = false;
+        if (!waiting) {
+            submitBtn.innerText = "Find & Book Slot";
+            submitBtn.disabled = false;
+        }
     }
 }
 
@@ -149,6 +172,8 @@ async function trackRequest() {
                 <hr style="margin:5px 0;">
                 <p style="font-size:0.9rem;">${d.assigned_date} @ ${d.assigned_time_slot}</p>
                 <p style="font-size:0.8rem; color:#666;">Center ID: ${d.assigned_center_id}</p>
+                ${d.status.includes('Cancelled') || d.status.includes('Completed') ? '' :
+                    `<button onclick="cancelRequest('${d.request_id}')" class="btn" style="margin-top:8px; background:white; border:1px solid #ccc;">Cancel Appointment</button>`}
             `;
         } else {
             div.innerHTML = `<p style="color:red;">❌ Request Not Found</p>`;
@@ -156,6 +181,97 @@ async function trackRequest() {
     } catch (err) { console.error(err); }
 }
 
+async function cancelRequest(id) {
+    const phone = prompt("Enter the mobile number used for this booking to cancel it:");
+    if (!phone) return;
+    try {
+        const res = await fetch(`${API_BASE}/cancel`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ request_id: id, phone: phone.trim() })
+        });
+        const result = await res.json();
+        showToast(result.message);
+        if (result.success) {
+            trackRequest();
+            loadAvailability();
+        }
+    } catch (err) { console.error(err); }
+}
+
+// --- CITIZEN: LOCATION AUTOCOMPLETE ---
+const pincodeCities = {};
+
+async function suggestLocations(input, listId) {
+    const q = input.value.trim();
+    if (!q) return;
+    try {
+        const res = await fetch(`${API_BASE}/locations/autocomplete?q=${encodeURIComponent(q)}`);
+        const result = await res.json();
+        document.getElementById(listId).innerHTML = result.suggestions.map(s => {
+            if (s.pincode) {
+                pincodeCities[s.pincode] = s.city;
+                return `<option value="${s.pincode}">${s.locality}, ${s.city}</option>`;
+            }
+            return `<option value="${s.city}"></option>`;
+        }).join('');
+    } catch (err) { console.error(err); }
+}
+
+if (document.getElementById('citySuggestions')) {
+    const cityInput = document.getElementById('city');
+    const pincodeInput = document.getElementById('pincode');
+    cityInput.addEventListener('input', () => suggestLocations(cityInput, 'citySuggestions'));
+    pincodeInput.addEventListener('input', () => {
+        suggestLocations(pincodeInput, 'pincodeSuggestions');
+        // Picking a pincode suggestion fills in its city
+        const city = pincodeCities[pincodeInput.value];
+        if (city && cityInput.value !== city) {
+            cityInput.value = city;
+            loadAvailability();
+        }
+    });
+}
+
+// --- CITIZEN: AVAILABILITY ---
+async function loadAvailability() {
+    const grid = document.getElementById('availabilityGrid');
+    const city = document.getElementById('city');
+    if (!grid || !city) return;
+    document.getElementById('availabilityCity').innerText = city.value;
+
+    try {
+        const res = await fetch(`${API_BASE}/availability?city=${encodeURIComponent(city.value)}`);
+        const centers = await res.json();
+        if (!Array.isArray(centers) || !centers.length) {
+            grid.innerHTML = '<p style="color:#666;">No centers in this city.</p>';
+            return;
+        }
+
+        // Sum scheduled capacity across the city's centers for each date/time cell
+        const { dates, times } = centers[0];
+        const rows = dates.map((date, d) => {
+            const cells = times.map((_, t) => {
+                const free = centers.reduce((sum, c) => sum + c.scheduled[d][t], 0);
+                const color = free === 0 ? '#f8d7da' : free < 10 ? '#fff3cd' : '#d4edda';
+                return `<td style="background:${color}; text-align:center; padding:4px;">${free}</td>`;
+            }).join('');
+            return `<tr><th style="text-align:left; padding:4px;">${date}</th>${cells}</tr>`;
+        }).join('');
+        grid.innerHTML = `
+            <table style="border-collapse: collapse; width: 100%;">
+                <tr><th></th>${times.map(t => `<th style="padding:4px;">${t}</th>`).join('')}</tr>
+                ${rows}
+            </table>
+        `;
+    } catch (err) { console.error(err); }
+}
+
+if (document.getElementById('availabilityGrid')) {
+    document.getElementById('city').addEventListener('change', loadAvailability);
+    loadAvailability();
+}
+
 // --- ADMIN: DATA & CONTROLS ---
 async function loadAdminData() {
     if (!currentUser) return;
@@ -187,20 +303,107 @@ async function loadAdminData() {
         const tbody = document.getElementById('logsTableBody');
         tbody.innerHTML = '';
         stats.logs.forEach(log => {
-            const row = `<tr>
-                <td><small>${log.request_id}</small></td>
-                <td>${log.name || 'N/A'}</td>
-                <td>${log.age_group || '-'}</td>
-                <td>${log.assigned_center_id}</td>
-                <td>${log.assigned_date} <small>${log.assigned_time_slot}</small></td>
-                <td><span class="badge ${log.status.includes('Confirmed') ? 'badge-success' : 'badge-warning'}">${log.status}</span></td>
-            </tr>`;
-            tbody.innerHTML += row;
+            tbody.innerHTML += logRow(log);
         });
 
     } catch (err) { console.error(err); }
 }
 
+// --- ADMIN: LIVE UPDATES (SSE) ---
+let liveStream = null;
+
+function startLiveStream() {
+    if (!currentUser || !window.EventSource || liveStream) return;
+
+    liveStream = new EventSource(`${API_BASE}/admin/stream?region=${encodeURIComponent(currentUser.region)}`);
+    liveStream.addEventListener('booking', e => applyBookingEvent(JSON.parse(e.data)));
+    liveStream.addEventListener('status', e => applyStatusEvent(JSON.parse(e.data)));
+    liveStream.addEventListener('slot', e => applySlotEvent(JSON.parse(e.data)));
+    liveStream.addEventListener('redistribution', e => {
+        const d = JSON.parse(e.data);
+        showToast(`${d.count} appointments at ${d.center_id} shifted to ${d.to_date}`);
+        loadAdminData(); // Statuses changed in bulk, take a fresh snapshot
+    });
+    // Browser reconnects on its own; resync once the stream is back
+    liveStream.onopen = () => loadAdminData();
+    liveStream.onerror = () => {
+        if (liveStream.readyState !== EventSource.CLOSED) return; // browser is retrying
+        // Refused (server at its stream limit): take a snapshot now and try again later
+        liveStream = null;
+        loadAdminData();
+        setTimeout(startLiveStream, 30000);
+    };
+}
+
+function logRow(log) {
+    return `<tr data-request-id="${log.request_id}">
+        <td><small>${log.request_id}</small></td>
+        <td>${log.name || 'N/A'}</td>
+        <td>${log.age_group || '-'}</td>
+        <td>${log.assigned_center_id}</td>
+        <td>${log.assigned_date} <small>${log.assigned_time_slot}</small></td>
+        <td><span class="badge ${log.status.includes('Confirmed') ? 'badge-success' : 'badge-warning'}">${log.status}</span></td>
+    </tr>`;
+}
+
+// Same filters as /admin/data, so live counts match the next snapshot
+function matchesLogFilter(log) {
+    const ageGroup = document.getElementById('filter_age')?.value || 'All';
+    const status = document.getElementById('filter_status')?.value || 'All';
+    if (ageGroup !== 'All' && log.age_group !== ageGroup) return false;
+    if (status === 'Pending' && log.status !== 'Confirmed') return false;
+    if (status === 'Done' && log.status !== 'Completed') return false;
+    return true;
+}
+
+// Contribution of one request to the total / today / redirect boxes
+function logCounts(log) {
+    if (!matchesLogFilter(log)) return { total_req: 0, today_req: 0, redirects: 0 };
+    return {
+        total_req: 1,
+        today_req: log.assigned_date === new Date().toISOString().slice(0, 10) ? 1 : 0,
+        redirects: log.status.includes('De-congested') || log.status.includes('Rescheduled') ? 1 : 0
+    };
+}
+
+function bumpCounts(after, before) {
+    for (const id of ['total_req', 'today_req', 'redirects']) {
+        const delta = after[id] - (before ? before[id] : 0);
+        if (!delta) continue;
+        const el = document.getElementById(id);
+        el.innerText = parseInt(el.innerText || '0', 10) + delta;
+    }
+}
+
+function applyBookingEvent(log) {
+    if (!matchesLogFilter(log)) return;
+    bumpCounts(logCounts(log));
+
+    const tbody = document.getElementById('logsTableBody');
+    tbody.insertAdjacentHTML('afterbegin', logRow(log));
+    while (tbody.rows.length > 50) tbody.deleteRow(-1);
+}
+
+// An already-counted request changed (cancelled, promoted off the waitlist):
+// move the counts from its old state to the new one and update its row in place
+function applyStatusEvent(log) {
+    bumpCounts(logCounts(log), logCounts({ ...log, ...log.previous }));
+
+    const row = document.querySelector(`#logsTableBody tr[data-request-id="${log.request_id}"]`);
+    if (!row) return;
+    if (matchesLogFilter(log)) row.outerHTML = logRow(log);
+    else row.remove();
+}
+
+function applySlotEvent(slot) {
+    const occupancy = document.getElementById('slotOccupancy');
+    if (!occupancy) return;
+    const used = slot.booked_count + slot.walkin_count;
+    const pct = Math.min(100, Math.round(100 * used / slot.slot_capacity));
+    const time = `${String(slot.hour).padStart(2, '0')}:${String(slot.minute).padStart(2, '0')}`;
+    occupancy.innerText = `${slot.center_id} · ${slot.date} ${time} — ${used}/${slot.slot_capacity} (${pct}%)`;
+}
+
 async function loadCentersForAdmin() {
     try {
         const response = await fetch(`${API_BASE}/centers`);
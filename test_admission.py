@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.admission import AdmissionController, TokenBucket
+from src.simulation import SimClock
+
+def test_token_bucket_refill():
+    print("--- Test 1: Token Bucket Spends Its Burst, Then Refills At Its Rate ---")
+    bucket = TokenBucket(rate=2.0, burst=3, now=0.0)
+    for _ in range(3):
+        assert bucket.wait_time(0.0) == 0
+        bucket.take()
+    assert bucket.wait_time(0.0) == 0.5
+    assert bucket.wait_time(0.25) == 0.25
+    assert bucket.wait_time(0.5) == 0
+    assert bucket.wait_time(100.0) == 0 and bucket.tokens == 3  # capped at the burst
+    print("PASS")
+
+def test_rate_limit_per_pincode():
+    print("\n--- Test 2: A Busy Pincode Is Told To Retry, Its Neighbours Are Not Held Back ---")
+    clock = SimClock(1000.0)
+    gate = AdmissionController(max_concurrent=100, pincode_rate=1.0, pincode_burst=2, clock=clock)
+    for _ in range(2):
+        gate.admit("Mumbai", "400014").release()
+    limited = gate.admit("Mumbai", "400014")
+    assert not limited.ok and limited.ticket is None and limited.retry_after >= 1
+    assert not limited.to_dict()["queued"] and gate.stats()["waiting"] == 0
+    assert gate.admit("Mumbai", "400053").ok  # no waiting room for the rest of the state
+
+    clock.now += limited.retry_after
+    assert gate.admit("Mumbai", "400014").ok
+    print("PASS: retried after", limited.retry_after, "s without a ticket")
+
+def test_idle_gate_admits_past_waiting_tickets():
+    print("\n--- Test 3: Outstanding Tickets Only Hold The Seats They Need ---")
+    clock = SimClock(1000.0)
+    gate = AdmissionController(max_concurrent=2, clock=clock)
+    inside = [gate.admit("Delhi", f"1100{i:02d}") for i in range(2)]
+    waiting = gate.admit("Delhi", "110010")
+    assert waiting.ticket == 1
+    for admission in inside:
+        admission.release()
+    assert gate.stats()["in_flight"] == 0
+    assert gate.admit("Delhi", "110011").ok  # one seat for the ticket, one free
+    assert not gate.admit("Delhi", "110012").ok  # the ticket's seat is kept
+    assert gate.admit("Delhi", "110010", ticket=waiting.ticket).ok
+    print("PASS: fresh arrival admitted beside a waiting ticket")
+
+def test_waiting_room_order():
+    print("\n--- Test 4: Concurrency Gate Admits Waiting Tickets In Order ---")
+    clock = SimClock(1000.0)
+    gate = AdmissionController(max_concurrent=2, clock=clock)
+    inside = [gate.admit("Delhi", f"1100{i:02d}") for i in range(2)]
+    assert all(a.ok for a in inside)
+    first, second = gate.admit("Delhi", "110010"), gate.admit("Delhi", "110011")
+    assert (first.ticket, first.position) == (1, 1) and (second.ticket, second.position) == (2, 2)
+
+    inside[0].release()
+    assert not gate.admit("Delhi", "110012").ok          # fresh arrival cannot overtake
+    assert not gate.admit("Delhi", "110011", ticket=second.ticket).ok  # not its turn yet
+    entered = gate.admit("Delhi", "110010", ticket=first.ticket)
+    assert entered.ok and gate.stats()["in_flight"] == 2
+    entered.release()
+    assert gate.admit("Delhi", "110011", ticket=second.ticket).ok
+
+    clock.now += 3600  # the overtaker's ticket lapses; with a free seat the line is empty again
+    inside[1].release()
+    assert gate.admit("Delhi", "110013").ok and gate.stats()["waiting"] == 0
+    print("PASS: tickets served 1, 2; no overtaking")
+
+def test_bucket_map_is_bounded():
+    print("\n--- Test 5: Rate-Limit Buckets Stay Bounded Under Random Pincodes ---")
+    gate = AdmissionController(max_concurrent=10**6, city_burst=10**6, max_buckets=100, clock=SimClock(1000.0))
+    for i in range(5000):
+        gate.admit("Delhi", f"{i:06d}")
+    assert len(gate._buckets) == 100
+    assert "city:delhi" in gate._buckets  # hot key kept, cold pincodes evicted
+    print("PASS:", len(gate._buckets), "buckets")
+
+if __name__ == "__main__":
+    test_token_bucket_refill()
+    test_rate_limit_per_pincode()
+    test_idle_gate_admits_past_waiting_tickets()
+    test_waiting_room_order()
+    test_bucket_map_is_bounded()
@@ -0,0 +1,61 @@
+import pandas as pd
+from src.analytics import CUBE_DIMENSIONS, build_cube, rollup, scope_cube
+
+def _requests():
+    rows = [
+        # city, date, slot, type, age group, status
+        ("New Delhi", "2026-01-05", "09:00", "New Enrolment", "Adult (18-60)", "Confirmed"),
+        ("New Delhi", "2026-01-05", "09:00", "New Enrolment", "Adult (18-60)", "Confirmed"),
+        ("New Delhi", "2026-01-05", "10:00 - 11:00", "Biometric Update", "Senior (60+)", "Confirmed"),
+        ("new delhi", "2026-01-07", "09:30", "New Enrolment", "Adult (18-60)", "Cancelled"),
+        ("Mumbai", "2026-01-12", "11:00", "Biometric Update", "", "Confirmed"),
+        ("Mumbai", "2026-02-02", "Walk-in", "New Enrolment", "Adult (18-60)", "Confirmed"),
+    ]
+    df = pd.DataFrame(rows, columns=["input_city", "assigned_date", "assigned_time_slot",
+                                     "request_type", "age_group", "status"])
+    df["assigned_center_id"] = df["input_city"].str.lower().map({"new delhi": "ASK001", "mumbai": "ASK006"})
+    return df
+
+def test_build_cube_counts_cells():
+    print("--- Test 1: The Cube Has One Row Per Non-Empty Cell And Keeps Every Request ---")
+    cube = build_cube(_requests())
+    assert list(cube.columns) == CUBE_DIMENSIONS + ["count"]
+    assert len(cube) == 5 and cube["count"].sum() == 6
+    twice = cube[(cube["hour"] == 9) & (cube["region"] == "New Delhi")]
+    assert twice["count"].tolist() == [2]
+    assert sorted(cube["hour"].dropna().tolist()) == [9, 9, 10, 11]  # "09:30" and "10:00 - 11:00" parse too
+    assert cube["hour"].isna().sum() == 1  # walk-in label has no hour
+    assert "Unknown" in set(cube["age_group"])  # blank labels are named
+    assert pd.api.types.is_datetime64_any_dtype(cube["date"])
+
+    empty = build_cube(_requests().iloc[0:0])
+    assert empty.empty and list(empty.columns) == CUBE_DIMENSIONS + ["count"]
+    assert rollup(empty)["count"].tolist() == [0]
+    print("PASS:", len(cube), "cells")
+
+def test_scope_cube_matches_region():
+    print("\n--- Test 2: Scoping Matches Regions Case-Insensitively ---")
+    cube = build_cube(_requests())
+    assert scope_cube(cube, "All") is cube
+    assert scope_cube(cube, "delhi")["count"].sum() == 4  # both spellings of New Delhi
+    assert set(scope_cube(cube, "Mumbai")["center_id"]) == {"ASK006"}
+    assert scope_cube(cube, "Atlantis").empty
+    print("PASS")
+
+def test_rollup_by_dimension_and_period():
+    print("\n--- Test 3: Rollups Sum Over Dimensions And Bucket Dates By Period ---")
+    cube = build_cube(_requests())
+    assert rollup(cube)["count"].tolist() == [6]
+    by_type = rollup(cube, ["request_type"]).set_index("request_type")["count"]
+    assert by_type.to_dict() == {"Biometric Update": 2, "New Enrolment": 4}
+
+    daily = rollup(cube, freq="D").set_index("date")["count"]
+    assert daily[pd.Timestamp("2026-01-05")] == 3 and daily.sum() == 6
+
+    weekly = rollup(cube, ["request_type"], freq="W")  # weeks end on Sunday
+    week1 = weekly[weekly["date"] == pd.Timestamp("2026-01-11")].set_index("request_type")["count"]
+    assert week1.to_dict() == {"Biometric Update": 1, "New Enrolment": 3}
+
+    monthly = rollup(cube, freq="MS").set_index("date")["count"]
+    assert monthly.to_dict() == {pd.Timestamp("2026-01-01"): 5, pd.Timestamp("2026-02-01"): 1}
+    print("PASS: daily, weekly and monthly trends add up")
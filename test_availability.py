@@ -0,0 +1,78 @@
+import json
+import threading
+
+def _read_around(be, owner, name, before=False, external_edit=False):
+    """
+    Runs an availability read in another thread right after (or before) each
+    call to owner.name. external_edit bumps slots_version first, as a reconcile
+    or a new day would, so the read rebuilds the index.
+    """
+    call = getattr(owner, name)
+    readers = []
+
+    def read():
+        if external_edit:
+            be.dm.slots_version += 1
+        reader = threading.Thread(target=be.get_availability, args=(["C1"],))
+        reader.start()
+        reader.join(timeout=0.2)  # blocks on the index lock unless the writer let go of it
+        readers.append(reader)
+
+    def wrapped(*args, **kwargs):
+        if before:
+            read()
+        result = call(*args, **kwargs)
+        if not before:
+            read()
+        return result
+    setattr(owner, name, wrapped)
+    return readers
+
+def _index_booked(be):
+    return 8 - be._get_slot_index().scheduled_room("C1", be.clock().date(), 9)  # 10/hour less the walk-in buffer
+
+def test_read_during_booking_counts_once(make_backend, resident):
+    print("--- Test 1: A Read Between The Store Write And The Index Update Does Not Count A Booking Twice ---")
+    be = make_backend(capacity=10)
+    be.get_availability(["C1"])  # index built before the write
+    readers = _read_around(be, be.dm, "update_slot_load")
+    assert be.process_request(resident(1))["data"]["assigned_time_slot"] == "09:00"
+    readers[0].join()
+    assert be.dm.get_slot_load("C1", "2026-01-05", 9)[0] == 1
+    assert _index_booked(be) == 1
+    assert json.loads(be.get_availability(["C1"])[0])["scheduled"][0][0] == 8 - 1
+    print("PASS: index and store agree")
+
+def test_read_during_confirm_counts_once(make_backend, resident):
+    print("\n--- Test 2: A Read While A Hold Turns Into A Booking Still Counts It ---")
+    be = make_backend(capacity=10)
+    hold = be.hold_slot(resident(1))
+    readers = _read_around(be, be, "_book_slot", before=True, external_edit=True)  # hold already dropped
+    assert be.confirm_hold(hold["hold_id"])["data"]["assigned_time_slot"] == "09:00"
+    readers[0].join()
+    assert be.dm.get_slot_load("C1", "2026-01-05", 9)[0] == 1
+    assert _index_booked(be) == 1
+    print("PASS: the confirmed booking stays counted")
+
+def test_availability_endpoint_cache(server, resident):
+    print("\n--- Test 3: Availability Heatmaps Are Cached Per Center Until A Slot Changes ---")
+    client = server.app.test_client()
+    first = client.get("/api/availability?city=Mumbai")
+    assert first.status_code == 200
+    mumbai = {h["center_id"]: h for h in first.get_json()}
+    assert set(mumbai) == {"ASK006", "ASK007"}
+    assert client.get("/api/availability?city=Atlantis").status_code == 404
+
+    backend = server.router.shards["MH"].backend
+    cached = dict(backend._availability)
+    assert client.get("/api/availability?city=Bombay").data == first.data  # alias, served from cache
+    assert all(backend._availability[cid] is cached[cid] for cid in cached)
+
+    booked = client.post("/api/book_appointment", json=resident(1, city="Mumbai", pincode="400014")).get_json()
+    assert booked["success"] and booked["data"]["assigned_center_id"] == "ASK006"
+    assert "ASK006" not in backend._availability or backend._availability["ASK006"] is not cached["ASK006"]
+    after = {h["center_id"]: h for h in client.get("/api/availability?city=Mumbai").get_json()}
+    total = lambda h: sum(map(sum, h["scheduled"]))
+    assert total(after["ASK006"]) == total(mumbai["ASK006"]) - 1
+    assert after["ASK007"] == mumbai["ASK007"] and backend._availability["ASK007"] is cached["ASK007"]
+    print("PASS: only the booked center's heatmap was re-rendered")
@@ -0,0 +1,77 @@
+import json
+
+def test_cancel_promotes_senior_first(make_backend, resident):
+    print("--- Test 1: Cancel Releases The Slot To The Senior On The Waitlist ---")
+    be = make_backend()
+    booked = [be.process_request(resident(i)) for i in range(8)]
+    assert all(r["success"] for r in booked)
+    adult = be.process_request(resident(100))
+    senior = be.process_request(resident(101, age_group="Senior (60+)"))
+    assert adult["waitlisted"] and senior["waitlisted"]
+
+    victim = booked[3]["data"]
+    assert not be.cancel_request(victim["request_id"], phone="9999999999")["success"]
+    result = be.cancel_request(victim["request_id"], phone=victim["phone"])
+    assert result["success"]
+    assert result["promoted"] == senior["data"]["request_id"]
+    assert be.notifications[-1]["request_id"] == senior["data"]["request_id"]
+    booked_count, _, _ = be.dm.get_slot_load("C1", victim["assigned_date"], int(victim["assigned_time_slot"][:2]))
+    assert booked_count == 1  # released, then taken by the promoted senior
+    assert not be.cancel_request(victim["request_id"], phone=victim["phone"])["success"]
+    print("PASS: senior promoted ahead of the earlier adult")
+
+def test_cancel_restart_rebook(make_backend, resident):
+    print("\n--- Test 2: A Cancelled Booking Is Not Replayed After A Restart ---")
+    be = make_backend()
+    first = be.process_request(resident(1))
+    assert be.process_request(resident(1)).get("duplicate")
+    assert be.cancel_request(first["data"]["request_id"], phone=first["data"]["phone"])["success"]
+
+    restarted = make_backend()
+    again = restarted.process_request(resident(1))
+    assert again["success"] and not again.get("duplicate")
+    assert again["data"]["request_id"] != first["data"]["request_id"]
+    print("PASS: rebooked as", again["data"]["request_id"])
+
+def test_cancelled_request_cannot_check_in(make_backend, resident):
+    print("\n--- Test 3: Cancelled Appointments Cannot Check In And Leave The Queue ---")
+    be = make_backend()
+    cancelled = be.process_request(resident(1))["data"]
+    be.cancel_request(cancelled["request_id"], phone=cancelled["phone"])
+    assert not be.check_in(cancelled["request_id"])["success"]
+
+    present = be.process_request(resident(2))["data"]
+    assert be.check_in(present["request_id"])["success"]
+    assert be.queues.board("C1")["waiting"] == 1
+    be.cancel_request(present["request_id"], phone=present["phone"])
+    assert be.queues.board("C1")["waiting"] == 0
+    print("PASS: no token for a cancelled request; checked-in entry dropped on cancel")
+
+def _events(q):
+    frames = []
+    while not q.empty():
+        _, event, data = q.get_nowait().strip().split("\n")
+        frames.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return frames
+
+def test_status_events_for_existing_requests(make_backend, resident):
+    print("\n--- Test 4: Cancelling And Promoting Publish Status Changes, Not New Bookings ---")
+    be = make_backend()
+    booked = [be.process_request(resident(i))["data"] for i in range(8)]
+    waiting = be.process_request(resident(100))["data"]
+    q = be.events.subscribe()
+
+    be.cancel_request(booked[3]["request_id"], phone=booked[3]["phone"])
+    status = [data for event, data in _events(q) if event != "slot"]
+    assert [(d["request_id"], d["previous"]["status"], d["status"]) for d in status] == [
+        (booked[3]["request_id"], "Confirmed", "Cancelled"),
+        (waiting["request_id"], "Waitlisted", "Confirmed")]
+    promoted = status[1]
+    assert promoted["assigned_time_slot"] == booked[3]["assigned_time_slot"]
+    assert promoted["previous"]["assigned_time_slot"] == waiting["assigned_time_slot"]
+
+    another = be.process_request(resident(101))["data"]
+    _events(q)
+    be.cancel_request(another["request_id"], phone=another["phone"])
+    assert [(e, d["previous"]["status"], d["status"]) for e, d in _events(q)] == [("status", "Waitlisted", "Cancelled")]
+    print("PASS: one status event per change, none published as a booking")
@@ -0,0 +1,80 @@
+import datetime
+import random
+import time
+from src.holds import TimerWheel
+from src.sharding import ShardRouter
+
+def test_timer_wheel():
+    print("--- Test 1: Timer Wheel Fires Deadlines In Order, Across Revolutions ---")
+    rng = random.Random(3)
+    wheel = TimerWheel(0, resolution=1.0, size=16)
+    deadlines = {f"H{i}": rng.uniform(1, 100) for i in range(200)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+    cancelled = set(list(deadlines)[::7])
+    for key in cancelled:
+        assert wheel.cancel(key)
+    fired = []
+    for now in range(0, 103, 3):
+        due = wheel.advance(now)
+        assert all(deadlines[key] <= now for key in due)
+        fired.extend(due)
+    assert set(fired) == set(deadlines) - cancelled and len(wheel) == 0
+    print(f"PASS: {len(fired)} fired, {len(cancelled)} cancelled")
+
+def test_hold_confirm(make_backend, resident):
+    print("\n--- Test 2: Hold Then Confirm Books The Held Slot Once ---")
+    be = make_backend()
+    hold = be.hold_slot(resident(1))
+    assert hold["success"] and be.held_count == 1
+    assert be.dm.requests.empty  # nothing written until confirm
+    confirmed = be.confirm_hold(hold["hold_id"])
+    assert confirmed["success"] and confirmed["data"]["assigned_time_slot"] == hold["time_slot"]
+    assert be.held_count == 0
+    assert be.confirm_hold(hold["hold_id"])["data"]["request_id"] == confirmed["data"]["request_id"]
+    booked, _, _ = be.dm.get_slot_load("C1", hold["date"], int(hold["time_slot"][:2]))
+    assert booked == 1
+    print("PASS:", confirmed["data"]["request_id"], "at", hold["time_slot"])
+
+def test_hold_expiry_releases_capacity(make_backend, resident, clock):
+    print("\n--- Test 3: Lapsed Holds Give Their Slots Back ---")
+    be = make_backend()
+    holds = [be.hold_slot(resident(i)) for i in range(8)]
+    assert all(h["success"] for h in holds)
+    assert not be.hold_slot(resident(100))["success"]  # every scheduled place is held
+    clock.now += datetime.timedelta(seconds=be.HOLD_SECONDS + 1)
+    assert be.expire_holds() == 8 and be.held_count == 0
+    assert not be.confirm_hold(holds[0]["hold_id"])["success"]
+    assert be.hold_slot(resident(100))["time_slot"] == holds[0]["time_slot"]
+    print("PASS: 8 holds expired, first slot reusable")
+
+def test_hold_retry_returns_same_hold(make_backend, resident, clock):
+    print("\n--- Test 4: Retried Hold Requests Get The Live Hold Back ---")
+    be = make_backend()
+    first = be.hold_slot(resident(1))
+    again = be.hold_slot(resident(1))
+    assert again["duplicate"] and again["hold_id"] == first["hold_id"]
+    keyed = be.hold_slot(resident(2), idempotency_key="k-2")
+    assert be.hold_slot(dict(resident(2), phone="9000000000"), idempotency_key="k-2")["hold_id"] == keyed["hold_id"]
+    assert be.held_count == 2
+
+    be.confirm_hold(first["hold_id"])
+    assert be.hold_slot(resident(1))["duplicate"]  # now replays the booking
+    clock.now += datetime.timedelta(seconds=be.HOLD_SECONDS + 1)
+    fresh = be.hold_slot(resident(2), idempotency_key="k-2")
+    assert fresh["success"] and fresh["hold_id"] != keyed["hold_id"]
+    print("PASS: one hold per resident while it is live")
+
+def test_sweeper_expires_without_writes(tmp_path, resident, clock):
+    print("\n--- Test 5: The Background Sweeper Releases Holds Without Any Write ---")
+    router = ShardRouter(data_dir=str(tmp_path), clock=clock)
+    shard = router.route("Mumbai", "400014")
+    with shard.lock:
+        shard.backend.hold_slot(resident(1, city="Mumbai", pincode="400014"))
+    router.ensure_hold_sweeper(interval=0.05)
+    clock.now += datetime.timedelta(seconds=shard.backend.HOLD_SECONDS + 1)
+    deadline = time.time() + 5
+    while shard.backend.held_count and time.time() < deadline:
+        time.sleep(0.05)
+    assert shard.backend.held_count == 0
+    print("PASS: hold released by the sweeper")
@@ -0,0 +1,62 @@
+import datetime
+from src.idempotency import TTLCache
+from src.simulation import SimClock
+
+def test_ttl_cache():
+    print("--- Test 1: Entries Expire After Their TTL And The Oldest Are Evicted ---")
+    clock = SimClock(0.0)
+    cache = TTLCache(max_entries=3, ttl_seconds=10, clock=clock)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A"  # now most recently used
+    cache.put("d", "D")
+    assert cache.get("b") is None and len(cache) == 3  # least recently used went first
+    clock.now = 9.5
+    assert cache.get("c") == "C"
+    clock.now = 10.0
+    assert cache.get("a") is None and cache.get("c") is None
+    cache.put("c", "C2")  # rewriting a key renews its TTL
+    clock.now = 19.0
+    assert cache.get("c") == "C2" and cache.pop("c") == "C2" and cache.get("c") is None
+    print("PASS")
+
+def test_idempotency_key_replay(make_backend, resident):
+    print("\n--- Test 2: Retrying With The Same Idempotency Key Replays The Booking ---")
+    be = make_backend(capacity=10, horizon_days=2)
+    first = be.process_request(resident(1), idempotency_key="attempt-1")
+    retry = be.process_request(resident(2), idempotency_key="attempt-1")  # body changed, same attempt
+    assert retry["duplicate"] and retry["data"]["request_id"] == first["data"]["request_id"]
+    assert len(be.dm.requests) == 1
+    assert be.dm.get_slot_load("C1", "2026-01-05", 9)[0] == 1
+    print("PASS:", first["data"]["request_id"], "booked once")
+
+def test_derived_key_replay(make_backend, resident, clock):
+    print("\n--- Test 3: Without A Key, Same Phone And Service On The Same Day Replays ---")
+    be = make_backend(capacity=10, horizon_days=2)
+    first = be.process_request(resident(1))
+    assert be.process_request(resident(1))["data"]["request_id"] == first["data"]["request_id"]
+    other = be.process_request(resident(1, request_type="Biometric Update"))
+    assert not other.get("duplicate")  # a different service is a different booking
+
+    restarted = make_backend(capacity=10, horizon_days=2)  # dedupe cache warmed from today's stored rows
+    assert restarted.process_request(resident(1))["data"]["request_id"] == first["data"]["request_id"]
+
+    clock.now += datetime.timedelta(days=1)
+    assert not restarted.process_request(resident(1)).get("duplicate")
+    print("PASS: replayed within the day, including after a restart")
+
+def test_shared_phone_with_own_keys(make_backend, resident):
+    print("\n--- Test 4: Family Members Sharing A Phone Each Book With Their Own Key ---")
+    be = make_backend(capacity=10, horizon_days=2)
+    parent = be.process_request(resident(1), idempotency_key="parent")
+    child = be.process_request(resident(1, name="Child", age=12), idempotency_key="child")
+    assert child["success"] and not child.get("duplicate")
+    assert child["data"]["request_id"] != parent["data"]["request_id"]
+    assert be.process_request(resident(1), idempotency_key="child")["data"]["request_id"] == child["data"]["request_id"]
+    assert len(be.dm.requests) == 2
+
+    first = be.hold_slot(resident(2), idempotency_key="hold-a")
+    second = be.hold_slot(resident(2, name="Spouse"), idempotency_key="hold-b")
+    assert not second.get("duplicate") and second["hold_id"] != first["hold_id"]
+    assert be.held_count == 2
+    print("PASS: two bookings and two holds on one phone")
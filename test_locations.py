@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.locations import LocationDirectory, edit_distance
+
+ROWS = [("560001", "Bangalore GPO", "Bangalore", "Karnataka"),
+        ("575001", "Mangalore HO", "Mangalore", "Karnataka"),
+        ("110092", "Shahdara", "Delhi", "Delhi")]
+
+def test_aliases_and_typos():
+    print("--- Test 1: Aliases And One-Letter Typos Resolve To Center Cities ---")
+    d = LocationDirectory(rows=ROWS)
+    assert d.resolve_city("Bombay") == "Mumbai"
+    assert d.resolve_city("  BANGALORE ") == "Bengaluru"
+    assert d.resolve_city("Gurgaon") == "Gurugram"
+    assert edit_distance("gurgoan", "gurgaon", 1) == 1  # adjacent swap is one edit
+    assert d.resolve_city("gurgoan") == "Gurugram"
+    assert d.resolve_city("Banglore") == "Bengaluru"
+    assert d.resolve_city("Noidaa") == "Noida"
+    assert d.resolve_city("", "110092") == "New Delhi"  # directory city, via its alias
+    print("PASS")
+
+def test_near_miss_cities_are_not_guessed():
+    print("\n--- Test 2: Other Cities A Letter Or Two Away Stay Unresolved ---")
+    d = LocationDirectory(rows=ROWS)
+    for typed in ("Mangaluru", "Mangalore", "Mysuru", "xyz", "Pune"):
+        assert d.resolve_city(typed) is None, typed
+    assert d.resolve_city("Mangalore", "575001") is None  # its own directory city is not a center city
+    assert d.resolve_city("Mangaluru", "560001") == "Bengaluru"  # the pincode is in Bengaluru
+    print("PASS: Mangaluru / Mangalore not folded into Bengaluru")
+
+def test_autocomplete():
+    print("\n--- Test 3: Autocomplete Serves Cities By Prefix And Pincodes By Digits ---")
+    d = LocationDirectory(rows=ROWS)
+    assert {"city": "Gurugram"} in d.autocomplete("gur")
+    assert d.autocomplete("Ban") == [{"city": "Bengaluru"}]
+    assert d.autocomplete("zz") == []
+    pincodes = [s["pincode"] for s in d.autocomplete("56")]
+    assert pincodes[0] == "560038" and "560001" in pincodes  # center pincodes rank first
+    assert len(d.autocomplete("1", limit=2)) == 2
+    assert d.autocomplete("575001") == [{"pincode": "575001", "locality": "Mangalore HO", "city": "Mangalore"}]
+    print("PASS")
+
+if __name__ == "__main__":
+    test_aliases_and_typos()
+    test_near_miss_cities_are_not_guessed()
+    test_autocomplete()
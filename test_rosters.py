@@ -0,0 +1,22 @@
+import os
+from src.rosters import generate_rosters, load_bookings
+from src.sharding import ShardRouter
+
+DATE = "2026-01-20"
+
+def test_sharded_bookings_listed_once(legacy_data, tmp_path):
+    print("--- Test 1: Imported Bookings Appear Once On Rosters ---")
+    before = load_bookings(DATE, legacy_data)  # unsharded only
+    assert len(before) and before["request_id"].is_unique
+
+    ShardRouter(data_dir=legacy_data)  # splits data/requests.csv into the shard folders, leaving it in place
+    after = load_bookings(DATE, legacy_data)
+    assert after["request_id"].is_unique
+    assert sorted(after["request_id"]) == sorted(before["request_id"])
+
+    summary = generate_rosters(DATE, str(tmp_path / "rosters"), data_dir=legacy_data, processes=1)
+    assert sum(row["appointments"] for row in summary) == len(before)
+    receipts = sum(1 for row in summary
+                   for _ in open(os.path.join(tmp_path, "rosters", DATE, f"{row['center_id']}_receipts.jsonl")))
+    assert receipts == len(before)
+    print("PASS:", len(before), "appointments before and after the import")
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import shutil
+import pandas as pd
+import pytest
+from src import serialization
+from src.serialization import MIN_COMPRESS_BYTES, compress, dumps, frame_to_json, negotiate_encoding, with_fields
+
+@pytest.fixture
+def seeded_server(legacy_data, request):
+    """The Flask app over the tracked sample, which has no name/phone/age columns."""
+    data_dir = os.path.join(legacy_data, "data")
+    os.makedirs(data_dir)
+    for name in ("requests.csv", "slots.csv"):
+        shutil.move(os.path.join(legacy_data, name), data_dir)
+    return request.getfixturevalue("server")
+
+def test_negotiate_encoding(monkeypatch):
+    print("--- Test 1: Accept-Encoding Picks br, Then gzip, And Honours q=0 ---")
+    assert negotiate_encoding(None) is None and negotiate_encoding("") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("GZIP, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("gzip;q=0.0, deflate") is None
+    assert negotiate_encoding("gzip;q=bogus") is None  # unparseable weight is treated as refused
+    assert negotiate_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    if serialization.brotli is not None:
+        assert negotiate_encoding("gzip, br;q=0.1") == "br"
+    monkeypatch.setattr(serialization, "brotli", None)  # optional dependency missing
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("br, gzip") == "gzip"
+    print("PASS")
+
+def test_compress():
+    print("\n--- Test 2: Only Bodies Past The Threshold Are Compressed ---")
+    small = b'{"ok":true}'
+    assert compress(small, "gzip, br") == (small, None)
+    body = json.dumps([{"request_id": f"REQ{i}", "status": "Confirmed"} for i in range(200)]).encode()
+    assert len(body) >= MIN_COMPRESS_BYTES
+    assert compress(body, None) == (body, None)
+    assert compress(body, "gzip;q=0") == (body, None)
+
+    packed, encoding = compress(body, "gzip")
+    assert encoding == "gzip" and len(packed) < len(body) and gzip.decompress(packed) == body
+    if serialization.brotli is not None:
+        packed, encoding = compress(body, "br")
+        assert encoding == "br" and serialization.brotli.decompress(packed) == body
+    print("PASS:", len(body), "bytes ->", len(packed))
+
+def test_with_fields(monkeypatch):
+    print("\n--- Test 3: Pre-Encoded Fields Splice Into A Valid JSON Object ---")
+    logs = b'[{"a":1},{"a":null}]'
+    assert json.loads(with_fields({"total_req": 2}, logs=logs)) == {"total_req": 2, "logs": [{"a": 1}, {"a": None}]}
+    assert json.loads(with_fields({}, logs=logs, more=b"3")) == {"logs": [{"a": 1}, {"a": None}], "more": 3}
+    assert with_fields({"x": 1}) == dumps({"x": 1})
+    monkeypatch.setattr(serialization, "orjson", None)  # stdlib fallback encodes the same document
+    assert json.loads(with_fields({"when": pd.Timestamp("2026-01-05")}, logs=logs)) == {
+        "when": "2026-01-05 00:00:00", "logs": [{"a": 1}, {"a": None}]}
+    print("PASS")
+
+def test_frame_to_json():
+    print("\n--- Test 4: Frames Encode Column-Wise With Missing Values As null ---")
+    df = pd.DataFrame({"request_id": ["REQ1", "REQ2"], "name": ["Ananyā", None], "age": [30, float("nan")]})
+    assert json.loads(frame_to_json(df)) == [
+        {"request_id": "REQ1", "name": "Ananyā", "age": 30.0},
+        {"request_id": "REQ2", "name": None, "age": None}]
+    assert "Ananyā".encode() in frame_to_json(df)  # not \u-escaped
+    assert json.loads(frame_to_json(df.iloc[0:0])) == []
+    print("PASS")
+
+def test_admin_logs_send_null_for_missing_fields(seeded_server):
+    print("\n--- Test 5: Admin Logs Send null, Not '', For Fields The Sample Never Had ---")
+    client = seeded_server.app.test_client()
+    res = client.post("/api/admin/data", json={"region": "All", "limit": 5})
+    assert res.status_code == 200 and res.headers.get("Content-Encoding") is None
+    data = res.get_json()
+    assert data["total_req"] == len(pd.read_csv(os.path.join("data", "requests.csv")))
+    assert len(data["logs"]) == 5
+    assert all(log["name"] is None and log["age_group"] is None for log in data["logs"])
+    assert all(isinstance(log["status"], str) for log in data["logs"])
+
+    res = client.post("/api/admin/data", json={"region": "All", "limit": 500}, headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(res.data))["logs"]) == data["total_req"]
+    print("PASS:", data["total_req"], "requests")
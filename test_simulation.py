@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import datetime
+from src.data_manager import DEFAULT_CENTERS
+from src.simulation import generate_arrivals, simulate
+import pandas as pd
+
+def test_simulation():
+    start = datetime.date(2026, 1, 5) # A Monday
+    centers = pd.DataFrame(DEFAULT_CENTERS)
+
+    print("--- Test 1: Deterministic Arrivals ---")
+    a1 = generate_arrivals(centers, start, days=7, seed=42)
+    a2 = generate_arrivals(centers, start, days=7, seed=42)
+    assert a1.equals(a2)
+    assert a1["minute"].is_monotonic_increasing
+    print(f"PASS: {len(a1)} arrivals, identical across runs with the same seed")
+
+    print("\n--- Test 2: Light Load Is Served Without Rejections ---")
+    light = generate_arrivals(centers, start, days=7, load_factor=0.3, seed=1)
+    report = simulate(light, start, 7)
+    assert report["rejected"] == 0
+    assert report["served"] == len(light)
+    assert report["utilization"] < 0.5
+    print(f"PASS: util={report['utilization']:.1%} deferred={report['deferral_rate']:.1%}")
+
+    print("\n--- Test 3: More Capacity Means Fewer Deferrals ---")
+    heavy = generate_arrivals(centers, start, days=7, load_factor=1.3, seed=1)
+    tight = simulate(heavy, start, 7, capacity_factor=0.8)
+    loose = simulate(heavy, start, 7, capacity_factor=1.5)
+    assert loose["deferral_rate"] < tight["deferral_rate"]
+    print(f"PASS: deferred {tight['deferral_rate']:.1%} -> {loose['deferral_rate']:.1%}")
+
+if __name__ == "__main__":
+    test_simulation()
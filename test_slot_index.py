@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import datetime
+import random
+import pandas as pd
+from src.slot_index import FreeCapacityTree, SlotIndex
+
+def _first_free(values, start):
+    return next((i for i in range(start, len(values)) if values[i] > 0), -1)
+
+def test_tree_matches_scan():
+    print("--- Test 1: Segment Tree Earliest Fit Matches A Linear Scan ---")
+    rng = random.Random(11)
+    checks = 0
+    for n in (1, 2, 7, 8, 33, 240):
+        values = [rng.randint(-2, 2) for _ in range(n)]
+        tree = FreeCapacityTree(values)
+        for _ in range(200):
+            pos = rng.randrange(n)
+            values[pos] = rng.randint(-2, 2)
+            tree.update(pos, values[pos])
+            start = rng.randrange(n + 2)
+            assert tree.first_free(start) == _first_free(values, start), (n, start)
+            checks += 1
+    assert FreeCapacityTree([]).first_free(0) == -1
+    print(f"PASS: {checks} random states")
+
+def test_slot_index_matches_scan():
+    print("\n--- Test 2: SlotIndex Finds The First Bookable Slot A Scan Would ---")
+    rng = random.Random(5)
+    start = datetime.date(2026, 1, 5)
+    centers = pd.DataFrame([{"center_id": "C1", "capacity_per_hour": 10}, {"center_id": "C2", "capacity_per_hour": 3}])
+    for slot_minutes in (15, 30, 60):
+        index = SlotIndex(start, 3, 9, 17, slot_minutes)
+        rows = []
+        for _ in range(60):
+            minute = rng.randrange(9 * 60, 17 * 60, slot_minutes)
+            rows.append({"center_id": rng.choice(["C1", "C2"]), "date": str(start + datetime.timedelta(days=rng.randrange(3))),
+                         "hour": minute // 60, "minute": minute % 60,
+                         "booked_count": rng.randint(0, 4), "walkin_count": rng.randint(0, 2)})
+        index.build(centers, pd.DataFrame(rows), 0.2)
+
+        for _ in range(300):
+            center_id = rng.choice(["C1", "C2"])
+            date = start + datetime.timedelta(days=rng.randrange(3))
+            minute = rng.randrange(9 * 60, 17 * 60, slot_minutes)
+            index.record(center_id, date, minute // 60, minute % 60, is_walkin=rng.random() < 0.3,
+                         delta=1 if rng.random() < 0.7 else -1)
+
+            after = rng.choice([None, rng.randrange(8 * 60, 18 * 60)])
+            is_walkin = rng.random() < 0.5
+            scheduled, walkin = index.remaining(center_id)
+            skip = 0 if after is None else index.started_slots(after)
+            pos = _first_free(walkin if is_walkin else scheduled, skip)
+            expected = None if pos == -1 else index.slot_at(pos)
+            assert index.first_free(center_id, is_walkin=is_walkin, after_minute=after) == expected
+    print("PASS: 15, 30 and 60 minute slots")
+
+if __name__ == "__main__":
+    test_tree_matches_scan()
+    test_slot_index_matches_scan()
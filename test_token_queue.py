@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import datetime
+import random
+from src.token_queue import CenterQueue, Fenwick
+
+def test_fenwick():
+    print("--- Test 1: Fenwick prefix / find_kth Match A Brute-Force Count ---")
+    rng = random.Random(7)
+    tree, counts = Fenwick(), [0] * 1440
+    for _ in range(2000):
+        key = rng.randrange(1440)
+        delta = 1 if counts[key] == 0 or rng.random() < 0.7 else -1
+        tree.add(key, delta)
+        counts[key] += delta
+    for key in range(0, 1440, 37):
+        assert tree.prefix(key) == sum(counts[:key + 1])
+    total = sum(counts)
+    for k in (1, total // 2, total):
+        expected = next(i for i in range(1440) if sum(counts[:i + 1]) >= k)
+        assert tree.find_kth(k) == expected
+    assert tree.find_kth(total + 1) == -1
+    print(f"PASS: {total} entries")
+
+def test_eta_ordering():
+    print("\n--- Test 2: Checked-In Appointment Keeps Its Slot Ahead Of Walk-Ins ---")
+    q = CenterQueue("C1", datetime.date(2026, 1, 5), service_minutes=5)
+    walkin = q.issue_walkin(600, "walk-in")          # 10:00 arrival
+    scheduled = q.check_in("REQ1", 570, "booked")   # 09:30 slot, checks in later
+    assert q.eta_minute(scheduled, 605)[1] == 0
+    assert q.eta_minute(walkin, 605)[1] == 1
+    assert q.serve_next()["request_id"] == "REQ1"
+    assert q.serve_next()["token"] == walkin["token"]
+    print("PASS: scheduled served first, walk-in second")
+
+    print("\n--- Test 3: Repeated Check-In Returns The Same Token ---")
+    q = CenterQueue("C1", datetime.date(2026, 1, 5), service_minutes=5)
+    q.expect("REQ2", 600)
+    first = q.check_in("REQ2", 600)
+    again = q.check_in("REQ2", 600)
+    assert again["token"] == first["token"]
+    assert q.waiting_count() == 1
+    print("PASS: one entry, token", first["token"])
+
+def test_no_show_dropout():
+    print("\n--- Test 4: Absent Appointments Stop Delaying Walk-Ins After The Grace Period ---")
+    q = CenterQueue("C1", datetime.date(2026, 1, 5), service_minutes=10, no_show_grace=30)
+    q.expect("REQ3", 600)
+    q.issue_walkin(580)
+    walkin = q.issue_walkin(590)
+    assert q.expected_count(595) == 1
+    assert q.eta_minute(walkin, 595)[1] == 2     # 10:00 appointment is due before the walk-in's turn
+    assert q.expected_count(631) == 0            # 10:31: past the 30 minute grace
+    assert q.eta_minute(walkin, 631)[1] == 1
+    print("PASS: no-show dropped without a sweep")
+
+def test_check_in_after_served():
+    print("\n--- Test 5: Checking In Again After Being Called Returns The Original Token ---")
+    q = CenterQueue("C1", datetime.date(2026, 1, 5), service_minutes=5)
+    q.expect("REQ4", 600)
+    first = q.check_in("REQ4", 600)
+    walkin = q.issue_walkin(605)
+    assert q.serve_next()["request_id"] == "REQ4"
+    again = q.check_in("REQ4", 600)
+    assert again["token"] == first["token"] and again["status"] == "Serving"
+    assert q.waiting_count() == 1 and q.eta_minute(again, 610) == (610, 0)
+    assert q.serve_next()["token"] == walkin["token"]
+    assert q.check_in("REQ4", 600)["status"] == "Served" and q.waiting_count() == 0
+    print("PASS: token", first["token"], "not reissued")
+
+if __name__ == "__main__":
+    test_fenwick()
+    test_eta_ordering()
+    test_no_show_dropout()
+    test_check_in_after_served()